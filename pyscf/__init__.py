@@ -94,21 +94,30 @@ if numpy.__version__[:5] in ('1.16.', '1.17.'):
     _internal._get_void_ptr = _get_void_ptr
 
 from pyscf import __config__
-from pyscf import lib
-from pyscf import gto
-from pyscf import scf
-from pyscf import ao2mo
 
 # Whether to enable debug mode. When this flag is set, some modules may run
 # extra debug code.
 DEBUG = __config__.DEBUG
 
+# Submodules (lib, gto, scf, ao2mo, ...) are imported when they are first
+# accessed as the attributes of pyscf (PEP 562)
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError("module 'pyscf' has no attribute '%s'" % name)
+    import importlib
+    try:
+        return importlib.import_module('.' + name, __name__)
+    except ModuleNotFoundError as e:
+        if e.name != __name__ + '.' + name:
+            raise
+    raise AttributeError("module 'pyscf' has no attribute '%s'" % name)
+
 def M(**kwargs):
     '''Main driver to create Molecule object (mol) or Material crystal object (cell)'''
-    from pyscf import __all__
     if kwargs.get('a') is not None:  # a is crystal lattice parameter
-        return __all__.pbc.gto.M(**kwargs)
+        from pyscf.pbc import gto
     else:  # Molecule
-        return gto.M(**kwargs)
+        from pyscf import gto
+    return gto.M(**kwargs)
 
 del os, sys
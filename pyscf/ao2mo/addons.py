@@ -36,9 +36,11 @@ class load(object):
         self.feri = None
 
     def __enter__(self):
-        if isinstance(self.eri, str):
+        if lib.mmapfile.is_mmapfile(self.eri):
+            feri = self.feri = lib.MemmapFile(self.eri, 'r')
+        elif isinstance(self.eri, str):
             feri = self.feri = h5py.File(self.eri, 'r')
-        elif isinstance(self.eri, h5py.Group):
+        elif isinstance(self.eri, (h5py.Group, lib.MemmapGroup)):
             feri = self.eri
         elif isinstance(self.eri, (numpy.ndarray, h5py.Dataset)):
             return self.eri
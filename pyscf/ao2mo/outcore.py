@@ -27,6 +27,9 @@ IOBLK_SIZE = getattr(__config__, 'ao2mo_outcore_ioblk_size', 256)  # 256 MB
 IOBUF_WORDS = getattr(__config__, 'ao2mo_outcore_iobuf_words', 1e8)  # 800 MB
 IOBUF_ROW_MIN = getattr(__config__, 'ao2mo_outcore_row_min', 160)
 MAX_MEMORY = getattr(__config__, 'ao2mo_outcore_max_memory', 2000)  # 2GB
+# Max number of pending blocks in the background read/write stages.
+# Depth 1 means double buffering. Larger depth may help on slow filesystems.
+IO_PIPELINE_DEPTH = getattr(__config__, 'ao2mo_outcore_pipeline_depth', 1)
 
 
 def full(mol, mo_coeff, erifile, dataname='eri_mo',
@@ -236,7 +239,11 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
 #    if nij_pair > nkl_pair:
 #        log.warn('low efficiency for AO to MO trans!')
 
-    if isinstance(erifile, str):
+    if lib.mmapfile.is_mmapfile(erifile):
+        feri = lib.MemmapFile(erifile, 'a')
+        if dataname in feri:
+            del (feri[dataname])
+    elif isinstance(erifile, str):
         if h5py.is_hdf5(erifile):
             feri = h5py.File(erifile, 'a')
             if dataname in feri:
@@ -244,7 +251,7 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
         else:
             feri = h5py.File(erifile, 'w')
     else:
-        assert (isinstance(erifile, h5py.Group))
+        assert (isinstance(erifile, (h5py.Group, lib.MemmapGroup)))
         feri = erifile
 
     if comp == 1:
@@ -267,7 +274,7 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
               float(nij_pair)*nkl_pair*comp, nij_pair*nkl_pair*comp*8/1e6)
 
 # transform e1
-    fswap = lib.H5TmpFile()
+    fswap = lib.mmapfile.swapfile()
     half_e1(mol, mo_coeffs, fswap, intor, aosym, comp, max_memory, ioblk_size,
             log, compact)
 
@@ -275,13 +282,7 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
                            *time_0pass)
 
     def load(icomp, row0, row1, buf):
-        if icomp+1 < comp:
-            icomp += 1
-        else:  # move to next row-block
-            row0, row1 = row1, min(nij_pair, row1+iobuflen)
-            icomp = 0
-        if row0 < row1:
-            _load_from_h5g(fswap['%d'%icomp], row0, row1, buf)
+        return _load_from_h5g(fswap['%d'%icomp], row0, row1, buf)
 
     def save(icomp, row0, row1, buf):
         if comp == 1:
@@ -289,45 +290,50 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
         else:
             h5d_eri[icomp,row0:row1] = buf[:row1-row0]
 
-    ioblk_size = max(max_memory*.1, ioblk_size)
+    depth = IO_PIPELINE_DEPTH
+    ioblk_size = max(max_memory*.1, ioblk_size) / depth
     iobuflen = guess_e2bufsize(ioblk_size, nij_pair, max(nao_pair,nkl_pair))[0]
-    buf = numpy.empty((iobuflen,nao_pair))
-    buf_prefetch = numpy.empty_like(buf)
-    outbuf = numpy.empty((iobuflen,nkl_pair))
-    buf_write = numpy.empty_like(outbuf)
+    # depth+1 buffers are rotated for each background stage
+    bufs = [numpy.empty((iobuflen,nao_pair)) for i in range(depth+1)]
+    outbufs = [numpy.empty((iobuflen,nkl_pair)) for i in range(depth+1)]
 
     log.debug('step2: kl-pair (ao %d, mo %d), mem %.8g MB, ioblock %.8g MB',
               nao_pair, nkl_pair, iobuflen*nao_pair*8/1e6,
               iobuflen*nkl_pair*8/1e6)
 
-    #klaoblks = len(fswap['0'])
-    ijmoblks = int(numpy.ceil(float(nij_pair)/iobuflen)) * comp
+    tasks = [(icomp, row0, row1)
+             for row0, row1 in prange(0, nij_pair, iobuflen)
+             for icomp in range(comp)]
+    ijmoblks = len(tasks)
     ao_loc = mol.ao_loc_nr('_cart' in intor)
     ti0 = time_1pass
-    istep = 0
-    with lib.call_in_background(load) as prefetch:
-        with lib.call_in_background(save) as async_write:
-            _load_from_h5g(fswap['0'], 0, min(nij_pair, iobuflen), buf_prefetch)
-
-            for row0, row1 in prange(0, nij_pair, iobuflen):
-                nrow = row1 - row0
-
-                for icomp in range(comp):
-                    istep += 1
-                    log.debug1('step 2 [%d/%d], [%d,%d:%d], row = %d',
-                               istep, ijmoblks, icomp, row0, row1, nrow)
-
-                    buf, buf_prefetch = buf_prefetch, buf
-                    prefetch(icomp, row0, row1, buf_prefetch)
-                    _ao2mo.nr_e2(buf[:nrow], mokl, klshape, aosym, klmosym,
-                                 ao_loc=ao_loc, out=outbuf)
-                    async_write(icomp, row0, row1, outbuf)
-                    outbuf, buf_write = buf_write, outbuf  # avoid flushing writing buffer
-
-                    ti1 = (logger.process_clock(), logger.perf_counter())
-                    log.debug1('step 2 [%d/%d] CPU time: %9.2f, Wall time: %9.2f',
-                               istep, ijmoblks, ti1[0]-ti0[0], ti1[1]-ti0[1])
-                    ti0 = ti1
+    t_e2 = 0
+    with lib.pipeline_stage(load, depth, name='read') as prefetch, \
+            lib.pipeline_stage(save, depth, name='write') as async_write:
+        for istep in range(min(depth, ijmoblks)):
+            prefetch(*tasks[istep], bufs[istep])
+
+        for istep, (icomp, row0, row1) in enumerate(tasks):
+            nrow = row1 - row0
+            log.debug1('step 2 [%d/%d], [%d,%d:%d], row = %d',
+                       istep+1, ijmoblks, icomp, row0, row1, nrow)
+
+            buf = prefetch.result()
+            if istep + depth < ijmoblks:
+                prefetch(*tasks[istep+depth], bufs[(istep+depth)%(depth+1)])
+            t0 = logger.perf_counter()
+            outbuf = outbufs[istep%(depth+1)]
+            _ao2mo.nr_e2(buf[:nrow], mokl, klshape, aosym, klmosym,
+                         ao_loc=ao_loc, out=outbuf)
+            t_e2 += logger.perf_counter() - t0
+            async_write(icomp, row0, row1, outbuf)
+
+            ti1 = (logger.process_clock(), logger.perf_counter())
+            log.debug1('step 2 [%d/%d] CPU time: %9.2f, Wall time: %9.2f',
+                       istep+1, ijmoblks, ti1[0]-ti0[0], ti1[1]-ti0[1])
+            ti0 = ti1
+    log.debug('step2 wall time: e2 transform %.2f s, %s, %s',
+              t_e2, prefetch.report(), async_write.report())
 
     fswap = None
     if isinstance(erifile, str):
@@ -415,8 +421,9 @@ def half_e1(mol, mo_coeffs, swapfile,
     e1buflen, mem_words, iobuf_words, ioblk_words = \
             guess_e1bufsize(max_memory, ioblk_size, nij_pair, nao_pair, comp)
     ioblk_size = ioblk_words * 8/1e6
+    depth = IO_PIPELINE_DEPTH
 # The buffer to hold AO integrals in C code, see line (@)
-    aobuflen = max(int((mem_words - 2*comp*e1buflen*nij_pair) // (nao_pair*comp)),
+    aobuflen = max(int((mem_words - (depth+1)*comp*e1buflen*nij_pair) // (nao_pair*comp)),
                    IOBUF_ROW_MIN)
     ao_loc = mol.ao_loc_nr('_cart' in intor)
     shranges = guess_shell_ranges(mol, (aosym in ('s4', 's2kl')), e1buflen,
@@ -428,8 +435,10 @@ def half_e1(mol, mo_coeffs, swapfile,
         else:
             ao2mopt = _ao2mo.AO2MOpt(mol, intor)
 
-    if isinstance(swapfile, h5py.Group):
+    if isinstance(swapfile, (h5py.Group, lib.MemmapGroup)):
         fswap = swapfile
+    elif lib.mmapfile.is_mmapfile(swapfile):
+        fswap = lib.MemmapFile(swapfile, 'a')
     else:
         fswap = lib.H5TmpFile(swapfile)
     for icomp in range(comp):
@@ -449,31 +458,37 @@ def half_e1(mol, mo_coeffs, swapfile,
 
     # transform e1
     ti0 = log.timer('Initializing ao2mo.outcore.half_e1', *time0)
-    with lib.call_in_background(save) as async_write:
+    t_int = t_e1 = 0
+    with lib.pipeline_stage(save, depth, name='write') as async_write:
         buf1 = numpy.empty((comp*e1buflen,nao_pair))
-        buf2 = numpy.empty((comp*e1buflen,nij_pair))
-        buf_write = numpy.empty_like(buf2)
+        # depth+1 buffers are rotated for the background writing
+        bufs = [numpy.empty((comp*e1buflen,nij_pair)) for i in range(depth+1)]
         fill = _ao2mo.nr_e1fill
         f_e1 = _ao2mo.nr_e1
         for istep,sh_range in enumerate(shranges):
             log.debug1('step 1 [%d/%d], AO [%d:%d], len(buf) = %d',
                        istep+1, nstep, *(sh_range[:3]))
             buflen = sh_range[2]
-            iobuf = numpy.ndarray((comp,buflen,nij_pair), buffer=buf2)
+            iobuf = numpy.ndarray((comp,buflen,nij_pair), buffer=bufs[istep%(depth+1)])
             nmic = len(sh_range[3])
             p1 = 0
             for imic, aoshs in enumerate(sh_range[3]):
                 log.debug2('      fill iobuf micro [%d/%d], AO [%d:%d], len(aobuf) = %d',
                            imic+1, nmic, *aoshs)
+                t0 = logger.perf_counter()
                 buf = fill(intor, aoshs, mol._atm, mol._bas, mol._env,
                            aosym, comp, ao2mopt, out=buf1).reshape(-1,nao_pair)
+                t1 = logger.perf_counter()
                 buf = f_e1(buf, moij, ijshape, aosym, ijmosym)
                 p0, p1 = p1, p1 + aoshs[2]
                 iobuf[:,p0:p1] = buf.reshape(comp,aoshs[2],nij_pair)
+                t_int += t1 - t0
+                t_e1 += logger.perf_counter() - t1
             ti0 = log.timer_debug1('gen AO/transform MO [%d/%d]'%(istep+1,nstep), *ti0)
 
             async_write(istep, iobuf)
-            buf2, buf_write = buf_write, buf2
+    log.debug('step1 wall time: AO integrals %.2f s, e1 transform %.2f s, %s',
+              t_int, t_e1, async_write.report())
 
     fswap = None
     return swapfile
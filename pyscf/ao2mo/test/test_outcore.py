@@ -99,6 +99,19 @@ class KnownValues(unittest.TestCase):
         with ao2mo.load(erifile, 'eri_mo') as eri:
             self.assertTrue(eri.size == 0)
 
+    def test_pipeline_depth(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        erifile = ftmp.name
+        mos = (mo[:,:8], mo[:,:6], mo[:,:8], mo[:,:6])
+        eriref = ao2mo.general(mol, mos, compact=False)
+        for depth in (1, 3):
+            with lib.temporary_env(ao2mo.outcore, IO_PIPELINE_DEPTH=depth):
+                ao2mo.outcore.general(mol, mos, erifile, dataname='eri_mo',
+                                      intor='int2e_sph', aosym='s4',
+                                      max_memory=1, ioblk_size=.01, compact=False)
+            with ao2mo.load(erifile, 'eri_mo') as eri1:
+                self.assertAlmostEqual(abs(eri1[:]-eriref).max(), 0, 9)
+
     def test_group_segs(self):
         numpy.random.seed(1)
         segs = numpy.asarray(numpy.random.random(40)*50, dtype=int)
@@ -24,6 +24,7 @@ RCCSD for real integrals
 
 
 import ctypes
+import functools
 from functools import reduce
 import numpy
 from pyscf import gto
@@ -71,7 +72,11 @@ def kernel(mycc, eris=None, t1=None, t2=None, max_cycle=50, tol=1e-8,
             callback(locals())
         tmpvec = mycc.amplitudes_to_vector(t1new, t2new)
         tmpvec -= mycc.amplitudes_to_vector(t1, t2)
-        normt = numpy.linalg.norm(tmpvec)
+        if tmpvec.dtype == numpy.float32:
+            # Accumulate in double precision for single precision amplitudes
+            normt = numpy.einsum('i,i->', tmpvec, tmpvec, dtype=numpy.float64)**.5
+        else:
+            normt = numpy.linalg.norm(tmpvec)
         tmpvec = None
         if mycc.iterative_damping < 1.0:
             alpha = mycc.iterative_damping
@@ -105,25 +110,34 @@ def update_amps(mycc, t1, t2, eris):
     mo_e_v = eris.mo_energy[nocc:] + mycc.level_shift
 
     t1new = numpy.zeros_like(t1)
-    t2new = mycc._add_vvvv(t1, t2, eris, t2sym='jiba')
-    t2new *= .5  # *.5 because t2+t2.transpose(1,0,3,2) in the end
-    time1 = log.timer_debug1('vvvv', *time0)
+    # The first tiles of ovvv are loaded in background while the vvvv
+    # contraction is running. The memory of t2new is reserved for blksize.
+    max_memory = mycc.max_memory - lib.current_memory()[0] - t2.size*8e-6
+    ovvv_blksize = _ovvv_blksize(mycc, nocc, nvir, max_memory)
+    with _OvvvStream(mycc, eris, ovvv_blksize) as ovvv_stream:
+        # The ovvv buffers are not fully counted by current_memory until they
+        # are filled. Exclude them from the memory of the vvvv blocks.
+        with lib.temporary_env(mycc, max_memory=mycc.max_memory-ovvv_stream.memory):
+            t2new = mycc._add_vvvv(t1, t2, eris, t2sym='jiba')
+        t2new *= .5  # *.5 because t2+t2.transpose(1,0,3,2) in the end
+        time1 = log.timer_debug1('vvvv', *time0)
 
 #** make_inter_F
-    fov = fock[:nocc,nocc:].copy()
-    t1new += fov
+        fov = fock[:nocc,nocc:].copy()
+        t1new += fov
 
-    foo = fock[:nocc,:nocc] - numpy.diag(mo_e_o)
-    foo += .5 * numpy.einsum('ia,ja->ij', fock[:nocc,nocc:], t1)
+        foo = fock[:nocc,:nocc] - numpy.diag(mo_e_o)
+        foo += .5 * numpy.einsum('ia,ja->ij', fock[:nocc,nocc:], t1)
 
-    fvv = fock[nocc:,nocc:] - numpy.diag(mo_e_v)
-    fvv -= .5 * numpy.einsum('ia,ib->ab', t1, fock[:nocc,nocc:])
+        fvv = fock[nocc:,nocc:] - numpy.diag(mo_e_v)
+        fvv -= .5 * numpy.einsum('ia,ib->ab', t1, fock[:nocc,nocc:])
 
-    if mycc.incore_complete:
-        fswap = None
-    else:
-        fswap = lib.H5TmpFile()
-    fwVOov, fwVooV = _add_ovvv_(mycc, t1, t2, eris, fvv, t1new, t2new, fswap)
+        if mycc.incore_complete:
+            fswap = None
+        else:
+            fswap = lib.H5TmpFile()
+        fwVOov, fwVooV = _add_ovvv_(mycc, t1, t2, eris, fvv, t1new, t2new,
+                                    fswap, ovvv_stream)
     time1 = log.timer_debug1('ovvv', *time1)
 
     woooo = numpy.asarray(eris.oooo).transpose(0,2,1,3).copy()
@@ -276,68 +290,133 @@ def update_amps(mycc, t1, t2, eris):
     return t1new, t2new
 
 
-def _add_ovvv_(mycc, t1, t2, eris, fvv, t1new, t2new, fswap):
+def _prefetch_depth(mycc):
+    '''Number of integral tiles loaded ahead. _add_vvvv is shared with other
+    methods (e.g. CISD) which may not define prefetch_depth.'''
+    if not mycc.async_io:
+        return 1
+    return max(1, getattr(mycc, 'prefetch_depth', 1))
+
+def _ovvv_blksize(mycc, nocc, nvir, max_memory):
+    '''The number of virtual orbitals in each tile of ovvv'''
+    nvir_pair = nvir * (nvir+1) // 2
+    # Two ovvv buffers are included in unit. One more buffer for each
+    # additional prefetched tile.
+    depth = _prefetch_depth(mycc)
+    unit = nocc*nvir**2*3 + nocc**2*nvir + 2 + nocc*nvir_pair*(depth-1)
+    wooVV_size = nocc**2*nvir_pair
+    if mycc.direct:
+        blksize = int((max_memory*.95e6/8-wooVV_size)/unit)
+    else:
+        unit += nocc*nvir**2 + nocc*nvir
+        blksize = int((max_memory*.95e6/8-wooVV_size-nocc**2*nvir)/unit)
+    return min(nvir, max(BLKMIN, blksize))
+
+class _OvvvStream(object):
+    '''Stream the tiles eris.ovvv[:,p0:p1].transpose(1,0,2) through a ring
+    of depth+1 buffers. Loading starts when entering the context so that the
+    I/O of ovvv can be overlapped with the operations ahead of _add_ovvv_.
+
+    Attributes:
+        memory : float
+            Memory in MB of the buffers
+        timings : list of (p0, p1, seconds) for loading each tile
+    '''
+    def __init__(self, mycc, eris, blksize):
+        nocc, nvir, nvir_pair = eris.ovvv.shape
+        self.depth = _prefetch_depth(mycc)
+        self.eris = eris
+        self.blksize = blksize
+        self.tiles = list(lib.prange(0, nvir, blksize))
+        self.bufs = [numpy.empty((blksize,nocc,nvir_pair))
+                     for i in range(min(self.depth+1, len(self.tiles)))]
+        # Memory (in MB) of the buffers
+        self.memory = len(self.bufs) * blksize*nocc*nvir_pair * 8e-6
+        self.timings = []
+        self.stage = lib.pipeline_stage(self._load, self.depth,
+                                        sync=not mycc.async_io, name='ovvv')
+
+    def _load(self, k):
+        t0 = logger.perf_counter()
+        p0, p1 = self.tiles[k]
+        buf = self.bufs[k % len(self.bufs)][:p1-p0]
+        buf[:] = self.eris.ovvv[:,p0:p1].transpose(1,0,2)
+        self.timings.append((p0, p1, logger.perf_counter() - t0))
+        return buf
+
+    def __enter__(self):
+        self.stage.__enter__()
+        for k in range(min(self.depth, len(self.tiles))):
+            self.stage(k)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return self.stage.__exit__(type, value, traceback)
+
+    def __iter__(self):
+        '''Yield (p0, p1, tile). The tile must be consumed before the next
+        iteration.'''
+        ntiles = len(self.tiles)
+        for k, (p0, p1) in enumerate(self.tiles):
+            buf = self.stage.result()
+            # The buffer of tile k-1 is reused for tile k+depth
+            if k + self.depth < ntiles:
+                self.stage(k + self.depth)
+            yield p0, p1, buf
+
+def _add_ovvv_(mycc, t1, t2, eris, fvv, t1new, t2new, fswap, ovvv_stream=None):
     time1 = logger.process_clock(), logger.perf_counter()
     log = logger.Logger(mycc.stdout, mycc.verbose)
     nocc, nvir = t1.shape
     nvir_pair = nvir * (nvir+1) // 2
 
+    if ovvv_stream is None:
+        max_memory = mycc.max_memory - lib.current_memory()[0]
+        blksize = _ovvv_blksize(mycc, nocc, nvir, max_memory)
+        with _OvvvStream(mycc, eris, blksize) as ovvv_stream:
+            return _add_ovvv_(mycc, t1, t2, eris, fvv, t1new, t2new, fswap,
+                              ovvv_stream)
+
     if fswap is None:
         wVOov = numpy.zeros((nvir,nocc,nocc,nvir))
     else:
         wVOov = fswap.create_dataset('wVOov', (nvir,nocc,nocc,nvir), 'f8')
     wooVV = numpy.zeros((nocc,nocc*nvir_pair))
 
-    max_memory = mycc.max_memory - lib.current_memory()[0]
-    unit = nocc*nvir**2*3 + nocc**2*nvir + 2
-    blksize = min(nvir, max(BLKMIN, int((max_memory*.95e6/8-wooVV.size)/unit)))
-    if not mycc.direct:
-        unit = nocc*nvir**2*3 + nocc**2*nvir + 2 + nocc*nvir**2 + nocc*nvir
-        blksize = min(nvir, max(BLKMIN, int((max_memory*.95e6/8-wooVV.size-nocc**2*nvir)/unit)))
-    log.debug1('max_memory %d MB,  nocc,nvir = %d,%d  blksize = %d',
-               max_memory, nocc, nvir, blksize)
-
-    def load_ovvv(buf, p0):
-        if p0 < nvir:
-            p1 = min(nvir, p0+blksize)
-            buf[:p1-p0] = eris.ovvv[:,p0:p1].transpose(1,0,2)
-
-    with lib.call_in_background(load_ovvv, sync=not mycc.async_io) as prefetch:
-        buf = numpy.empty((blksize,nocc,nvir_pair))
-        buf_prefetch = numpy.empty((blksize,nocc,nvir_pair))
-
-        load_ovvv(buf_prefetch, 0)
-        for p0, p1 in lib.prange(0, nvir, blksize):
-            buf, buf_prefetch = buf_prefetch, buf
-            prefetch(buf_prefetch, p1)
-
-            eris_vovv = buf[:p1-p0]
-
-            #:wooVV -= numpy.einsum('jc,ciba->jiba', t1[:,p0:p1], eris_vovv)
-            lib.ddot(numpy.asarray(t1[:,p0:p1], order='C'),
-                     eris_vovv.reshape(p1-p0,-1), -1, wooVV, 1)
-
-            eris_vovv = lib.unpack_tril(eris_vovv.reshape((p1-p0)*nocc,nvir_pair))
-            eris_vovv = eris_vovv.reshape(p1-p0,nocc,nvir,nvir)
-
-            fvv += 2*numpy.einsum('kc,ckab->ab', t1[:,p0:p1], eris_vovv)
-            fvv[:,p0:p1] -= numpy.einsum('kc,bkca->ab', t1, eris_vovv)
-
-            if not mycc.direct:
-                vvvo = eris_vovv.transpose(0,2,3,1).copy()
-                for i in range(nocc):
-                    tau = t2[i,:,p0:p1] + numpy.einsum('a,jb->jab', t1[i,p0:p1], t1)
-                    tmp = lib.einsum('jcd,cdbk->jbk', tau, vvvo)
-                    t2new[i] -= lib.einsum('ka,jbk->jab', t1, tmp)
-                    tau = tmp = None
-
-            wVOov[p0:p1] = lib.einsum('biac,jc->bija', eris_vovv, t1)
-
-            theta = t2[:,:,p0:p1].transpose(1,2,0,3) * 2
-            theta -= t2[:,:,p0:p1].transpose(0,2,1,3)
-            t1new += lib.einsum('icjb,cjba->ia', theta, eris_vovv)
-            theta = None
-            time1 = log.timer_debug1('vovv [%d:%d]'%(p0, p1), *time1)
+    blksize = ovvv_stream.blksize
+    log.debug1('nocc,nvir = %d,%d  blksize = %d  prefetch depth = %d',
+               nocc, nvir, blksize, ovvv_stream.depth)
+
+    for p0, p1, eris_vovv in ovvv_stream:
+        #:wooVV -= numpy.einsum('jc,ciba->jiba', t1[:,p0:p1], eris_vovv)
+        lib.ddot(numpy.asarray(t1[:,p0:p1], order='C'),
+                 eris_vovv.reshape(p1-p0,-1), -1, wooVV, 1)
+
+        eris_vovv = lib.unpack_tril(eris_vovv.reshape((p1-p0)*nocc,nvir_pair))
+        eris_vovv = eris_vovv.reshape(p1-p0,nocc,nvir,nvir)
+
+        fvv += 2*numpy.einsum('kc,ckab->ab', t1[:,p0:p1], eris_vovv)
+        fvv[:,p0:p1] -= numpy.einsum('kc,bkca->ab', t1, eris_vovv)
+
+        if not mycc.direct:
+            vvvo = eris_vovv.transpose(0,2,3,1).copy()
+            for i in range(nocc):
+                tau = t2[i,:,p0:p1] + numpy.einsum('a,jb->jab', t1[i,p0:p1], t1)
+                tmp = lib.einsum('jcd,cdbk->jbk', tau, vvvo)
+                t2new[i] -= lib.einsum('ka,jbk->jab', t1, tmp)
+                tau = tmp = None
+
+        wVOov[p0:p1] = lib.einsum('biac,jc->bija', eris_vovv, t1)
+
+        theta = t2[:,:,p0:p1].transpose(1,2,0,3) * 2
+        theta -= t2[:,:,p0:p1].transpose(0,2,1,3)
+        t1new += lib.einsum('icjb,cjba->ia', theta, eris_vovv)
+        theta = None
+        time1 = log.timer_debug1('vovv [%d:%d]'%(p0, p1), *time1)
+    if log.verbose >= logger.DEBUG1:
+        for p0, p1, t in ovvv_stream.timings:
+            log.debug1('load ovvv [%d:%d] %.2f s', p0, p1, t)
+        log.debug1('%s', ovvv_stream.stage.report())
 
     if fswap is None:
         wooVV = lib.unpack_tril(wooVV.reshape(nocc**2,nvir_pair))
@@ -564,8 +643,9 @@ def _contract_s4vvvv_t2(mycc, mol, vvvv, t2, out=None, verbose=None):
         unit = nvira*nvir_pair*2 + nvirb**2*nvira/4 + 1
 
         if mycc.async_io:
-            fmap = lib.map_with_prefetch
-            unit += nvira*nvir_pair
+            depth = _prefetch_depth(mycc)
+            fmap = functools.partial(lib.map_with_prefetch, depth=depth)
+            unit += nvira*nvir_pair*depth
         else:
             fmap = map
 
@@ -863,6 +943,10 @@ class CCSD(lib.StreamObject):
             AO-direct CCSD. Default is False.
         async_io : bool
             Allow for asynchronous function execution. Default is True.
+        prefetch_depth : int
+            Number of ovvv and vvvv tiles loaded ahead of the contraction
+            when async_io is enabled. Each additional tile costs the memory
+            of one integral block. Default is 1.
         incore_complete : bool
             Avoid all I/O (also for DIIS). Default is False.
         level_shift : float
@@ -915,6 +999,7 @@ class CCSD(lib.StreamObject):
 
     direct = getattr(__config__, 'cc_ccsd_CCSD_direct', False)
     async_io = getattr(__config__, 'cc_ccsd_CCSD_async_io', True)
+    prefetch_depth = getattr(__config__, 'cc_ccsd_CCSD_prefetch_depth', 1)
     incore_complete = getattr(__config__, 'cc_ccsd_CCSD_incore_complete', False)
     cc2 = getattr(__config__, 'cc_ccsd_CCSD_cc2', False)
 
@@ -970,7 +1055,7 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
         keys = set(('max_cycle', 'conv_tol', 'iterative_damping',
                     'conv_tol_normt', 'diis', 'diis_space', 'diis_file',
                     'diis_start_cycle', 'diis_start_energy_diff', 'direct',
-                    'async_io', 'incore_complete', 'cc2'))
+                    'async_io', 'prefetch_depth', 'incore_complete', 'cc2'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     @property
@@ -21,17 +21,46 @@ RHF-CCSD(T) for real integrals
 '''
 
 
+import os
 import ctypes
+import json
+import queue
+import traceback
+import multiprocessing
 import numpy
 from pyscf import lib
 from pyscf import symm
 from pyscf.lib import logger
 from pyscf.cc import _ccsd
+from pyscf import __config__
+
+# Number of worker processes for the (T) contraction
+NPROC = getattr(__config__, 'cc_ccsd_t_nproc', 1)
 
 # t3 as ijkabc
 
 # JCP 94, 442 (1991); DOI:10.1063/1.460359.  Error in Eq (1), should be [ia] >= [jb] >= [kc]
-def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE):
+def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE, nproc=None,
+           journal=None):
+    '''CCSD(T) correction
+
+    Kwargs:
+        nproc : int
+            Number of local worker processes. Each worker evaluates the
+            (a,b,c) virtual blocks handed out from a task queue. The sorted
+            integrals are shared by the workers through a memory-mapped
+            file. Default is 1 (running in the current process).
+        journal : str
+            A directory to store the sorted integrals and the energies of
+            the completed blocks. If the calculation is interrupted, calling
+            kernel again with the same journal resumes the calculation from
+            the unfinished blocks.
+    '''
+    if nproc is None:
+        nproc = NPROC
+    if nproc > 1 or journal is not None:
+        return kernel_mp(mycc, eris, t1, t2, verbose, nproc, journal)
+
     cpu1 = cpu0 = (logger.process_clock(), logger.perf_counter())
     log = logger.new_logger(mycc, verbose)
     if t1 is None: t1 = mycc.t1
@@ -55,43 +84,11 @@ def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE):
     cpu1 = log.timer_debug1('CCSD(T) sort_eri', *cpu1)
 
     cpu2 = list(cpu1)
-    orbsym = numpy.hstack((numpy.sort(orbsym[:nocc]),numpy.sort(orbsym[nocc:])))
-    o_ir_loc = numpy.append(0, numpy.cumsum(numpy.bincount(orbsym[:nocc], minlength=8)))
-    v_ir_loc = numpy.append(0, numpy.cumsum(numpy.bincount(orbsym[nocc:], minlength=8)))
-    o_sym = orbsym[:nocc]
-    oo_sym = (o_sym[:,None] ^ o_sym).ravel()
-    oo_ir_loc = numpy.append(0, numpy.cumsum(numpy.bincount(oo_sym, minlength=8)))
-    nirrep = max(oo_sym) + 1
-
-    orbsym   = orbsym.astype(numpy.int32)
-    o_ir_loc = o_ir_loc.astype(numpy.int32)
-    v_ir_loc = v_ir_loc.astype(numpy.int32)
-    oo_ir_loc = oo_ir_loc.astype(numpy.int32)
-    if dtype == numpy.complex128:
-        drv = _ccsd.libcc.CCsd_t_zcontract
-    else:
-        drv = _ccsd.libcc.CCsd_t_contract
+    orbsym, o_ir_loc, v_ir_loc, oo_ir_loc = _irrep_locs(orbsym, nocc)
+    args = (mo_energy, t1T, t2T, vooo, fvo, orbsym, o_ir_loc, v_ir_loc, oo_ir_loc)
     et_sum = numpy.zeros(1, dtype=dtype)
     def contract(a0, a1, b0, b1, cache):
-        cache_row_a, cache_col_a, cache_row_b, cache_col_b = cache
-        drv(et_sum.ctypes.data_as(ctypes.c_void_p),
-            mo_energy.ctypes.data_as(ctypes.c_void_p),
-            t1T.ctypes.data_as(ctypes.c_void_p),
-            t2T.ctypes.data_as(ctypes.c_void_p),
-            vooo.ctypes.data_as(ctypes.c_void_p),
-            fvo.ctypes.data_as(ctypes.c_void_p),
-            ctypes.c_int(nocc), ctypes.c_int(nvir),
-            ctypes.c_int(a0), ctypes.c_int(a1),
-            ctypes.c_int(b0), ctypes.c_int(b1),
-            ctypes.c_int(nirrep),
-            o_ir_loc.ctypes.data_as(ctypes.c_void_p),
-            v_ir_loc.ctypes.data_as(ctypes.c_void_p),
-            oo_ir_loc.ctypes.data_as(ctypes.c_void_p),
-            orbsym.ctypes.data_as(ctypes.c_void_p),
-            cache_row_a.ctypes.data_as(ctypes.c_void_p),
-            cache_col_a.ctypes.data_as(ctypes.c_void_p),
-            cache_row_b.ctypes.data_as(ctypes.c_void_p),
-            cache_col_b.ctypes.data_as(ctypes.c_void_p))
+        _contract_block(et_sum, args, a0, a1, b0, b1, cache)
         cpu2[:] = log.timer_debug1('contract %d:%d,%d:%d'%(a0,a1,b0,b1), *cpu2)
 
     # The rest 20% memory for cache b
@@ -131,6 +128,295 @@ def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE):
     log.note('CCSD(T) correction = %.15g', et)
     return et
 
+def kernel_mp(mycc, eris, t1=None, t2=None, verbose=logger.NOTE, nproc=None,
+              journal=None):
+    '''CCSD(T) correction evaluated by local worker processes.
+
+    The sorted integrals and amplitudes are stored in a memory-mapped file
+    which is shared by all workers. The (a,b,c) virtual blocks are handed out
+    from a task queue. The energy of each completed block is appended to a
+    journal. When a journal directory is given, the sorted data and the
+    journal are kept in the directory so that an interrupted calculation can
+    be resumed without recomputing the completed blocks.
+
+    Worker processes are started with the "spawn" method. The main script
+    needs to be guarded by `if __name__ == '__main__':`.
+    '''
+    cpu1 = cpu0 = (logger.process_clock(), logger.perf_counter())
+    log = logger.new_logger(mycc, verbose)
+    if t1 is None: t1 = mycc.t1
+    if t2 is None: t2 = mycc.t2
+    if nproc is None:
+        nproc = NPROC
+    nproc = max(1, nproc)
+
+    nocc, nvir = t1.shape
+    nmo = nocc + nvir
+    dtype = numpy.result_type(t1, t2, eris.ovoo.dtype)
+    fingerprint = [[complex(lib.fp(x)).real, complex(lib.fp(x)).imag]
+                   for x in (t1, t2, eris.mo_energy)]
+
+    if journal is None:
+        storage = lib.MemmapTmpFile(dir=lib.param.TMPDIR)
+        header = None
+        journal_file = None
+    else:
+        if not os.path.isdir(journal):
+            os.makedirs(journal)
+        journal_file = os.path.join(journal, 'journal')
+        header, done = _load_journal(journal_file)
+        if header is not None:
+            if (header['nocc'] != nocc or header['nvir'] != nvir or
+                header['dtype'] != numpy.dtype(dtype).name or
+                not numpy.allclose(header['fingerprint'], fingerprint,
+                                   rtol=1e-10, atol=1e-12)):
+                raise RuntimeError('CCSD(T) journal %s was created for a different '
+                                   'system or different amplitudes' % journal)
+            _rewrite_journal(journal_file, header, done)
+            storage = lib.MemmapFile(os.path.join(journal, 'data'), 'r')
+            log.info('Resume CCSD(T) from journal %s. %d of %d blocks done',
+                     journal, len(done), len(header['tasks']))
+        else:
+            storage = lib.MemmapFile(os.path.join(journal, 'data'), 'w')
+
+    if header is None:
+        eris_vvop = storage.create_dataset('vvop', (nvir,nvir,nocc,nmo), dtype)
+        orbsym = _sort_eri(mycc, eris, nocc, nvir, eris_vvop, log)
+        mo_energy, t1T, t2T, vooo, fvo, restore_t2_inplace = \
+                _sort_t2_vooo_(mycc, orbsym, t1, t2, eris)
+        orbsym, o_ir_loc, v_ir_loc, oo_ir_loc = _irrep_locs(orbsym, nocc)
+        for key, val in (('mo_energy', mo_energy), ('t1T', t1T), ('t2T', t2T),
+                         ('vooo', vooo), ('fvo', fvo), ('orbsym', orbsym),
+                         ('o_ir_loc', o_ir_loc), ('v_ir_loc', v_ir_loc),
+                         ('oo_ir_loc', oo_ir_loc)):
+            storage.create_dataset(key, data=val).flush()
+        t2 = restore_t2_inplace(t2T)
+        eris_vvop.flush()
+        mo_energy = t1T = t2T = vooo = fvo = eris_vvop = None
+        cpu1 = log.timer_debug1('CCSD(T) sort_eri', *cpu1)
+
+        # Each worker holds its own caches of the integral blocks
+        mem_now = lib.current_memory()[0]
+        max_memory = max(0, mycc.max_memory - mem_now) / nproc
+        nthreads = max(1, lib.num_threads() // nproc)
+        bufsize = (max_memory*.5e6/8-nocc**3*3*nthreads)/(nocc*nmo)
+        bufsize *= .5  #*.5 upper triangular part is loaded
+        bufsize *= .8  #*.8 for [a0:a1]/[b0:b1] partition
+        bufsize = max(8, bufsize)
+        tasks = []
+        for a0, a1 in reversed(list(lib.prange_tril(0, nvir, bufsize))):
+            tasks.append((a0, a1, a0, a1))
+            for b0, b1 in lib.prange_tril(0, a0, bufsize/8):
+                tasks.append((a0, a1, b0, b1))
+        header = {'nocc': nocc, 'nvir': nvir, 'dtype': numpy.dtype(dtype).name,
+                  'fingerprint': fingerprint, 'tasks': tasks}
+        done = {}
+        if journal_file is not None:
+            # The header is written after all sorted data are on disk.
+            storage.flush()
+            with open(journal_file, 'w') as f:
+                f.write(json.dumps(header) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            lib.mmapfile._fsync(journal)
+
+    tasks = [tuple(x) for x in header['tasks']]
+    todo = [k for k in range(len(tasks)) if k not in done]
+    log.debug('CCSD(T) %d blocks, %d to compute with %d processes',
+              len(tasks), len(todo), nproc)
+
+    def record(k, e):
+        done[k] = e
+        if journal_file is not None:
+            with open(journal_file, 'a') as f:
+                f.write('%d %s %s\n' % (k, float.hex(e.real), float.hex(e.imag)))
+                f.flush()
+                os.fsync(f.fileno())
+        log.debug1('CCSD(T) block %d:%d,%d:%d done (%d/%d)',
+                   *tasks[k], len(done), len(tasks))
+
+    try:
+        if nproc == 1:
+            contract = _BlockContraction(storage.path)
+            for k in todo:
+                record(k, contract(*tasks[k]))
+            contract = None
+        else:
+            _run_workers(storage.path, tasks, todo, nproc, record)
+    finally:
+        storage.close()
+
+    et_sum = sum(done[k] for k in range(len(tasks))) * 2
+    if abs(et_sum.imag) > 1e-4:
+        logger.warn(mycc, 'Non-zero imaginary part of CCSD(T) energy was found %s',
+                    et_sum)
+    et = et_sum.real
+    log.timer('CCSD(T)', *cpu0)
+    log.note('CCSD(T) correction = %.15g', et)
+    return et
+
+def _load_journal(journal_file):
+    '''Read the header and the energies of the completed blocks'''
+    if not os.path.isfile(journal_file):
+        return None, {}
+    with open(journal_file, 'r') as f:
+        lines = f.readlines()
+    try:
+        header = json.loads(lines[0])
+    except (IndexError, ValueError):
+        return None, {}
+    done = {}
+    for line in lines[1:]:
+        # A line may be incomplete if the job was killed during writing
+        if not line.endswith('\n'):
+            break
+        try:
+            k, er, ei = line.split()
+            done[int(k)] = complex(float.fromhex(er), float.fromhex(ei))
+        except ValueError:
+            break
+    return header, done
+
+def _rewrite_journal(journal_file, header, done):
+    '''Drop the incomplete records before appending new records'''
+    tmpfile = journal_file + '.tmp'
+    with open(tmpfile, 'w') as f:
+        f.write(json.dumps(header) + '\n')
+        for k, e in done.items():
+            f.write('%d %s %s\n' % (k, float.hex(e.real), float.hex(e.imag)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmpfile, journal_file)
+    lib.mmapfile._fsync(os.path.dirname(journal_file))
+
+class _BlockContraction(object):
+    '''Evaluate the (T) energy of a virtual block using the sorted data
+    stored in a memory-mapped file'''
+    def __init__(self, path):
+        self.storage = lib.MemmapFile(path, 'r')
+        self.vvop = self.storage['vvop']
+        self.args = [numpy.asarray(self.storage[key]) for key in
+                     ('mo_energy', 't1T', 't2T', 'vooo', 'fvo', 'orbsym',
+                      'o_ir_loc', 'v_ir_loc', 'oo_ir_loc')]
+        self.cache_a = (None, None)
+
+    def _load_cache(self, a0, a1):
+        vvop = self.vvop
+        cache_row = numpy.asarray(vvop[a0:a1,:a1], order='C')
+        if a0 == 0:
+            cache_col = cache_row
+        else:
+            cache_col = numpy.asarray(vvop[:a0,a0:a1], order='C')
+        return cache_row, cache_col
+
+    def __call__(self, a0, a1, b0, b1):
+        # Blocks of the same a0:a1 are usually evaluated one after another
+        if self.cache_a[0] != (a0, a1):
+            self.cache_a = ((a0, a1), self._load_cache(a0, a1))
+        cache_row_a, cache_col_a = self.cache_a[1]
+        if a0 == b0:
+            cache_row_b, cache_col_b = cache_row_a, cache_col_a
+        else:
+            cache_row_b, cache_col_b = self._load_cache(b0, b1)
+        et_sum = numpy.zeros(1, dtype=self.vvop.dtype)
+        _contract_block(et_sum, self.args, a0, a1, b0, b1,
+                        (cache_row_a, cache_col_a, cache_row_b, cache_col_b))
+        return complex(et_sum[0])
+
+def _worker(path, nthreads, task_queue, result_queue):
+    lib.num_threads(nthreads)
+    try:
+        contract = _BlockContraction(path)
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            k, blk = task
+            result_queue.put((k, contract(*blk)))
+    except BaseException:
+        result_queue.put((-1, traceback.format_exc()))
+
+def _run_workers(path, tasks, todo, nproc, callback):
+    ctx = multiprocessing.get_context('spawn')
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    for k in todo:
+        task_queue.put((k, tasks[k]))
+    for i in range(nproc):
+        task_queue.put(None)
+
+    nthreads = max(1, lib.num_threads() // nproc)
+    procs = [ctx.Process(target=_worker,
+                         args=(path, nthreads, task_queue, result_queue))
+             for i in range(nproc)]
+    for p in procs:
+        p.start()
+    try:
+        ndone = 0
+        while ndone < len(todo):
+            try:
+                k, e = result_queue.get(timeout=1)
+            except queue.Empty:
+                if any(p.exitcode not in (None, 0) for p in procs):
+                    raise RuntimeError('CCSD(T) worker process terminated unexpectedly')
+                continue
+            if k < 0:
+                raise RuntimeError('CCSD(T) worker failed\n%s' % e)
+            callback(k, e)
+            ndone += 1
+        for p in procs:
+            p.join()
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+                p.join()
+
+def _irrep_locs(orbsym, nocc):
+    orbsym = numpy.hstack((numpy.sort(orbsym[:nocc]),numpy.sort(orbsym[nocc:])))
+    o_ir_loc = numpy.append(0, numpy.cumsum(numpy.bincount(orbsym[:nocc], minlength=8)))
+    v_ir_loc = numpy.append(0, numpy.cumsum(numpy.bincount(orbsym[nocc:], minlength=8)))
+    o_sym = orbsym[:nocc]
+    oo_sym = (o_sym[:,None] ^ o_sym).ravel()
+    oo_ir_loc = numpy.append(0, numpy.cumsum(numpy.bincount(oo_sym, minlength=8)))
+
+    orbsym   = orbsym.astype(numpy.int32)
+    o_ir_loc = o_ir_loc.astype(numpy.int32)
+    v_ir_loc = v_ir_loc.astype(numpy.int32)
+    oo_ir_loc = oo_ir_loc.astype(numpy.int32)
+    return orbsym, o_ir_loc, v_ir_loc, oo_ir_loc
+
+def _contract_block(et_sum, args, a0, a1, b0, b1, cache):
+    '''Add the (T) energy of the virtual block [a0:a1,b0:b1] to et_sum'''
+    mo_energy, t1T, t2T, vooo, fvo, orbsym, o_ir_loc, v_ir_loc, oo_ir_loc = args
+    nvir, nocc = t1T.shape
+    o_sym = orbsym[:nocc]
+    nirrep = max((o_sym[:,None] ^ o_sym).ravel()) + 1
+    if et_sum.dtype == numpy.complex128:
+        drv = _ccsd.libcc.CCsd_t_zcontract
+    else:
+        drv = _ccsd.libcc.CCsd_t_contract
+    cache_row_a, cache_col_a, cache_row_b, cache_col_b = cache
+    drv(et_sum.ctypes.data_as(ctypes.c_void_p),
+        mo_energy.ctypes.data_as(ctypes.c_void_p),
+        t1T.ctypes.data_as(ctypes.c_void_p),
+        t2T.ctypes.data_as(ctypes.c_void_p),
+        vooo.ctypes.data_as(ctypes.c_void_p),
+        fvo.ctypes.data_as(ctypes.c_void_p),
+        ctypes.c_int(nocc), ctypes.c_int(nvir),
+        ctypes.c_int(a0), ctypes.c_int(a1),
+        ctypes.c_int(b0), ctypes.c_int(b1),
+        ctypes.c_int(nirrep),
+        o_ir_loc.ctypes.data_as(ctypes.c_void_p),
+        v_ir_loc.ctypes.data_as(ctypes.c_void_p),
+        oo_ir_loc.ctypes.data_as(ctypes.c_void_p),
+        orbsym.ctypes.data_as(ctypes.c_void_p),
+        cache_row_a.ctypes.data_as(ctypes.c_void_p),
+        cache_col_a.ctypes.data_as(ctypes.c_void_p),
+        cache_row_b.ctypes.data_as(ctypes.c_void_p),
+        cache_col_b.ctypes.data_as(ctypes.c_void_p))
+    return et_sum
+
 def _sort_eri(mycc, eris, nocc, nvir, vvop, log):
     cpu1 = (logger.process_clock(), logger.perf_counter())
     mol = mycc.mol
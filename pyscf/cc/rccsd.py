@@ -47,14 +47,21 @@ def update_amps(cc, t1, t2, eris):
     fock = eris.fock
     mo_e_o = eris.mo_energy[:nocc]
     mo_e_v = eris.mo_energy[nocc:] + cc.level_shift
+    if t2.dtype == np.float32:
+        # Cast the small double precision intermediates. Otherwise numpy
+        # promotes the contractions with the single precision amplitudes
+        # and integrals to double precision.
+        fock = fock.astype(np.float32)
+        mo_e_o = mo_e_o.astype(np.float32)
+        mo_e_v = mo_e_v.astype(np.float32)
 
     fov = fock[:nocc,nocc:].copy()
     foo = fock[:nocc,:nocc].copy()
     fvv = fock[nocc:,nocc:].copy()
 
-    Foo = imd.cc_Foo(t1,t2,eris)
-    Fvv = imd.cc_Fvv(t1,t2,eris)
-    Fov = imd.cc_Fov(t1,t2,eris)
+    Foo = imd.cc_Foo(t1,t2,eris).astype(t2.dtype, copy=False)
+    Fvv = imd.cc_Fvv(t1,t2,eris).astype(t2.dtype, copy=False)
+    Fov = imd.cc_Fov(t1,t2,eris).astype(t2.dtype, copy=False)
 
     # Move energy terms to the other side
     Foo[np.diag_indices(nocc)] -= mo_e_o
@@ -110,8 +117,8 @@ def update_amps(cc, t1, t2, eris):
         tmp = lib.einsum('ki,kjab->ijab', Loo2, t2)
         t2new -= (tmp + tmp.transpose(1,0,3,2))
     else:
-        Loo = imd.Loo(t1, t2, eris)
-        Lvv = imd.Lvv(t1, t2, eris)
+        Loo = imd.Loo(t1, t2, eris).astype(t2.dtype, copy=False)
+        Lvv = imd.Lvv(t1, t2, eris).astype(t2.dtype, copy=False)
         Loo[np.diag_indices(nocc)] -= mo_e_o
         Lvv[np.diag_indices(nvir)] -= mo_e_v
 
@@ -155,8 +162,10 @@ def energy(cc, t1=None, t2=None, eris=None):
     tau = np.einsum('ia,jb->ijab',t1,t1)
     tau += t2
     eris_ovov = np.asarray(eris.ovov)
-    e += 2*np.einsum('ijab,iajb', tau, eris_ovov)
-    e +=  -np.einsum('ijab,ibja', tau, eris_ovov)
+    # Accumulate in double precision for single precision amplitudes
+    dtype = np.result_type(tau, eris_ovov, np.float64)
+    e += 2*np.einsum('ijab,iajb', tau, eris_ovov, dtype=dtype)
+    e +=  -np.einsum('ijab,ibja', tau, eris_ovov, dtype=dtype)
     if abs(e.imag) > 1e-4:
         logger.warn(cc, 'Non-zero imaginary part found in RCCSD energy %s', e)
     return e.real
@@ -166,8 +175,34 @@ class RCCSD(ccsd.CCSD):
     '''restricted CCSD with IP-EOM, EA-EOM, EE-EOM, and SF-EOM capabilities
 
     Ground-state CCSD is performed in optimized ccsd.CCSD and EOM is performed here.
+
+    Attributes:
+        mixed_precision : bool
+            Whether to store the MO integrals in single precision. The
+            amplitudes are stored in single precision too until the CCSD
+            equations are converged to mixed_precision_conv_tol. The
+            amplitudes are then refined in double precision against the same
+            single precision integrals. The correlation energy and the norm
+            of the residual are always accumulated in double precision. The
+            integrals take half of the memory (or disk) of the double
+            precision calculation. The rounding error of the integrals (about
+            1e-7 relative) limits the accuracy of the correlation energy to
+            about 1e-7 relative. Mixed precision is only applied to the
+            integrals generated by ao2mo. If double precision eris are given
+            to kernel, the calculation runs in double precision.
+            Default is False.
+        mixed_precision_conv_tol : float
+            Convergence threshold of norm(t1,t2) of the single precision
+            iterations. Default is 1e-4.
     '''
 
+    mixed_precision = getattr(__config__, 'cc_rccsd_RCCSD_mixed_precision', False)
+    mixed_precision_conv_tol = getattr(__config__, 'cc_rccsd_RCCSD_mixed_precision_conv_tol', 1e-4)
+
+    def __init__(self, mf, frozen=None, mo_coeff=None, mo_occ=None):
+        ccsd.CCSD.__init__(self, mf, frozen, mo_coeff, mo_occ)
+        self._keys = self._keys.union(['mixed_precision', 'mixed_precision_conv_tol'])
+
     def kernel(self, t1=None, t2=None, eris=None, mbpt2=False):
         return self.ccsd(t1, t2, eris, mbpt2)
     def ccsd(self, t1=None, t2=None, eris=None, mbpt2=False):
@@ -185,19 +220,53 @@ class RCCSD(ccsd.CCSD):
             return self.e_corr, self.t1, self.t2
 
         if eris is None:
-            eris = self.ao2mo(self.mo_coeff)
+            if self.mixed_precision:
+                eris = self.ao2mo(self.mo_coeff, dtype=np.float32)
+            else:
+                eris = self.ao2mo(self.mo_coeff)
+        if self.mixed_precision:
+            t1, t2 = self._ccsd_single_precision(t1, t2, eris)
         return ccsd.CCSD.ccsd(self, t1, t2, eris)
 
-    def ao2mo(self, mo_coeff=None):
+    def _ccsd_single_precision(self, t1, t2, eris):
+        '''Converge the amplitudes to mixed_precision_conv_tol with single
+        precision integrals. Returns double precision amplitudes.'''
+        log = logger.new_logger(self)
+        if eris.ovov.dtype != np.float32:
+            log.info('Integrals are not stored in single precision. '
+                     'CCSD iterations in double precision')
+            return t1, t2
+
+        if t1 is None and t2 is None:
+            t1, t2 = self.get_init_guess(eris)
+        elif t2 is None:
+            t2 = self.get_init_guess(eris)[1]
+        t1 = np.asarray(t1, dtype=np.float32)
+        t2 = np.asarray(t2, dtype=np.float32)
+
+        log.info('CCSD iterations in single precision')
+        conv_tol_normt = max(self.conv_tol_normt, self.mixed_precision_conv_tol)
+        conv_tol = max(self.conv_tol, conv_tol_normt*1e-2)
+        conv, e_corr, t1, t2 = \
+                ccsd.kernel(self, eris, t1, t2, max_cycle=self.max_cycle,
+                            tol=conv_tol, tolnormt=conv_tol_normt,
+                            verbose=self.verbose, callback=self.callback)
+        log.info('Refine CCSD amplitudes in double precision')
+        return t1.astype(np.double), t2.astype(np.double)
+
+    def ao2mo(self, mo_coeff=None, dtype=np.double):
         nmo = self.nmo
         nao = self.mo_coeff.shape[0]
         nmo_pair = nmo * (nmo+1) // 2
         nao_pair = nao * (nao+1) // 2
-        mem_incore = (max(nao_pair**2, nmo**4) + nmo_pair**2) * 8/1e6
+        # MO integrals with 4-fold symmetry in double precision and the
+        # sorted integral blocks in the given precision
+        mem_incore = (max(nao_pair**2, nmo_pair**2) * 8 +
+                      nmo**4 * np.dtype(dtype).itemsize) / 1e6
         mem_now = lib.current_memory()[0]
         if (self._scf._eri is not None and
             (mem_incore+mem_now < self.max_memory) or self.mol.incore_anyway):
-            return _make_eris_incore(self, mo_coeff)
+            return _make_eris_incore(self, mo_coeff, dtype=dtype)
 
         elif getattr(self._scf, 'with_df', None):
             logger.warn(self, 'CCSD detected DF being used in the HF object. '
@@ -208,7 +277,7 @@ class RCCSD(ccsd.CCSD):
             #return _make_df_eris_outcore(self, mo_coeff)
 
         else:
-            return _make_eris_outcore(self, mo_coeff)
+            return _make_eris_outcore(self, mo_coeff, dtype=dtype)
 
     energy = energy
     update_amps = update_amps
@@ -242,7 +311,11 @@ class _ChemistsERIs(ccsd._ChemistsERIs):
         else:
             return self.ovvv
 
-def _make_eris_incore(mycc, mo_coeff=None, ao2mofn=None):
+_ERI_KEYS = ('oooo', 'ovoo', 'ovov', 'oovv', 'ovvo', 'ovvv', 'vvvv')
+
+def _make_eris_incore(mycc, mo_coeff=None, ao2mofn=None, dtype=np.double):
+    '''dtype (np.double or np.float32) is the precision of the real MO
+    integrals. It does not affect complex integrals.'''
     cput0 = (logger.process_clock(), logger.perf_counter())
     eris = _ChemistsERIs()
     eris._common_init_(mycc, mo_coeff)
@@ -251,44 +324,36 @@ def _make_eris_incore(mycc, mo_coeff=None, ao2mofn=None):
 
     if callable(ao2mofn):
         eri1 = ao2mofn(eris.mo_coeff).reshape([nmo]*4)
+        if np.iscomplexobj(eri1):
+            dtype = eri1.dtype
+        eris.oooo = eri1[:nocc,:nocc,:nocc,:nocc].astype(dtype)
+        eris.ovoo = eri1[:nocc,nocc:,:nocc,:nocc].astype(dtype)
+        eris.ovov = eri1[:nocc,nocc:,:nocc,nocc:].astype(dtype)
+        eris.oovv = eri1[:nocc,:nocc,nocc:,nocc:].astype(dtype)
+        eris.ovvo = eri1[:nocc,nocc:,nocc:,:nocc].astype(dtype)
+        eris.ovvv = eri1[:nocc,nocc:,nocc:,nocc:].astype(dtype)
+        eris.vvvv = eri1[nocc:,nocc:,nocc:,nocc:].astype(dtype)
     else:
+        # The integrals are sorted from the 4-fold symmetric MO integrals
+        # block by block. The full double precision tensor is not created.
+        nvir = nmo - nocc
+        eris.oooo = np.empty((nocc,nocc,nocc,nocc), dtype)
+        eris.ovoo = np.empty((nocc,nvir,nocc,nocc), dtype)
+        eris.ovov = np.empty((nocc,nvir,nocc,nvir), dtype)
+        eris.oovv = np.empty((nocc,nocc,nvir,nvir), dtype)
+        eris.ovvo = np.empty((nocc,nvir,nvir,nocc), dtype)
+        eris.ovvv = np.empty((nocc,nvir,nvir,nvir), dtype)
+        eris.vvvv = np.empty((nvir,nvir,nvir,nvir), dtype)
         eri1 = ao2mo.incore.full(mycc._scf._eri, eris.mo_coeff)
-        eri1 = ao2mo.restore(1, eri1, nmo)
-    eris.oooo = eri1[:nocc,:nocc,:nocc,:nocc].copy()
-    eris.ovoo = eri1[:nocc,nocc:,:nocc,:nocc].copy()
-    eris.ovov = eri1[:nocc,nocc:,:nocc,nocc:].copy()
-    eris.oovv = eri1[:nocc,:nocc,nocc:,nocc:].copy()
-    eris.ovvo = eri1[:nocc,nocc:,nocc:,:nocc].copy()
-    eris.ovvv = eri1[:nocc,nocc:,nocc:,nocc:].copy()
-    eris.vvvv = eri1[nocc:,nocc:,nocc:,nocc:].copy()
+        max_memory = max(MEMORYMIN, mycc.max_memory-lib.current_memory()[0])
+        _sort_eri_s4(eris, eri1, nocc, nmo, max_memory)
     logger.timer(mycc, 'CCSD integral transformation', *cput0)
     return eris
 
-def _make_eris_outcore(mycc, mo_coeff=None):
-    cput0 = (logger.process_clock(), logger.perf_counter())
-    log = logger.Logger(mycc.stdout, mycc.verbose)
-    eris = _ChemistsERIs()
-    eris._common_init_(mycc, mo_coeff)
-
-    mol = mycc.mol
-    mo_coeff = eris.mo_coeff
-    nocc = eris.nocc
-    nao, nmo = mo_coeff.shape
+def _sort_eri_s4(eris, eri, nocc, nmo, max_memory):
+    '''Sort the MO integrals of 4-fold symmetry (numpy array or HDF5
+    dataset) into the blocks of eris'''
     nvir = nmo - nocc
-    eris.feri1 = lib.H5TmpFile()
-    eris.oooo = eris.feri1.create_dataset('oooo', (nocc,nocc,nocc,nocc), 'f8')
-    eris.ovoo = eris.feri1.create_dataset('ovoo', (nocc,nvir,nocc,nocc), 'f8', chunks=(nocc,1,nocc,nocc))
-    eris.ovov = eris.feri1.create_dataset('ovov', (nocc,nvir,nocc,nvir), 'f8', chunks=(nocc,1,nocc,nvir))
-    eris.ovvo = eris.feri1.create_dataset('ovvo', (nocc,nvir,nvir,nocc), 'f8', chunks=(nocc,1,nvir,nocc))
-    eris.ovvv = eris.feri1.create_dataset('ovvv', (nocc,nvir,nvir,nvir), 'f8')
-    eris.oovv = eris.feri1.create_dataset('oovv', (nocc,nocc,nvir,nvir), 'f8', chunks=(nocc,nocc,1,nvir))
-    eris.vvvv = eris.feri1.create_dataset('vvvv', (nvir,nvir,nvir,nvir), 'f8')
-    max_memory = max(MEMORYMIN, mycc.max_memory-lib.current_memory()[0])
-
-    ftmp = lib.H5TmpFile()
-    ao2mo.full(mol, mo_coeff, ftmp, max_memory=max_memory, verbose=log)
-    eri = ftmp['eri_mo']
-
     nocc_pair = nocc*(nocc+1)//2
     tril2sq = lib.square_mat_in_trilu_indices(nmo)
     oo = eri[:nocc_pair]
@@ -297,7 +362,6 @@ def _make_eris_outcore(mycc, mo_coeff=None):
     eris.oovv[:] = oovv.reshape(nocc,nocc,nvir,nvir)
     oo = oovv = None
 
-    tril2sq = lib.square_mat_in_trilu_indices(nmo)
     blksize = min(nvir, max(BLKMIN, int(max_memory*1e6/8/nmo**3/2)))
     for p0, p1 in lib.prange(0, nvir, blksize):
         q0, q1 = p0+nocc, p1+nocc
@@ -316,6 +380,33 @@ def _make_eris_outcore(mycc, mo_coeff=None):
         if p0 > 0:
             eris.vvvv[:p0,p0:p1] = tmp[:,:p0,nocc:,nocc:].transpose(1,0,2,3)
         buf = tmp = None
+
+def _make_eris_outcore(mycc, mo_coeff=None, dtype=np.double):
+    cput0 = (logger.process_clock(), logger.perf_counter())
+    log = logger.Logger(mycc.stdout, mycc.verbose)
+    eris = _ChemistsERIs()
+    eris._common_init_(mycc, mo_coeff)
+
+    mol = mycc.mol
+    mo_coeff = eris.mo_coeff
+    nocc = eris.nocc
+    nao, nmo = mo_coeff.shape
+    nvir = nmo - nocc
+    eris.feri1 = lib.H5TmpFile()
+    eris.oooo = eris.feri1.create_dataset('oooo', (nocc,nocc,nocc,nocc), dtype)
+    eris.ovoo = eris.feri1.create_dataset('ovoo', (nocc,nvir,nocc,nocc), dtype, chunks=(nocc,1,nocc,nocc))
+    eris.ovov = eris.feri1.create_dataset('ovov', (nocc,nvir,nocc,nvir), dtype, chunks=(nocc,1,nocc,nvir))
+    eris.ovvo = eris.feri1.create_dataset('ovvo', (nocc,nvir,nvir,nocc), dtype, chunks=(nocc,1,nvir,nocc))
+    eris.ovvv = eris.feri1.create_dataset('ovvv', (nocc,nvir,nvir,nvir), dtype)
+    eris.oovv = eris.feri1.create_dataset('oovv', (nocc,nocc,nvir,nvir), dtype, chunks=(nocc,nocc,1,nvir))
+    eris.vvvv = eris.feri1.create_dataset('vvvv', (nvir,nvir,nvir,nvir), dtype)
+    max_memory = max(MEMORYMIN, mycc.max_memory-lib.current_memory()[0])
+
+    ftmp = lib.H5TmpFile()
+    ao2mo.full(mol, mo_coeff, ftmp, max_memory=max_memory, verbose=log)
+    eri = ftmp['eri_mo']
+
+    _sort_eri_s4(eris, eri, nocc, nmo, max_memory)
     log.timer('CCSD integral transformation', *cput0)
     return eris
 
@@ -13,7 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import unittest
+import tempfile
 import numpy
 from functools import reduce
 
@@ -88,6 +90,72 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(e3a, -0.003060022611584471, 9)
         mcc.mol.symmetry = True
 
+    def test_ccsd_t_mp(self):
+        eris = mcc.ao2mo()
+        t2 = mcc.t2.copy()
+        e3a = ccsd_t.kernel(mcc, eris, nproc=2)
+        self.assertAlmostEqual(e3a, -0.003060022611584471, 9)
+        self.assertAlmostEqual(abs(mcc.t2 - t2).max(), 0, 14)
+
+        with tempfile.TemporaryDirectory() as d:
+            mcc.max_memory, bak = 0, mcc.max_memory
+            e3a = ccsd_t.kernel(mcc, eris, journal=d)
+            mcc.max_memory = bak
+            self.assertAlmostEqual(e3a, -0.003060022611584471, 9)
+
+            # Drop half of the completed blocks and truncate the last record
+            # to mimic an interrupted job
+            journal = os.path.join(d, 'journal')
+            with open(journal, 'r') as f:
+                lines = f.readlines()
+            self.assertTrue(len(lines) > 4)
+            with open(journal, 'w') as f:
+                f.writelines(lines[:len(lines)//2])
+                f.write(lines[len(lines)//2][:5])
+            header, done = ccsd_t._load_journal(journal)
+            self.assertEqual(len(done), len(lines)//2 - 1)
+            e3a = ccsd_t.kernel(mcc, eris, nproc=2, journal=d)
+            self.assertAlmostEqual(e3a, -0.003060022611584471, 9)
+            header, done = ccsd_t._load_journal(journal)
+            self.assertEqual(len(done), len(header['tasks']))
+
+            self.assertRaises(RuntimeError, ccsd_t.kernel, mcc, eris,
+                              mcc.t1*.5, journal=d)
+
+    def test_ccsd_t_resume(self):
+        eris = mcc.ao2mo()
+        with tempfile.TemporaryDirectory() as d:
+            e3a = ccsd_t.kernel(mcc, eris, journal=d)
+            journal = os.path.join(d, 'journal')
+            with open(journal, 'r') as f:
+                header_line = f.readline()
+            # The job was killed right after the header was committed
+            with open(journal, 'w') as f:
+                f.write(header_line)
+
+            # All datasets the journal refers to are complete on disk
+            storage = lib.MemmapFile(os.path.join(d, 'data'), 'r')
+            self.assertEqual(sorted(storage.keys()),
+                             sorted(['fvo', 'mo_energy', 'o_ir_loc', 'oo_ir_loc',
+                                     'orbsym', 't1T', 't2T', 'v_ir_loc',
+                                     'vooo', 'vvop']))
+            nocc, nvir = mcc.t1.shape
+            vvop = numpy.empty((nvir,nvir,nocc,nocc+nvir))
+            log = lib.logger.Logger(mcc.stdout, mcc.verbose)
+            orbsym = ccsd_t._sort_eri(mcc, eris, nocc, nvir, vvop, log)
+            mo_energy, t1T, t2T, vooo, fvo = ccsd_t._sort_t2_vooo_(
+                mcc, orbsym, mcc.t1, mcc.t2.copy(), eris)[:5]
+            self.assertAlmostEqual(abs(storage['vvop'] - vvop).max(), 0, 12)
+            self.assertAlmostEqual(abs(storage['t2T'] - t2T).max(), 0, 12)
+            self.assertAlmostEqual(abs(storage['vooo'] - vooo).max(), 0, 12)
+            self.assertAlmostEqual(abs(storage['t1T'] - t1T).max(), 0, 12)
+            storage.close()
+
+            e3b = ccsd_t.kernel(mcc, eris, journal=d)
+            self.assertAlmostEqual(e3b, e3a, 12)
+            header, done = ccsd_t._load_journal(journal)
+            self.assertEqual(len(done), len(header['tasks']))
+
     def test_sort_eri(self):
         eris = mcc.ao2mo()
         nocc, nvir = mcc.t1.shape
@@ -278,6 +278,28 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(abs(t1a-t1b).max(), 0, 9)
         self.assertAlmostEqual(abs(t2a-t2b).max(), 0, 9)
 
+        for depth, async_io in ((3, True), (3, False)):
+            mycc2.prefetch_depth = depth
+            mycc2.async_io = async_io
+            t1a, t2a = ccsd.update_amps(mycc2, t1, t2, eris2)
+            self.assertAlmostEqual(abs(t1a-t1b).max(), 0, 9)
+            self.assertAlmostEqual(abs(t2a-t2b).max(), 0, 9)
+        mycc2.prefetch_depth = 1
+        mycc2.async_io = True
+
+        # The memory of the ovvv buffers is excluded from the vvvv blocks
+        mycc2.max_memory = 4000
+        vvvv_memory = []
+        def add_vvvv(*args, **kwargs):
+            vvvv_memory.append(mycc2.max_memory)
+            return ccsd.CCSD._add_vvvv(mycc2, *args, **kwargs)
+        mycc2._add_vvvv = add_vvvv
+        t1a, t2a = ccsd.update_amps(mycc2, t1, t2, eris2)
+        del mycc2._add_vvvv
+        self.assertTrue(vvvv_memory[0] < 4000)
+        self.assertEqual(mycc2.max_memory, 4000)
+        self.assertAlmostEqual(abs(t2a-t2b).max(), 0, 9)
+
         t2tril = ccsd._add_vvvv_tril(mycc2, t1, t2, eris2)
         self.assertAlmostEqual(lib.fp(t2tril), 13306.139402693696, 8)
 
@@ -429,6 +451,65 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(lib.fp(eri_df.ovvv), -24.359418953533535, 9)
         self.assertAlmostEqual(lib.fp(eri_df.vvvv),  76.9017539373456  , 9)
 
+    def test_mixed_precision(self):
+        mycc1 = rccsd.RCCSD(mf)
+        mycc1.max_memory = 0
+        eris32 = mycc1.ao2mo(dtype=numpy.float32)
+        self.assertTrue(isinstance(eris32.ovov, h5py.Dataset))
+        self.assertEqual(eris32.ovov.dtype, numpy.float32)
+        self.assertAlmostEqual(abs(eris32.ovvv[:] - eris.ovvv).max(), 0, 6)
+        eris32_incore = rccsd._make_eris_incore(mycc1, dtype=numpy.float32)
+        eris64_incore = rccsd._make_eris_incore(mycc1)
+        for key in rccsd._ERI_KEYS:
+            self.assertEqual(getattr(eris32_incore, key).dtype, numpy.float32)
+            self.assertAlmostEqual(abs(getattr(eris32_incore, key) -
+                                       getattr(eris32, key)[:]).max(), 0, 12)
+            self.assertAlmostEqual(abs(getattr(eris64_incore, key) -
+                                       getattr(eris, key)).max(), 0, 12)
+
+        t1, t2 = mycc1.get_init_guess(eris32)
+        t1 = t1.astype(numpy.float32)
+        t1a, t2a = mycc1.update_amps(t1, t2, eris32)
+        self.assertEqual(t1a.dtype, numpy.float32)
+        self.assertEqual(t2a.dtype, numpy.float32)
+        t1b, t2b = mycc1.update_amps(t1.astype(float), t2.astype(float), eris)
+        self.assertAlmostEqual(abs(t2a - t2b).max(), 0, 5)
+
+        ref = rccsd.RCCSD(mf).set(conv_tol=1e-10).run()
+        mycc1 = rccsd.RCCSD(mf)
+        mycc1.conv_tol = 1e-10
+        mycc1.mixed_precision = True
+        mycc1.kernel()
+        self.assertEqual(mycc1.t2.dtype, numpy.double)
+        self.assertAlmostEqual(mycc1.e_corr, ref.e_corr, 8)
+        self.assertAlmostEqual(abs(mycc1.t2 - ref.t2).max(), 0, 5)
+
+        # Amplitudes stay in single precision after DIIS extrapolation. The
+        # double precision refinement uses the single precision integrals.
+        dtypes = []
+        def update_amps(t1, t2, eris):
+            dtypes.append((t1.dtype, t2.dtype, eris.ovov.dtype))
+            return rccsd.update_amps(mycc1, t1, t2, eris)
+        mycc1 = rccsd.RCCSD(mf)
+        mycc1.conv_tol = 1e-10
+        mycc1.mixed_precision = True
+        mycc1.update_amps = update_amps
+        mycc1.kernel()
+        f32 = numpy.float32
+        n32 = dtypes.count((f32, f32, f32))
+        self.assertTrue(n32 > mycc1.diis_start_cycle + 2)
+        self.assertEqual(dtypes[:n32], [(f32, f32, f32)] * n32)
+        self.assertTrue(len(dtypes) > n32)
+        self.assertTrue(all(t[1:] == (numpy.double, f32) for t in dtypes[n32:]))
+        self.assertAlmostEqual(mycc1.e_corr, ref.e_corr, 8)
+        self.assertAlmostEqual(abs(mycc1.t2 - ref.t2).max(), 0, 5)
+
+        # Double precision eris are not copied to single precision
+        dtypes = []
+        mycc1.kernel(eris=eris)
+        self.assertTrue(all(t == (numpy.double,)*3 for t in dtypes))
+        self.assertAlmostEqual(mycc1.e_corr, ref.e_corr, 9)
+
 if __name__ == "__main__":
     print("Full Tests for RCCSD")
     unittest.main()
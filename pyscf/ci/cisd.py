@@ -823,6 +823,9 @@ class CISD(lib.StreamObject):
             AO-direct CISD. Default is False.
         async_io : bool
             Allow for asynchronous function execution. Default is True.
+        prefetch_depth : int
+            Number of vvvv tiles loaded ahead of the contraction when
+            async_io is enabled. Default is 1.
         frozen : int or list
             If integer is given, the inner-most orbitals are frozen from CI
             amplitudes.  Given the orbital indices (0-based) in a list, both
@@ -856,6 +859,7 @@ class CISD(lib.StreamObject):
     level_shift = getattr(__config__, 'ci_cisd_CISD_level_shift', 1e-3)
     direct = getattr(__config__, 'ci_cisd_CISD_direct', False)
     async_io = getattr(__config__, 'ci_cisd_CISD_async_io', True)
+    prefetch_depth = getattr(__config__, 'ci_cisd_CISD_prefetch_depth', 1)
 
     def __init__(self, mf, frozen=None, mo_coeff=None, mo_occ=None):
         from pyscf.scf import hf
@@ -277,6 +277,16 @@ class KnownValues(unittest.TestCase):
         ecisd, civec = myci.kernel()
         self.assertAlmostEqual(ecisd, -0.1319371817220385, 6)
 
+    def test_prefetch_depth(self):
+        mol = gto.M(atom='O 0 0 0; H 0 -0.757 0.587; H 0 0.757 0.587',
+                    basis='631g', verbose=0)
+        mf = scf.RHF(mol).run(conv_tol=1e-12)
+        myci = ci.CISD(mf)
+        myci.max_memory = 1
+        e_ref = myci.kernel()[0]
+        myci.prefetch_depth = 3
+        self.assertAlmostEqual(myci.kernel()[0], e_ref, 9)
+
     def test_multi_roots(self):
         mol = gto.Mole()
         mol.verbose = 0
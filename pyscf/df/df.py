@@ -53,9 +53,10 @@ class DF(lib.StreamObject):
             given auxbasis.  It is used in the rest part of the code to
             determine the problem size, the integral batches etc.  This object
             should NOT be modified.
-        _cderi_to_save : str
+        _cderi_to_save : str or lib.MemmapFile
             If _cderi_to_save is specified, the DF integral tensor will be
-            saved in this file.
+            saved in this file. The tensor is stored in the memory-mapped
+            format if a lib.MemmapFile object is assigned.
         _cderi : str or numpy array
             If _cderi is specified, the DF integral tensor will be read from
             this HDF5 file (or numpy array). When the DF integral tensor is
@@ -90,8 +91,13 @@ class DF(lib.StreamObject):
 ##################################################
 # Following are not input options
         self.auxmol = None
+        # The mol (and its _env) for which auxmol was constructed
+        self._auxmol_for = None
 # If _cderi_to_save is specified, the 3C-integral tensor will be saved in this file.
-        self._cderi_to_save = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        if lib.mmapfile.SWAP_BACKEND == 'mmap':
+            self._cderi_to_save = lib.MemmapTmpFile()
+        else:
+            self._cderi_to_save = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
 # If _cderi is specified, the 3C-integral tensor will be read from this file
         self._cderi = None
         self._vjopt = None
@@ -120,6 +126,8 @@ class DF(lib.StreamObject):
                      self._cderi)
         if isinstance(self._cderi_to_save, str):
             log.info('_cderi_to_save = %s', self._cderi_to_save)
+        elif isinstance(self._cderi_to_save, lib.MemmapGroup):
+            log.info('_cderi_to_save = %s', self._cderi_to_save.filename)
         else:
             log.info('_cderi_to_save = %s', self._cderi_to_save.name)
         return self
@@ -132,12 +140,18 @@ class DF(lib.StreamObject):
         self.dump_flags()
 
         mol = self.mol
-        auxmol = self.auxmol = addons.make_auxmol(self.mol, self.auxbasis)
+        # auxmol is reused only if it was made (or moved by reset) for mol
+        if self.auxmol is None or not self._auxmol_matches(mol):
+            self.auxmol = addons.make_auxmol(mol, self.auxbasis)
+            self._auxmol_for = (mol, mol._env.copy())
+        auxmol = self.auxmol
         nao = mol.nao_nr()
         naux = auxmol.nao_nr()
         nao_pair = nao*(nao+1)//2
 
-        is_custom_storage = isinstance(self._cderi_to_save, str)
+        is_tmp_storage = not isinstance(self._cderi_to_save, (str, lib.MemmapGroup))
+        is_custom_storage = not (is_tmp_storage or
+                                 isinstance(self._cderi_to_save, lib.MemmapTmpFile))
         max_memory = self.max_memory - lib.current_memory()[0]
         int3c = mol._add_suffix('int3c2e')
         int2c = mol._add_suffix('int2c2e')
@@ -146,10 +160,10 @@ class DF(lib.StreamObject):
                                               auxmol=auxmol,
                                               max_memory=max_memory, verbose=log)
         else:
-            if is_custom_storage:
-                cderi = self._cderi_to_save
-            else:
+            if is_tmp_storage:
                 cderi = self._cderi_to_save.name
+            else:
+                cderi = self._cderi_to_save
 
             if isinstance(self._cderi, str):
                 # If cderi needs to be saved in
@@ -175,14 +189,28 @@ class DF(lib.StreamObject):
 
     def reset(self, mol=None):
         '''Reset mol and clean up relevant attributes for scanner mode'''
+        auxmol = auxmol_for = None
         if mol is not None:
+            # The auxiliary basis is reused if only the geometry is changed
+            if self.auxmol is not None and self._auxmol_matches(self.mol):
+                auxmol = _update_auxmol_geom(self.auxmol, self.mol, mol)
+            if auxmol is not None:
+                auxmol_for = (mol, mol._env.copy())
             self.mol = mol
-        self.auxmol = None
+        self.auxmol = auxmol
+        self._auxmol_for = auxmol_for
         self._cderi = None
         self._vjopt = None
         self._rsh_df = {}
         return self
 
+    def _auxmol_matches(self, mol):
+        '''Whether self.auxmol was constructed for mol in its current state'''
+        if self._auxmol_for is None:
+            return False
+        mol_ref, env_ref = self._auxmol_for
+        return mol_ref is mol and numpy.array_equal(env_ref, mol._env)
+
     def loop(self, blksize=None):
         if self._cderi is None:
             self.build()
@@ -196,7 +224,7 @@ class DF(lib.StreamObject):
                     yield numpy.asarray(feri[b0:b1], order='C')
 
             else:
-                if isinstance(feri, h5py.Group):
+                if isinstance(feri, (h5py.Group, lib.MemmapGroup)):
                     # starting from pyscf-1.7, DF tensor may be stored in
                     # block format
                     naoaux = feri['0'].shape[0]
@@ -223,7 +251,7 @@ class DF(lib.StreamObject):
         if self._cderi is None:
             self.build()
         with addons.load(self._cderi, self._dataname) as feri:
-            if isinstance(feri, h5py.Group):
+            if isinstance(feri, (h5py.Group, lib.MemmapGroup)):
                 return feri['0'].shape[0]
             else:
                 return feri.shape[0]
@@ -304,6 +332,20 @@ class DF(lib.StreamObject):
 GDF = DF
 
 
+def _update_auxmol_geom(auxmol, mol_old, mol):
+    '''Update the geometry of auxmol for the new mol. None is returned if mol
+    has different atoms or basis.'''
+    if (auxmol is None or mol is mol_old or mol.symmetry or
+        mol.natm != mol_old.natm or auxmol.natm != mol.natm or
+        not numpy.array_equal(mol._bas, mol_old._bas) or
+        [a[0] for a in mol._atom] != [a[0] for a in mol_old._atom]):
+        return None
+    with lib.temporary_env(auxmol, verbose=0):
+        auxmol1 = auxmol.set_geom_(mol.atom_coords(), unit='Bohr', inplace=False)
+    auxmol1.verbose = auxmol.verbose
+    return auxmol1
+
+
 class DF4C(DF):
     '''Relativistic 4-component'''
     def build(self):
@@ -17,7 +17,6 @@
 #
 
 
-import tempfile
 import numpy
 import scipy.linalg
 import h5py
@@ -52,10 +51,9 @@ def cholesky_eri(mol, erifile, auxbasis='weigend+etb', dataname='j3c', tmpdir=No
 
     if tmpdir is None:
         tmpdir = lib.param.TMPDIR
-    swapfile = tempfile.NamedTemporaryFile(dir=tmpdir)
-    cholesky_eri_b(mol, swapfile.name, auxbasis, dataname,
+    fswap = lib.mmapfile.swapfile(dir=tmpdir)
+    cholesky_eri_b(mol, fswap, auxbasis, dataname,
                    int3c, aosym, int2c, comp, max_memory, auxmol, verbose=log)
-    fswap = h5py.File(swapfile.name, 'r')
     time1 = log.timer('generate (ij|L) 1 pass', *time0)
 
     # Cannot let naoaux = auxmol.nao_nr() if auxbasis has linear dependence
@@ -93,7 +91,8 @@ def cholesky_eri(mol, erifile, auxbasis='weigend+etb', dataname='j3c', tmpdir=No
                         (istep+1, totstep, row0, row1, nrow), *ti0)
 
     fswap.close()
-    feri.close()
+    if feri is not erifile:
+        feri.close()
     log.timer('cholesky_eri', *time0)
     return erifile
 
@@ -191,7 +190,8 @@ def cholesky_eri_b(mol, erifile, auxbasis='weigend+etb', dataname='j3c',
                   istep+1, len(shranges), *sh_range)
         time1 = log.timer('gen CD eri [%d/%d]' % (istep+1,len(shranges)), *time1)
     bufs1 = None
-    feri.close()
+    if feri is not erifile:
+        feri.close()
     return erifile
 
 
@@ -206,10 +206,9 @@ def general(mol, mo_coeffs, erifile, auxbasis='weigend+etb', dataname='eri_mo',
 
     if tmpdir is None:
         tmpdir = lib.param.TMPDIR
-    swapfile = tempfile.NamedTemporaryFile(dir=tmpdir)
-    cholesky_eri_b(mol, swapfile.name, auxbasis, dataname,
+    fswap = lib.mmapfile.swapfile(dir=tmpdir)
+    cholesky_eri_b(mol, fswap, auxbasis, dataname,
                    int3c, aosym, int2c, comp, max_memory, verbose=log)
-    fswap = h5py.File(swapfile.name, 'r')
     time1 = log.timer('AO->MO eri transformation 1 pass', *time0)
 
     nao = mo_coeffs[0].shape[0]
@@ -256,7 +255,8 @@ def general(mol, mo_coeffs, erifile, auxbasis='weigend+etb', dataname='eri_mo',
                         (istep+1, totstep, row0, row1, nrow), *ti0)
 
     fswap.close()
-    feri.close()
+    if feri is not erifile:
+        feri.close()
     log.timer('AO->MO CD eri transformation 2 pass', *time1)
     log.timer('AO->MO CD eri transformation', *time0)
     return erifile
@@ -271,6 +271,16 @@ def _guess_shell_ranges(mol, buflen, aosym, start=0, stop=None):
         return balance_partition(ao_loc*nao, buflen, start, stop)
 
 def _create_h5file(erifile, dataname):
+    if isinstance(erifile, (h5py.Group, lib.MemmapGroup)):
+        if dataname in erifile:
+            del (erifile[dataname])
+        return erifile
+    elif lib.mmapfile.is_mmapfile(erifile):
+        feri = lib.MemmapFile(erifile, 'a')
+        if dataname in feri:
+            del (feri[dataname])
+        return feri
+
     if h5py.is_hdf5(erifile):
         feri = h5py.File(erifile, 'a')
         if dataname in feri:
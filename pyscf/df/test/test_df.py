@@ -136,6 +136,24 @@ class KnownValues(unittest.TestCase):
             mf.run()
         self.assertAlmostEqual(mf.e_tot, -102.02277148333626, 8)
 
+    def test_auxmol_geometry(self):
+        mol1 = mol.set_geom_('O 0 0 0; H 0 -.8 .6; H 0 .8 .6', inplace=False)
+        dfobj = df.DF(mol).build()
+        auxmol = dfobj.auxmol
+        # auxmol is rebuilt for the new mol
+        dfobj.mol = mol1
+        dfobj.build()
+        self.assertAlmostEqual(abs(dfobj.auxmol.atom_coords() - mol1.atom_coords()).max(), 0, 12)
+        ref = df.DF(mol1).get_eri()
+        self.assertAlmostEqual(abs(dfobj.get_eri() - ref).max(), 0, 12)
+
+        # reset keeps the auxiliary basis and updates its geometry
+        dfobj = df.DF(mol).build()
+        dfobj.reset(mol1)
+        self.assertTrue(dfobj.auxmol is not None)
+        self.assertAlmostEqual(abs(dfobj.auxmol.atom_coords() - mol1.atom_coords()).max(), 0, 12)
+        self.assertAlmostEqual(abs(dfobj.get_eri() - ref).max(), 0, 12)
+
 if __name__ == "__main__":
     print("Full Tests for df")
     unittest.main()
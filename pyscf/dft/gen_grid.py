@@ -39,6 +39,11 @@ libdft = lib.load_library('libdft')
 
 GROUP_BOX_SIZE = 1.2
 GROUP_BOUNDARY_PENALTY = 4.2
+# Number of grids in each chunk to compute Becke partition
+PARTITION_BLKSIZE = getattr(__config__, 'dft_gen_grid_partition_blksize', 16384)
+# In the incremental build, the ordering of grids (see arg_group_grids) is
+# reused if atoms are displaced less than this value (in Bohr)
+GROUP_REUSE_TOL = getattr(__config__, 'dft_gen_grid_group_reuse_tol', GROUP_BOX_SIZE*.1)
 # Padding grids to make the AO value generated by eval_gto aligned in memory
 ALIGNMENT_UNIT = 8
 NELEC_ERROR_TOL = getattr(__config__, 'dft_rks_prune_error_tol', 0.02)
@@ -198,9 +203,10 @@ def treutler_prune(nuc, rads, n_ang, radii=None):
 # Becke partitioning
 
 # Stratmann, Scuseria, Frisch. CPL, 257, 213 (1996), eq.11
+STRATMANN_A = .64  # for eq. 14
 def stratmann(g):
     '''Stratmann, Scuseria, Frisch. CPL, 257, 213 (1996); DOI:10.1016/0009-2614(96)00600-8'''
-    a = .64  # for eq. 14
+    a = STRATMANN_A
     g = numpy.asarray(g)
     ma = g/a
     ma2 = ma * ma
@@ -280,57 +286,70 @@ def gen_atomic_grids(mol, atom_grid={}, radi_method=radi.gauss_chebyshev,
     return atom_grids_tab
 
 
-def get_partition(mol, atom_grids_tab,
-                  radii_adjust=None, atomic_radii=radi.BRAGG_RADII,
-                  becke_scheme=original_becke, concat=True):
-    '''Generate the mesh grid coordinates and weights for DFT numerical integration.
-    We can change radii_adjust, becke_scheme functions to generate different meshgrid.
-
-    Kwargs:
-        concat: bool
-            Whether to concatenate grids and weights in return
+def _gen_partition_fn(mol, radii_adjust=None, atomic_radii=radi.BRAGG_RADII,
+                      becke_scheme=original_becke):
+    '''Returns a function f(ia, coords, vol) which computes the partition
+    weights of the atomic grids of atom ia.
 
-    Returns:
-        grid_coord and grid_weight arrays.  grid_coord array has shape (N,3);
-        weight 1D array has N elements.
+    The grids are processed in chunks of PARTITION_BLKSIZE to bound the
+    memory footprint. For the Stratmann scheme, the (multi-threaded) C code
+    VXCgen_grid_stratmann only evaluates the cell functions of the atoms
+    within the range of the scheme function on each grid.
     '''
+    natm = mol.natm
     if callable(radii_adjust) and atomic_radii is not None:
         f_radii_adjust = radii_adjust(mol, atomic_radii)
     else:
         f_radii_adjust = None
     atm_coords = numpy.asarray(mol.atom_coords() , order='C')
     atm_dist = gto.inter_distance(mol)
-    if (becke_scheme is original_becke and
-        (radii_adjust is radi.treutler_atomic_radii_adjust or
-         radii_adjust is radi.becke_atomic_radii_adjust or
-         f_radii_adjust is None)):
-        if f_radii_adjust is None:
-            p_radii_table = lib.c_null_ptr()
-        else:
-            f_radii_table = numpy.asarray([f_radii_adjust(i, j, 0)
-                                           for i in range(mol.natm)
-                                           for j in range(mol.natm)])
-            p_radii_table = f_radii_table.ctypes.data_as(ctypes.c_void_p)
 
+    if f_radii_adjust is None:
+        p_radii_table = lib.c_null_ptr()
+        c_kernel = True
+    elif (radii_adjust is radi.treutler_atomic_radii_adjust or
+          radii_adjust is radi.becke_atomic_radii_adjust):
+        f_radii_table = numpy.asarray([f_radii_adjust(i, j, 0)
+                                       for i in range(natm)
+                                       for j in range(natm)])
+        p_radii_table = f_radii_table.ctypes.data_as(ctypes.c_void_p)
+        c_kernel = True
+    else:
+        c_kernel = False
+
+    screening = c_kernel and becke_scheme is stratmann
+    if c_kernel and becke_scheme is original_becke:
         def gen_grid_partition(coords):
             coords = numpy.asarray(coords, order='F')
             ngrids = coords.shape[0]
-            pbecke = numpy.empty((mol.natm,ngrids))
+            pbecke = numpy.empty((natm,ngrids))
             libdft.VXCgen_grid(pbecke.ctypes.data_as(ctypes.c_void_p),
                                coords.ctypes.data_as(ctypes.c_void_p),
                                atm_coords.ctypes.data_as(ctypes.c_void_p),
                                p_radii_table,
-                               ctypes.c_int(mol.natm), ctypes.c_int(ngrids))
+                               ctypes.c_int(natm), ctypes.c_int(ngrids))
+            return pbecke
+    elif screening:
+        def gen_grid_partition(coords):
+            coords = numpy.asarray(coords, order='F')
+            ngrids = coords.shape[0]
+            pbecke = numpy.empty((natm,ngrids))
+            libdft.VXCgen_grid_stratmann(
+                pbecke.ctypes.data_as(ctypes.c_void_p),
+                coords.ctypes.data_as(ctypes.c_void_p),
+                atm_coords.ctypes.data_as(ctypes.c_void_p),
+                p_radii_table, ctypes.c_int(natm), ctypes.c_int(ngrids),
+                ctypes.c_double(STRATMANN_A))
             return pbecke
     else:
         def gen_grid_partition(coords):
             ngrids = coords.shape[0]
-            grid_dist = numpy.empty((mol.natm,ngrids))
-            for ia in range(mol.natm):
+            grid_dist = numpy.empty((natm,ngrids))
+            for ia in range(natm):
                 dc = coords - atm_coords[ia]
                 grid_dist[ia] = numpy.sqrt(numpy.einsum('ij,ij->i',dc,dc))
-            pbecke = numpy.ones((mol.natm,ngrids))
-            for i in range(mol.natm):
+            pbecke = numpy.ones((natm,ngrids))
+            for i in range(natm):
                 for j in range(i):
                     g = 1/atm_dist[i,j] * (grid_dist[i]-grid_dist[j])
                     if f_radii_adjust is not None:
@@ -340,15 +359,38 @@ def get_partition(mol, atom_grids_tab,
                     pbecke[j] *= .5 * (1+g)
             return pbecke
 
+    def atom_weights(ia, coords, vol):
+        weights = numpy.empty(coords.shape[0])
+        for p0, p1 in lib.prange(0, coords.shape[0], PARTITION_BLKSIZE):
+            pbecke = gen_grid_partition(coords[p0:p1])
+            weights[p0:p1] = vol[p0:p1] * pbecke[ia] * (1./pbecke.sum(axis=0))
+        return weights
+    return atom_weights
+
+def get_partition(mol, atom_grids_tab,
+                  radii_adjust=None, atomic_radii=radi.BRAGG_RADII,
+                  becke_scheme=original_becke, concat=True):
+    '''Generate the mesh grid coordinates and weights for DFT numerical integration.
+    We can change radii_adjust, becke_scheme functions to generate different meshgrid.
+
+    Kwargs:
+        concat: bool
+            Whether to concatenate grids and weights in return
+
+    Returns:
+        grid_coord and grid_weight arrays.  grid_coord array has shape (N,3);
+        weight 1D array has N elements.
+    '''
+    atm_coords = numpy.asarray(mol.atom_coords() , order='C')
+    atom_weights = _gen_partition_fn(mol, radii_adjust, atomic_radii,
+                                     becke_scheme)
     coords_all = []
     weights_all = []
     for ia in range(mol.natm):
         coords, vol = atom_grids_tab[mol.atom_symbol(ia)]
         coords = coords + atm_coords[ia]
-        pbecke = gen_grid_partition(coords)
-        weights = vol * pbecke[ia] * (1./pbecke.sum(axis=0))
         coords_all.append(coords)
-        weights_all.append(weights)
+        weights_all.append(atom_weights(ia, coords, vol))
 
     if concat:
         coords_all = numpy.vstack(coords_all)
@@ -473,6 +515,24 @@ class Grids(lib.StreamObject):
             Eg, grids.atom_grid = {'H': (20,110)} will generate 20 radial
             grids and 110 angular grids for H atom.
 
+        incremental : bool
+            Whether to update the grids of the previous build for small
+            geometry changes (e.g. in geometry optimization or molecular
+            dynamics). The atomic grids are translated to the new atomic
+            positions. Becke partition weights are only recomputed for the
+            atoms whose neighbourhood (atoms within incremental_rcut) is
+            changed more than incremental_tol. It has no effects if the
+            methods gen_atomic_grids or get_partition are overridden.
+            Default is False.
+
+        incremental_tol : float
+            Tolerance (in Bohr) of the change of the relative positions of
+            the neighbouring atoms in the incremental build.
+
+        incremental_rcut : float
+            Radius (in Bohr) of the neighbourhood of an atom in the
+            incremental build.
+
         Examples:
 
         >>> mol = gto.M(atom='H 0 0 0; H 0 0 1.1')
@@ -491,6 +551,9 @@ class Grids(lib.StreamObject):
                               original_becke)
     prune = _load_conf(None, 'dft_gen_grid_Grids_prune', nwchem_prune)
     level = getattr(__config__, 'dft_gen_grid_Grids_level', 3)
+    incremental = getattr(__config__, 'dft_gen_grid_Grids_incremental', False)
+    incremental_tol = getattr(__config__, 'dft_gen_grid_Grids_incremental_tol', 1e-7)
+    incremental_rcut = getattr(__config__, 'dft_gen_grid_Grids_incremental_rcut', 15.)
 
     alignment = ALIGNMENT_UNIT
     cutoff = CUTOFF
@@ -510,9 +573,14 @@ class Grids(lib.StreamObject):
         self.screen_index = None
         self.coords  = None
         self.weights = None
+        # Intermediates of the previous build for the incremental build
+        self._incremental_data = None
+        # Atomic grids of the previous build
+        self._atom_grids_cache = None
         self._keys = set(self.__dict__.keys()).update([
             'atomic_radii', 'radii_adjust', 'radi_method', 'becke_scheme',
-            'prune', 'level', 'alignment', 'cutoff',
+            'prune', 'level', 'alignment', 'cutoff', 'incremental',
+            'incremental_tol', 'incremental_rcut',
         ])
 
     @property
@@ -543,8 +611,14 @@ class Grids(lib.StreamObject):
         if mol is None: mol = self.mol
         if self.verbose >= logger.WARN:
             self.check_sanity()
-        atom_grids_tab = self.gen_atomic_grids(
-            mol, self.atom_grid, self.radi_method, self.level, self.prune, **kwargs)
+        if self.incremental and not kwargs and self._incremental_supported():
+            return self._build_incremental(mol, with_non0tab, sort_grids)
+
+        if kwargs:
+            atom_grids_tab = self.gen_atomic_grids(
+                mol, self.atom_grid, self.radi_method, self.level, self.prune, **kwargs)
+        else:
+            atom_grids_tab = self._get_atom_grids_tab(mol)
         self.coords, self.weights = self.get_partition(
             mol, atom_grids_tab, self.radii_adjust, self.atomic_radii, self.becke_scheme)
 
@@ -569,6 +643,124 @@ class Grids(lib.StreamObject):
         logger.info(self, 'tot grids = %d', len(self.weights))
         return self
 
+    def _incremental_signature(self, mol):
+        atomic_radii = self.atomic_radii
+        if atomic_radii is not None:
+            atomic_radii = numpy.asarray(atomic_radii).tobytes()
+        return (tuple(mol.atom_symbol(i) for i in range(mol.natm)),
+                repr(self.atom_grid), self.radi_method, self.level, self.prune,
+                self.radii_adjust, atomic_radii, self.becke_scheme,
+                self.alignment)
+
+    def _get_atom_grids_tab(self, mol):
+        '''Atomic grids which do not depend on the geometry. They are cached
+        and reused when grids are rebuilt for a new geometry (e.g. scanner).
+        '''
+        signature = self._incremental_signature(mol)
+        cached = getattr(self, '_atom_grids_cache', None)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        atom_grids_tab = self.gen_atomic_grids(
+            mol, self.atom_grid, self.radi_method, self.level, self.prune)
+        self._atom_grids_cache = (signature, atom_grids_tab)
+        return atom_grids_tab
+
+    def _incremental_supported(self):
+        '''The incremental build evaluates the Becke weights of each atom with
+        the module level partition functions. It is not applicable if the
+        atomic grids or the partition are customized (e.g. in subclasses).
+        '''
+        for name in ('gen_atomic_grids', 'get_partition', 'gen_partition'):
+            method = getattr(self, name)
+            if getattr(method, '__func__', None) is not getattr(Grids, name):
+                logger.debug(self, '%s is overridden. Incremental build is '
+                             'not used', name)
+                return False
+        return True
+
+    def _build_incremental(self, mol, with_non0tab=False, sort_grids=True):
+        '''Update the grids of the previous build for the geometry of mol.
+        See the attribute :attr:`incremental`.
+        '''
+        natm = mol.natm
+        atm_coords = numpy.asarray(mol.atom_coords(), order='C')
+        signature = self._incremental_signature(mol)
+        data = self._incremental_data
+        if data is None or data['signature'] != signature:
+            atom_grids_tab = self.gen_atomic_grids(
+                mol, self.atom_grid, self.radi_method, self.level, self.prune)
+            data = self._incremental_data = {
+                'signature': signature,
+                'atom_grids_tab': atom_grids_tab,
+                # weights of each atom and the geometry to compute the weights
+                'weights': [None] * natm,
+                'weights_geom': [None] * natm,
+                'sort_idx': None,
+                'sort_geom': None,
+                'non0tab': None,
+                'non0tab_key': None,
+            }
+        atom_grids_tab = data['atom_grids_tab']
+
+        # Atoms whose neighbourhood is changed
+        update = numpy.ones(natm, dtype=bool)
+        rcut = self.incremental_rcut
+        for ia in range(natm):
+            ref = data['weights_geom'][ia]
+            if ref is None:
+                continue
+            r_ref = numpy.linalg.norm(ref - ref[ia], axis=1)
+            r_new = numpy.linalg.norm(atm_coords - atm_coords[ia], axis=1)
+            near = (r_ref < rcut) | (r_new < rcut)
+            disp = (atm_coords[near] - ref[near]) - (atm_coords[ia] - ref[ia])
+            update[ia] = abs(disp).max() > self.incremental_tol
+        logger.debug(self, 'Incremental build: update Becke weights of %d atoms',
+                     numpy.count_nonzero(update))
+
+        if numpy.any(update):
+            atom_weights = _gen_partition_fn(
+                mol, self.radii_adjust, self.atomic_radii, self.becke_scheme)
+        coords_all = []
+        for ia in range(natm):
+            coords, vol = atom_grids_tab[mol.atom_symbol(ia)]
+            coords = coords + atm_coords[ia]
+            if update[ia]:
+                data['weights'][ia] = atom_weights(ia, coords, vol)
+                data['weights_geom'][ia] = atm_coords
+            coords_all.append(coords)
+        self.coords = numpy.vstack(coords_all)
+        self.weights = numpy.hstack(data['weights'])
+
+        if sort_grids:
+            if (data['sort_idx'] is None or
+                abs(atm_coords - data['sort_geom']).max() > GROUP_REUSE_TOL):
+                data['sort_idx'] = arg_group_grids(mol, self.coords)
+                data['sort_geom'] = atm_coords
+            idx = data['sort_idx']
+            self.coords = self.coords[idx]
+            self.weights = self.weights[idx]
+
+        if self.alignment > 1:
+            padding = _padding_size(self.size, self.alignment)
+            logger.debug(self, 'Padding %d grids', padding)
+            if padding > 0:
+                self.coords = numpy.vstack(
+                    [self.coords, numpy.repeat([[1e4]*3], padding, axis=0)])
+                self.weights = numpy.hstack([self.weights, numpy.zeros(padding)])
+
+        if with_non0tab:
+            key = lib.cache.hash_key(mol._atm, mol._bas, mol._env, mol.cart,
+                                     self.cutoff, self.coords)
+            if data['non0tab_key'] != key:
+                data['non0tab'] = self.make_mask(mol, self.coords)
+                data['non0tab_key'] = key
+            self.non0tab = data['non0tab']
+            self.screen_index = self.non0tab
+        else:
+            self.screen_index = self.non0tab = None
+        logger.info(self, 'tot grids = %d', len(self.weights))
+        return self
+
     def kernel(self, mol=None, with_non0tab=False):
         self.dump_flags()
         return self.build(mol, with_non0tab=with_non0tab)
@@ -613,6 +805,7 @@ class Grids(lib.StreamObject):
                          self.weights.size - numpy.count_nonzero(idx))
             self.coords  = numpy.asarray(self.coords [idx], order='C')
             self.weights = numpy.asarray(self.weights[idx], order='C')
+            self._incremental_data = None
             if self.alignment > 1:
                 padding = _padding_size(self.size, self.alignment)
                 logger.debug(self, 'prune_by_density_: %d padding grids', padding)
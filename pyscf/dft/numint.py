@@ -21,7 +21,9 @@ Numerical integration functions for RKS and UKS with real AO basis
 '''
 
 import warnings
+import copy
 import ctypes
+import tempfile
 import numpy
 from pyscf import lib
 try:
@@ -978,6 +980,93 @@ def _tau_dot_sparse(bra, ket, wv, nbins, screen_index, pair_mask, ao_loc, out=No
                       ao_loc, hermi, out)
     return out
 
+def _sparse_xc_blocks(ni, mol, grids):
+    '''Split the grids into blocks of ni.sparse_xc_blksize. For each block,
+    generate a Mole object and a Grids object which only include the shells
+    that are significant on the grids of the block.
+
+    Yields:
+        submol, subgrids, ao_idx (the indices of the AOs of submol in mol),
+        p0, p1 (the range of the grids of the block)
+    '''
+    if grids.coords is None:
+        grids.build(with_non0tab=True)
+    non0tab = grids.non0tab
+    if non0tab is None or grids.mol is not mol:
+        non0tab = make_mask(mol, grids.coords)
+    ngrids = grids.coords.shape[0]
+    blksize = max(1, ni.sparse_xc_blksize // BLKSIZE) * BLKSIZE
+    ao_loc = mol.ao_loc_nr()
+    nao_per_shell = ao_loc[1:] - ao_loc[:-1]
+    for p0, p1 in lib.prange(0, ngrids, blksize):
+        mask = non0tab[p0//BLKSIZE:(p1+BLKSIZE-1)//BLKSIZE]
+        shl_mask = mask.any(axis=0)
+        shl_idx = numpy.where(shl_mask)[0]
+        if shl_idx.size == 0:
+            continue
+        ao_idx = numpy.where(numpy.repeat(shl_mask, nao_per_shell))[0]
+        submol = copy.copy(mol)
+        submol._bas = numpy.asarray(mol._bas[shl_idx], order='C')
+        subgrids = copy.copy(grids)
+        subgrids.mol = submol
+        subgrids.coords = grids.coords[p0:p1]
+        subgrids.weights = grids.weights[p0:p1]
+        subgrids.non0tab = subgrids.screen_index = \
+                numpy.asarray(mask[:,shl_idx], order='C')
+        yield submol, subgrids, ao_idx, p0, p1
+
+def _dm_subset(dms, ao_idx):
+    '''Gather the sub-blocks of density matrices for the given AOs'''
+    if dms is None:
+        return None
+    return numpy.asarray(dms)[...,ao_idx[:,None],ao_idx]
+
+def _grids_subset(x, p0, p1):
+    '''Slice the quantities (rho, vxc, fxc) on grids'''
+    if x is None:
+        return None
+    elif isinstance(x, (tuple, list)):
+        return type(x)(_grids_subset(xi, p0, p1) for xi in x)
+    return x[...,p0:p1]
+
+def _nr_sparse_xc(fn, ni, mol, grids, dm_kwargs, grid_kwargs, kwargs):
+    '''Evaluate the XC integration function fn (nr_rks, nr_uks, nr_rks_fxc,
+    nr_uks_fxc) block by block. The AOs of each block are compacted to the
+    shells which are significant on the block of grids, so that the cost of
+    each block does not depend on the size of the system.
+
+    The density matrices in dm_kwargs and the quantities on grids in
+    grid_kwargs are passed to fn after being truncated to the block. The
+    matrices in the returns are scattered to the full AO space and summed
+    over blocks.
+    '''
+    nao = mol.nao
+    out = None
+    with lib.temporary_env(ni, sparse_xc=False, ao_cache=False):
+        for submol, subgrids, ao_idx, p0, p1 in _sparse_xc_blocks(ni, mol, grids):
+            sub_kwargs = {k: _dm_subset(v, ao_idx) for k, v in dm_kwargs.items()}
+            for k, v in grid_kwargs.items():
+                sub_kwargs[k] = _grids_subset(v, p0, p1)
+            res = fn(ni, submol, subgrids, **sub_kwargs, **kwargs)
+            if not isinstance(res, tuple):
+                res = (res,)
+            if out is None:
+                out = [numpy.zeros_like(x) for x in res[:-1]]
+                v = res[-1]
+                out.append(numpy.zeros(v.shape[:-2]+(nao,nao), dtype=v.dtype))
+            for x, y in zip(out[:-1], res[:-1]):
+                x += y
+            out[-1][...,ao_idx[:,None],ao_idx] += res[-1]
+
+        if out is None:
+            # No significant AO values on any grids
+            return fn(ni, mol, grids, **dm_kwargs, **grid_kwargs, **kwargs)
+    if len(out) == 1:
+        return out[0]
+    # nelec and excsum
+    out[:-1] = [x[()] for x in out[:-1]]
+    return tuple(out)
+
 def nr_vxc(mol, grids, xc_code, dms, spin=0, relativity=0, hermi=0,
            max_memory=2000, verbose=None):
     '''
@@ -1120,6 +1209,11 @@ def nr_rks(ni, mol, grids, xc_code, dms, relativity=0, hermi=1,
     >>> ni = dft.numint.NumInt()
     >>> nelec, exc, vxc = ni.nr_rks(mol, grids, 'lda,vwn', dm)
     '''
+    if getattr(ni, 'sparse_xc', False):
+        return _nr_sparse_xc(
+            nr_rks, ni, mol, grids, {'dms': dms}, {},
+            dict(xc_code=xc_code, relativity=relativity, hermi=hermi,
+                 max_memory=max_memory, verbose=verbose))
     xctype = ni._xc_type(xc_code)
     make_rho, nset, nao = ni._gen_rho_evaluator(mol, dms, hermi, False, grids)
     ao_loc = mol.ao_loc_nr()
@@ -1236,6 +1330,11 @@ def nr_uks(ni, mol, grids, xc_code, dms, relativity=0, hermi=1,
     >>> ni = dft.numint.NumInt()
     >>> nelec, exc, vxc = ni.nr_uks(mol, grids, 'lda,vwn', dm)
     '''
+    if getattr(ni, 'sparse_xc', False):
+        return _nr_sparse_xc(
+            nr_uks, ni, mol, grids, {'dms': dms}, {},
+            dict(xc_code=xc_code, relativity=relativity, hermi=hermi,
+                 max_memory=max_memory, verbose=verbose))
     xctype = ni._xc_type(xc_code)
     ao_loc = mol.ao_loc_nr()
     cutoff = grids.cutoff * 1e2
@@ -1463,6 +1562,12 @@ def nr_rks_fxc(ni, mol, grids, xc_code, dm0, dms, relativity=0, hermi=0,
     Examples:
 
     '''
+    if getattr(ni, 'sparse_xc', False):
+        return _nr_sparse_xc(
+            nr_rks_fxc, ni, mol, grids, {'dm0': dm0, 'dms': dms},
+            {'rho0': rho0, 'vxc': vxc, 'fxc': fxc},
+            dict(xc_code=xc_code, relativity=relativity, hermi=hermi,
+                 max_memory=max_memory, verbose=verbose))
     if isinstance(dms, numpy.ndarray):
         dtype = dms.dtype
     else:
@@ -1745,6 +1850,12 @@ def nr_uks_fxc(ni, mol, grids, xc_code, dm0, dms, relativity=0, hermi=0,
     Examples:
 
     '''
+    if getattr(ni, 'sparse_xc', False):
+        return _nr_sparse_xc(
+            nr_uks_fxc, ni, mol, grids, {'dm0': dm0, 'dms': dms},
+            {'rho0': rho0, 'vxc': vxc, 'fxc': fxc},
+            dict(xc_code=xc_code, relativity=relativity, hermi=hermi,
+                 max_memory=max_memory, verbose=verbose))
     if isinstance(dms, numpy.ndarray):
         dtype = dms.dtype
     else:
@@ -2683,15 +2794,25 @@ def _block_loop(ni, mol, grids, nao=None, deriv=0, max_memory=2000,
     # the xxx_sparse() functions require ngrids 8-byte aligned
     allow_sparse = ngrids % ALIGNMENT_UNIT == 0
 
+    ao_cache = None
+    if getattr(ni, 'ao_cache', False):
+        ao_cache = ni._get_ao_cache(mol, grids, non0tab)
+
     if buf is None:
         buf = _empty_aligned(comp * blksize * nao)
     for ip0, ip1 in lib.prange(0, ngrids, blksize):
         coords = grids.coords[ip0:ip1]
         weight = grids.weights[ip0:ip1]
         mask = screen_index[ip0//BLKSIZE:]
-        # TODO: pass grids.cutoff to eval_ao
-        ao = ni.eval_ao(mol, coords, deriv=deriv, non0tab=mask,
-                        cutoff=grids.cutoff, out=buf)
+        ao = None
+        if ao_cache is not None:
+            ao = ao_cache.get(ip0, ip1, deriv)
+        if ao is None:
+            # TODO: pass grids.cutoff to eval_ao
+            ao = ni.eval_ao(mol, coords, deriv=deriv, non0tab=mask,
+                            cutoff=grids.cutoff, out=buf)
+            if ao_cache is not None:
+                ao_cache.put(ip0, ip1, deriv, ao, max_memory)
         if not allow_sparse and not _sparse_enough(mask):
             # Unset mask for dense AO tensor. It determines which eval_rho
             # to be called in make_rho
@@ -2699,6 +2820,71 @@ def _block_loop(ni, mol, grids, nao=None, deriv=0, max_memory=2000,
         yield ao, mask, weight, coords
 
 
+class _AOCache(object):
+    '''AO values (and derivatives) on grids, stored by the grid blocks of
+    NumInt.block_loop. Blocks are held in memory until the memory budget is
+    reached. The remaining blocks are written to a memmap file in TMPDIR if
+    spill is enabled, or not cached otherwise.
+    '''
+    def __init__(self, signature, spill=False):
+        self.signature = signature
+        self.spill = spill
+        self.blocks = {}
+        self.nbytes = 0
+        self.nbytes_disk = 0
+        self.hits = 0
+        self.misses = 0
+        self._swapfile = None
+
+    def get(self, ip0, ip1, deriv):
+        val = self.blocks.get((ip0, ip1))
+        if val is None or val[0] < deriv:
+            self.misses += 1
+            return None
+        self.hits += 1
+        deriv_cached, ao = val
+        # AO values are stored as (nao,ngrids) C-contiguous arrays. Transpose
+        # to recover the layout of the output of eval_ao
+        ao = ao.swapaxes(-1, -2)
+        if deriv == deriv_cached:
+            return ao
+        elif deriv == 0:
+            return ao[0]
+        else:
+            return ao[:(deriv+1)*(deriv+2)*(deriv+3)//6]
+
+    def put(self, ip0, ip1, deriv, ao, max_memory):
+        old = self.blocks.get((ip0, ip1))
+        if old is not None and old[0] >= deriv:
+            return
+        mem_avail = max_memory - lib.current_memory()[0]
+        if old is not None and not isinstance(old[1], numpy.memmap):
+            mem_avail += old[1].nbytes / 1e6
+        ao = ao.swapaxes(-1, -2)
+        if ao.nbytes / 1e6 < mem_avail * .5:
+            buf = _empty_aligned(ao.shape)
+            buf[:] = ao
+            ao = buf
+            self.nbytes += ao.nbytes
+        elif self.spill:
+            if self._swapfile is None:
+                self._swapfile = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+            f = self._swapfile
+            offset = self.nbytes_disk
+            f.seek(offset)
+            f.write(numpy.ascontiguousarray(ao).tobytes())
+            f.flush()
+            ao = numpy.memmap(f.name, dtype=ao.dtype, mode='r',
+                              offset=offset, shape=ao.shape)
+            self.nbytes_disk += ao.nbytes
+        else:
+            return
+        if old is not None and not isinstance(old[1], numpy.memmap):
+            self.nbytes -= old[1].nbytes
+        ao.flags.writeable = False
+        self.blocks[(ip0, ip1)] = (deriv, ao)
+
+
 class _NumIntMixin(lib.StreamObject):
     libxc = libxc
 
@@ -2820,6 +3006,48 @@ class NumInt(_NumIntMixin):
 
     cutoff = CUTOFF * 1e2  # cutoff for small AO product
 
+    # Whether to keep the AO values on grids between the calls of block_loop.
+    # False: disabled; True: cache in memory within the max_memory budget;
+    # 'disk': blocks beyond the memory budget are spilled to a memmap file in
+    # lib.param.TMPDIR
+    ao_cache = getattr(__config__, 'dft_numint_NumInt_ao_cache', False)
+    _ao_cache = None
+
+    # Whether to evaluate nr_rks, nr_uks, nr_rks_fxc and nr_uks_fxc in the
+    # sparse mode. In the sparse mode, grids are processed in blocks of
+    # sparse_xc_blksize. Each block only keeps the AO shells which are
+    # significant on the block and the corresponding sub-blocks of density
+    # matrices. It is efficient for large systems.
+    sparse_xc = getattr(__config__, 'dft_numint_NumInt_sparse_xc', False)
+    sparse_xc_blksize = getattr(__config__, 'dft_numint_NumInt_sparse_xc_blksize',
+                                BLKSIZE*16)
+
+    def _get_ao_cache(self, mol, grids, non0tab=None):
+        '''Return the AO cache for the given mol and grids. The cache is
+        reset if mol, grids or non0tab are changed.'''
+        signature = (grids.coords, grids.cutoff,
+                     lib.cache.hash_key(mol._atm, mol._bas, mol._env, mol.cart,
+                                        grids.coords.shape, non0tab))
+        cache = self._ao_cache
+        if (cache is None or cache.signature[0] is not grids.coords or
+            cache.signature[1:] != signature[1:]):
+            cache = self._ao_cache = _AOCache(signature, self.ao_cache == 'disk')
+        return cache
+
+    def reset_ao_cache(self):
+        '''Release the cached AO values'''
+        self._ao_cache = None
+        return self
+
+    def ao_cache_info(self):
+        '''Statistics of the AO cache: a dict of hits, misses, memory (in MB)
+        and disk usage (in MB)'''
+        cache = self._ao_cache
+        if cache is None:
+            return {'hits': 0, 'misses': 0, 'memory': 0, 'disk': 0}
+        return {'hits': cache.hits, 'misses': cache.misses,
+                'memory': cache.nbytes / 1e6, 'disk': cache.nbytes_disk / 1e6}
+
     @lib.with_doc(nr_vxc.__doc__)
     def nr_vxc(self, mol, grids, xc_code, dms, spin=0, relativity=0, hermi=0,
                max_memory=2000, verbose=None):
@@ -170,6 +170,78 @@ class KnownValues(unittest.TestCase):
         self.assertTrue(abs(ref - idx).max() == 0)
 
 
+    def test_incremental_build(self):
+        grids = gen_grid.Grids(h2o)
+        grids.incremental = True
+        grids.build(with_non0tab=True)
+        ref = gen_grid.Grids(h2o).build(with_non0tab=True)
+        self.assertAlmostEqual(abs(grids.weights - ref.weights).max(), 0, 12)
+        self.assertAlmostEqual(abs(grids.coords - ref.coords).max(), 0, 12)
+        self.assertTrue(numpy.array_equal(grids.non0tab, ref.non0tab))
+
+        # rigid translation does not change the partition weights
+        mol1 = h2o.set_geom_(h2o.atom_coords() + .1, unit='Bohr', inplace=False)
+        non0tab = grids.non0tab
+        grids.reset(mol1).build(with_non0tab=True)
+        ref = gen_grid.Grids(mol1).build(with_non0tab=True)
+        self.assertAlmostEqual(abs(grids.weights - ref.weights).max(), 0, 9)
+        self.assertAlmostEqual(abs(grids.coords - ref.coords).max(), 0, 9)
+        self.assertFalse(grids.non0tab is non0tab)
+
+        coords = mol1.atom_coords()
+        coords[1,2] += .01
+        mol2 = mol1.set_geom_(coords, unit='Bohr', inplace=False)
+        grids.reset(mol2).build()
+        ref = gen_grid.Grids(mol2).build()
+        # Grids ordering is reused for small displacements
+        idx = numpy.lexsort(grids.coords.T)
+        idx_ref = numpy.lexsort(ref.coords.T)
+        self.assertAlmostEqual(abs(grids.weights[idx] - ref.weights[idx_ref]).max(), 0, 9)
+
+        grids.level = 2
+        grids.build()
+        self.assertEqual(grids.size, gen_grid.Grids(mol2).set(level=2).build().size)
+
+    def test_incremental_build_custom_partition(self):
+        class Grids(gen_grid.Grids):
+            def get_partition(self, mol, atom_grids_tab=None, *args, **kwargs):
+                coords, weights = gen_grid.Grids.get_partition(
+                    self, mol, atom_grids_tab, *args, **kwargs)
+                return coords, weights * .5
+        grids = Grids(h2o)
+        grids.incremental = True
+        grids.build()
+        ref = gen_grid.Grids(h2o).build()
+        self.assertAlmostEqual(abs(grids.weights - ref.weights*.5).max(), 0, 12)
+        self.assertTrue(grids._incremental_data is None)
+
+        grids = gen_grid.Grids(h2o)
+        grids.incremental = True
+        grids.get_partition = lambda *args: Grids.get_partition(grids, *args)
+        grids.build()
+        self.assertAlmostEqual(abs(grids.weights - ref.weights*.5).max(), 0, 12)
+
+    def test_screened_partition(self):
+        mol = gto.M(atom='''
+            C 0 0 0; C 0 0 2.5; C 0 0 5.; C 0 0 7.5; C 0 0 10.; C 0 0 12.5
+            H 0 1 0; H 0 1 2.5; H 0 1 5.; H 0 1 7.5; H 0 1 10.; H 0 1 12.5''')
+        atom_grids_tab = gen_grid.gen_atomic_grids(mol, level=1)
+        ref_scheme = lambda g: gen_grid.stratmann(g)
+        for radii_adjust in (None, radi.treutler_atomic_radii_adjust):
+            ref = gen_grid.get_partition(mol, atom_grids_tab, radii_adjust,
+                                         becke_scheme=ref_scheme)[1]
+            with lib.temporary_env(gen_grid, PARTITION_BLKSIZE=200):
+                coords, weights = gen_grid.get_partition(
+                    mol, atom_grids_tab, radii_adjust,
+                    becke_scheme=gen_grid.stratmann)
+            self.assertAlmostEqual(abs(weights - ref).max(), 0, 9)
+
+        ref = gen_grid.get_partition(mol, atom_grids_tab, radi.becke_atomic_radii_adjust)[1]
+        with lib.temporary_env(gen_grid, PARTITION_BLKSIZE=200):
+            weights = gen_grid.get_partition(mol, atom_grids_tab,
+                                             radi.becke_atomic_radii_adjust)[1]
+        self.assertAlmostEqual(abs(weights - ref).max(), 0, 12)
+
 if __name__ == "__main__":
     print("Test Grids")
     unittest.main()
@@ -570,6 +570,63 @@ class KnownValues(unittest.TestCase):
 
             self.assertAlmostEqual(abs(fxc1*rho1[0] - fxc2*rho2[0]).max(), 0, 4)
 
+    def test_ao_cache(self):
+        ni = numint.NumInt()
+        numpy.random.seed(12)
+        dm = numpy.random.random((nao, nao))
+        dm = dm + dm.T
+        ref = ni.nr_vxc(mol, mf.grids, 'pbe,', dm)
+
+        ni.ao_cache = True
+        v1 = ni.nr_vxc(mol, mf.grids, 'pbe,', dm)
+        v2 = ni.nr_vxc(mol, mf.grids, 'lda,', dm)
+        v3 = ni.nr_vxc(mol, mf.grids, 'pbe,', dm)
+        self.assertAlmostEqual(abs(v1[0] - ref[0]), 0, 9)
+        self.assertAlmostEqual(abs(v1[1] - ref[1]).max(), 0, 9)
+        self.assertAlmostEqual(abs(v3[1] - ref[1]).max(), 0, 9)
+        self.assertAlmostEqual(abs(v2[1] - ni.reset_ao_cache().nr_vxc(
+            mol, mf.grids, 'lda,', dm)[1]).max(), 0, 9)
+        info = ni.ao_cache_info()
+        self.assertTrue(info['misses'] > 0)
+        self.assertTrue(info['memory'] > 0)
+
+        ni.nr_vxc(mol, mf.grids, 'lda,', dm)
+        self.assertEqual(ni.ao_cache_info()['hits'], info['misses'])
+
+        # Cache is reset when geometry is changed
+        mol2 = mol.set_geom_(mol.atom_coords()+.01, unit='Bohr', inplace=False)
+        ni.nr_vxc(mol2, mf.grids, 'lda,', dm)
+        self.assertEqual(ni.ao_cache_info()['hits'], 0)
+
+        ni.ao_cache = 'disk'
+        ni.reset_ao_cache()
+        with lib.temporary_env(lib.param, TMPDIR='/tmp'):
+            ni.nr_vxc(mol, mf.grids, 'pbe,', dm, max_memory=1)
+        v4 = ni.nr_vxc(mol, mf.grids, 'pbe,', dm, max_memory=1)
+        self.assertTrue(ni.ao_cache_info()['disk'] > 0)
+        self.assertAlmostEqual(abs(v4[1] - ref[1]).max(), 0, 9)
+
+    def test_sparse_xc(self):
+        ni = numint.NumInt()
+        numpy.random.seed(12)
+        dm = mf.get_init_guess(key='minao')
+        dm1 = numpy.random.random((2, nao, nao)) * .1
+        for xc in ('lda,', 'pbe,', 'm06l'):
+            ref_rks = ni.nr_rks(mol, mf.grids, xc, dm)
+            ref_uks = ni.nr_uks(mol, mf.grids, xc, (dm, dm*.5))
+            ref_fxc = ni.nr_rks_fxc(mol, mf.grids, xc, dm, dm1)
+            ni.sparse_xc = True
+            rks = ni.nr_rks(mol, mf.grids, xc, dm)
+            uks = ni.nr_uks(mol, mf.grids, xc, (dm, dm*.5))
+            fxc = ni.nr_rks_fxc(mol, mf.grids, xc, dm, dm1)
+            ni.sparse_xc = False
+            self.assertAlmostEqual(abs(rks[0] - ref_rks[0]), 0, 9)
+            self.assertAlmostEqual(abs(rks[1] - ref_rks[1]), 0, 9)
+            self.assertAlmostEqual(abs(rks[2] - ref_rks[2]).max(), 0, 8)
+            self.assertAlmostEqual(abs(uks[1] - ref_uks[1]).max(), 0, 9)
+            self.assertAlmostEqual(abs(uks[2] - ref_uks[2]).max(), 0, 8)
+            self.assertAlmostEqual(abs(fxc - ref_fxc).max(), 0, 8)
+
 if __name__ == "__main__":
     print("Test numint")
     unittest.main()
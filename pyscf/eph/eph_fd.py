@@ -22,23 +22,24 @@ electron-phonon matrix from finite difference
 
 import copy
 import numpy as np
-from pyscf import scf, dft, gto, hessian
+from pyscf import lib, scf, dft, gto, hessian
 from pyscf.eph import rhf as rhf_eph
 from pyscf.lib import logger
 from pyscf.data.nist import MP_ME
+from pyscf import __config__
 
 CUTOFF_FREQUENCY = rhf_eph.CUTOFF_FREQUENCY
 KEEP_IMAG_FREQUENCY = rhf_eph.KEEP_IMAG_FREQUENCY
+# Number of processes to run the displaced mean-field calculations
+NPROC = getattr(__config__, 'eph_fd_nproc', 1)
 
 def run_mfs(mf, mols_a, mols_b):
     nconfigs = len(mols_a)
     dm0 = mf.make_rdm1()
     mflist = []
     for i in range(nconfigs):
-        mf1 = copy.copy(mf)
-        mf1.reset(mols_a[i])
-        mf2 = copy.copy(mf)
-        mf2.reset(mols_b[i])
+        mf1 = _copy_mf(mf, mols_a[i])
+        mf2 = _copy_mf(mf, mols_b[i])
         mf1.kernel(dm0=dm0)
         mf2.kernel(dm0=dm0)
         if not (mf1.converged):
@@ -71,17 +72,59 @@ def gen_moles(mol, disp):
             mol_s.append(mol.set_geom_(atoms, inplace=False, unit='B'))
     return mol_a, mol_s
 
+def _copy_mf(mf, mol):
+    '''A copy of mf for mol. The attributes which are reset in place are
+    copied so that mf is not changed.'''
+    mf1 = copy.copy(mf)
+    for key in ('with_df', 'grids', 'nlcgrids'):
+        if getattr(mf1, key, None) is not None:
+            setattr(mf1, key, copy.copy(getattr(mf1, key)))
+    return mf1.reset(mol)
+
+def _get_vfull(mf1):
+    return mf1.get_veff() + mf1.get_hcore() - mf1.mol.intor_symmetric('int1e_kin')
+
+def _run_vfull(mf, mol, dm0):
+    mf1 = _copy_mf(mf, mol)
+    mf1.chkfile = None
+    mf1.kernel(dm0=dm0)
+    return mf1.converged, _get_vfull(mf1)
+
+def run_vfulls(mf, mols_a, mols_b, nproc=NPROC):
+    '''Run the mean-field calculations of the displaced molecules in nproc
+    processes. Returns the pairs of potential matrices <u|V|v> (without the
+    kinetic part) of the + and - displacements.
+    '''
+    nconfigs = len(mols_a)
+    dm0 = mf.make_rdm1()
+    # The integrals of the equilibrium geometry are not needed by workers
+    mf0 = _copy_mf(mf, None)
+    with lib.pool.ProcessPool(nproc) as pool:
+        results = pool.map(_run_vfull, [mf0] * (nconfigs*2), mols_a + mols_b,
+                           [dm0] * (nconfigs*2))
+    vset = []
+    for i in range(nconfigs):
+        (conv1, vfull1), (conv2, vfull2) = results[i], results[nconfigs+i]
+        if not conv1:
+            logger.warn(mf, "%ith config mf1 not converged", i)
+        if not conv2:
+            logger.warn(mf, "%ith config mf2 not converged", i)
+        vset.append((vfull1, vfull2))
+    return vset
+
 def get_vmat(mf, mfset, disp):
+    vset = ((_get_vfull(mf1), _get_vfull(mf2)) for mf1, mf2 in mfset)
+    return _get_vmat(mf, vset, disp)
+
+def _get_vmat(mf, vset, disp):
     vmat=[]
     mygrad = mf.nuc_grad_method()
     ve = mygrad.get_veff() + mygrad.get_hcore() + mf.mol.intor("int1e_ipkin")
     RESTRICTED = (ve.ndim==3)
     aoslice = mf.mol.aoslice_by_atom()
-    for ki, (mf1, mf2) in enumerate(mfset):
+    for ki, (vfull1, vfull2) in enumerate(vset):  # <u+|V+|v+>, <u-|V-|v->
         atmid, axis = np.divmod(ki, 3)
         p0, p1 = aoslice[atmid][2:]
-        vfull1 = mf1.get_veff() + mf1.get_hcore() - mf1.mol.intor_symmetric('int1e_kin')  # <u+|V+|v+>
-        vfull2 = mf2.get_veff() + mf2.get_hcore() - mf2.mol.intor_symmetric('int1e_kin')  # <u-|V-|v->
         vfull = (vfull1 - vfull2)/disp  # (<p+|V+|q+>-<p-|V-|q->)/dR
         if RESTRICTED:
             vfull[p0:p1] -= ve[axis,p0:p1]
@@ -93,7 +136,15 @@ def get_vmat(mf, mfset, disp):
 
     return np.asarray(vmat)
 
-def kernel(mf, disp=1e-4, mo_rep=False, cutoff_frequency=CUTOFF_FREQUENCY, keep_imag_frequency=KEEP_IMAG_FREQUENCY):
+def kernel(mf, disp=1e-4, mo_rep=False, cutoff_frequency=CUTOFF_FREQUENCY,
+           keep_imag_frequency=KEEP_IMAG_FREQUENCY, nproc=NPROC):
+    '''Electron-phonon matrix from finite differences of the mean-field
+    potential. The 6N displaced mean-field calculations are distributed to
+    nproc processes (see :class:`lib.pool.ProcessPool`) if nproc > 1.
+    nproc=None uses lib.num_threads() processes. SCF objects of classes
+    created at runtime (other than density_fit) are not supported by the
+    parallel mode.
+    '''
     if isinstance(mf, scf.hf.KohnShamDFT):
         mf.grids.build()
     if not mf.converged: mf.kernel()
@@ -103,8 +154,12 @@ def kernel(mf, disp=1e-4, mo_rep=False, cutoff_frequency=CUTOFF_FREQUENCY, keep_
     mass = mol.atom_mass_list() * MP_ME
     vec = rhf_eph._freq_mass_weighted_vec(vec, omega, mass)
     mols_a, mols_b = gen_moles(mol, disp/2.0) # generate a bunch of molecules with disp/2 on each cartesion coord
-    mfset = run_mfs(mf, mols_a, mols_b) # run mean field calculations on all these molecules
-    vmat = get_vmat(mf, mfset, disp) # extracting <p|dV|q>/dR
+    if nproc is None or nproc > 1:
+        vset = run_vfulls(mf, mols_a, mols_b, nproc)
+        vmat = _get_vmat(mf, vset, disp)
+    else:
+        mfset = run_mfs(mf, mols_a, mols_b) # run mean field calculations on all these molecules
+        vmat = get_vmat(mf, mfset, disp) # extracting <p|dV|q>/dR
     if mo_rep:
         if RESTRICTED:
             vmat = np.einsum('xuv,up,vq->xpq', vmat, mf.mo_coeff.conj(), mf.mo_coeff)
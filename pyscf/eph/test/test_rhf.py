@@ -66,6 +66,32 @@ class KnownValues(unittest.TestCase):
             self.assertTrue(min(np.linalg.norm(ephmo[i]-matmo[i]),np.linalg.norm(ephmo[i]+matmo[i]))<1e-5)
             self.assertTrue(min(abs(ephmo[i]-matmo[i]).max(), abs(ephmo[i]+matmo[i]).max())<1e-5)
 
+    def test_finite_diff_nproc(self):
+        mat, omega = eph_fd.kernel(mf, nproc=1)
+        mat1, omega1 = eph_fd.kernel(mf, nproc=2)
+        self.assertAlmostEqual(abs(omega1 - omega).max(), 0, 9)
+        self.assertAlmostEqual(abs(mat1 - mat).max(), 0, 9)
+
+    def test_finite_diff_nproc_direct_scf(self):
+        # Direct SCF holds the integral screening object mf.opt
+        mf1 = scf.RHF(mol)
+        mf1.max_memory = 0
+        mf1.conv_tol = 1e-12
+        mf1.kernel()
+        self.assertTrue(mf1.opt is not None)
+        mat, omega = eph_fd.kernel(mf1, nproc=1)
+        mat1, omega1 = eph_fd.kernel(mf1, nproc=2)
+        self.assertAlmostEqual(abs(omega1 - omega).max(), 0, 9)
+        self.assertAlmostEqual(abs(mat1 - mat).max(), 0, 7)
+
+        mf1 = scf.RHF(mol).density_fit()
+        mf1.conv_tol = 1e-12
+        mf1.kernel()
+        mat, omega = eph_fd.kernel(mf1, nproc=1)
+        mat1, omega1 = eph_fd.kernel(mf1, nproc=2)
+        self.assertAlmostEqual(abs(omega1 - omega).max(), 0, 9)
+        self.assertAlmostEqual(abs(mat1 - mat).max(), 0, 7)
+
 if __name__ == '__main__':
     print("Full Tests for EPH-RHF")
     unittest.main()
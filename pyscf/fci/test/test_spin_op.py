@@ -37,7 +37,7 @@ def setUpModule():
     c0 = numpy.zeros((na,na))
     c0[0,0] = 1
     c0[-1,-1] = 1e-4
-    e0, ci0 = fci.direct_spin0.kernel(h1, h2, norb, nelec, ci0=c0)
+    e0, ci0 = fci.direct_spin0.kernel(h1, h2, norb, nelec, ci0=c0, tol=1e-12)
 
 
 def tearDownModule():
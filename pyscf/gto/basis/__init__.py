@@ -17,16 +17,25 @@
 #
 
 import os
+import re
 import sys
 from os.path import join
 if sys.version_info < (2,7):
     import imp
 else:
     import importlib
+import numpy
 from pyscf.gto.basis import parse_nwchem
+from pyscf.lib import cache
 from pyscf.lib.exceptions import BasisNotFoundError
 from pyscf import __config__
 
+# Directory for the persistent cache of the parsed basis sets. The cache is
+# disabled if the directory is not specified.
+BASIS_CACHE_DIR = getattr(__config__, 'gto_basis_cache_dir', None)
+# Upper bound (in MB) of the size of the basis cache
+BASIS_CACHE_SIZE = getattr(__config__, 'gto_basis_cache_size', 200)
+
 ALIAS = {
     'ano'        : 'ano.dat'        ,
     'anorcc'     : 'ano.dat'        ,
@@ -472,6 +481,137 @@ def _truncate(basis, contr_scheme, symb, split_name):
 optimize_contraction = parse_nwchem.optimize_contraction
 to_general_contraction = parse_nwchem.to_general_contraction
 
+# Parsed basis of each (source file, element, optimize) in the current process
+_basis_cache = {}
+# The basis blocks of each element in the NWChem format files
+_basis_blocks_cache = {}
+_disk_cache = None
+
+def _get_disk_cache():
+    '''The lib.cache.DiskCache object for the parsed basis sets. None is
+    returned if BASIS_CACHE_DIR is not set.
+    '''
+    global _disk_cache
+    if not BASIS_CACHE_DIR:
+        return None
+    if _disk_cache is None or _disk_cache.cachedir != BASIS_CACHE_DIR:
+        _disk_cache = cache.DiskCache(BASIS_CACHE_DIR, BASIS_CACHE_SIZE)
+    _disk_cache.max_size = BASIS_CACHE_SIZE
+    return _disk_cache
+
+def _source_stamp(path):
+    '''Modification time and size of the source file. Cached basis is
+    invalidated when the stamp is changed.'''
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def _pack_basis(basis):
+    '''Pack the basis of an element into a 1D float array
+
+    [nshell, (nheader, header..., nprim, ncol, exps_and_coeffs...) * nshell]
+
+    None is returned if the basis cannot be represented as arrays.
+    '''
+    out = [len(basis)]
+    for shell in basis:
+        nheader = 0
+        while nheader < len(shell) and not isinstance(shell[nheader], (list, tuple)):
+            nheader += 1
+        try:
+            data = numpy.asarray(shell[nheader:], dtype=numpy.double)
+        except ValueError:
+            return None
+        if data.ndim != 2:
+            return None
+        out.append([nheader] + list(shell[:nheader]) + list(data.shape))
+        out.append(data.ravel())
+    return numpy.hstack(out).astype(numpy.double)
+
+def _unpack_basis(packed):
+    '''Convert the array of _pack_basis to the internal basis format'''
+    basis = []
+    p0 = 1
+    for i in range(int(packed[0])):
+        nheader = int(packed[p0])
+        header = [int(x) for x in packed[p0+1:p0+1+nheader]]
+        p0 += nheader + 1
+        nprim, ncol = int(packed[p0]), int(packed[p0+1])
+        p0 += 2
+        data = packed[p0:p0+nprim*ncol].reshape(nprim, ncol)
+        p0 += nprim * ncol
+        basis.append(header + data.tolist())
+    return basis
+
+def _cached_load(path, symb, optimize, parser):
+    '''Load the basis of symb from the source file path. The parsed basis is
+    kept in a process-wide cache and (if BASIS_CACHE_DIR is set) a persistent
+    cache on disk. Both caches are invalidated when the source is modified.
+    '''
+    try:
+        stamp = _source_stamp(path)
+    except OSError:
+        return parser()
+
+    key = (path, symb, bool(optimize))
+    cached = _basis_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return _unpack_basis(cached[1])
+
+    disk_cache = _get_disk_cache()
+    if disk_cache is not None:
+        disk_key = cache.hash_key('basis', path, symb, bool(optimize), stamp)
+        packed = disk_cache.get(disk_key)
+        if packed is not None:
+            _basis_cache[key] = (stamp, packed)
+            return _unpack_basis(packed)
+
+    basis = parser()
+    packed = _pack_basis(basis)
+    if packed is not None:
+        _basis_cache[key] = (stamp, packed)
+        if disk_cache is not None:
+            disk_cache.set(disk_key, packed)
+        basis = _unpack_basis(packed)
+    return basis
+
+def _search_seg(path, symb):
+    '''Same to parse_nwchem.search_seg. The file is split into the basis
+    blocks of each element only once.'''
+    stamp = _source_stamp(path)
+    cached = _basis_blocks_cache.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, 'r') as fin:
+            fdata = re.split(parse_nwchem.BASIS_SET_DELIMITER, fin.read())
+        blocks = {}
+        for dat in fdata:
+            dat0 = dat.split(None, 1)
+            if dat0 and dat0[0] not in blocks:
+                blocks[dat0[0]] = dat
+        cached = _basis_blocks_cache[path] = (stamp, blocks)
+    raw_basis = cached[1].get(parse_nwchem._std_symbol(symb), '')
+    return [x for x in raw_basis.splitlines() if x and 'END' not in x]
+
+def _load_nwchem(path, symb, optimize):
+    '''Load the basis of symb from a NWChem format file in the basis
+    library'''
+    return _cached_load(path, symb, optimize, lambda:
+                        parse_nwchem._parse(_search_seg(path, symb), optimize))
+
+def _load_module(basmod, name, symb):
+    '''Load the basis of symb from a Python module in the basis library.
+    The module is not imported if the basis is found in the cache.'''
+    def parser():
+        if sys.version_info < (2,7):
+            fp, pathname, description = imp.find_module(basmod, __path__)
+            mod = imp.load_module(name, fp, pathname, description)
+            fp.close()
+        else:
+            mod = importlib.import_module('.'+basmod, __package__)
+        return mod.__getattribute__(symb)
+    path = join(_BASIS_DIR, *basmod.split('.')) + '.py'
+    return _cached_load(path, symb, False, parser)
+
+
 
 def load(filename_or_basisname, symb, optimize=OPTIMIZE_CONTRACTION):
     '''Convert the basis of the given symbol to internal format
@@ -546,20 +686,13 @@ def load(filename_or_basisname, symb, optimize=OPTIMIZE_CONTRACTION):
         raise BasisNotFoundError(filename_or_basisname)
 
     if 'dat' in basmod:
-        b = parse_nwchem.load(join(_BASIS_DIR, basmod), symb, optimize)
+        b = _load_nwchem(join(_BASIS_DIR, basmod), symb, optimize)
     elif isinstance(basmod, (tuple, list)) and isinstance(basmod[0], str):
         b = []
         for f in basmod:
-            b += parse_nwchem.load(join(_BASIS_DIR, f), symb, optimize)
+            b += _load_nwchem(join(_BASIS_DIR, f), symb, optimize)
     else:
-        if sys.version_info < (2,7):
-            fp, pathname, description = imp.find_module(basmod, __path__)
-            mod = imp.load_module(name, fp, pathname, description)
-            b = mod.__getattribute__(symb)
-            fp.close()
-        else:
-            mod = importlib.import_module('.'+basmod, __package__)
-            b = mod.__getattribute__(symb)
+        b = _load_module(basmod, name, symb)
 
     if contr_scheme != 'Full':
         b = _truncate(b, contr_scheme, symb, split_name)
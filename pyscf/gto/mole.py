@@ -118,6 +118,163 @@ def M(**kwargs):
     mol.build(**kwargs)
     return mol
 
+def build_batch(geoms, basis='sto-3g', charge=0, spin=0,
+                unit=getattr(__config__, 'UNIT', 'Ang'), symmetry=False,
+                cart=False, **kwargs):
+    '''Build Mole objects for a list of geometries.
+
+    The libcint arguments (_bas, _env) of each element and basis set are
+    generated once and shared by all molecules. Symmetry is not detected
+    unless symmetry is specified. This is much faster than calling
+    :func:`M` for every geometry when many small molecules are needed.
+
+    Args:
+        geoms : list
+            Each geometry is either a tuple (symbols, coords) where symbols
+            is a list of atomic symbols (or nuclear charges) and coords is an
+            array of shape (natm,3), or any input accepted by :attr:`Mole.atom`.
+
+    Kwargs:
+        basis : str or dict
+            Basis set. Same to :attr:`Mole.basis`
+        charge, spin : int or list
+            Charge and spin of all molecules or of each molecule
+        unit, symmetry, cart :
+            Same to the attributes of :class:`Mole`
+
+        Other keyword arguments are assigned to each Mole object. Molecules
+        with ECP, nuclear model, nuclear properties, magmom or output file
+        are built by :meth:`Mole.build`.
+
+    Returns:
+        A list of Mole objects
+
+    Examples:
+
+    >>> coords = numpy.random.random((10000,2,3))
+    >>> mols = gto.mole.build_batch([(['H', 'H'], c) for c in coords], basis='sto3g')
+    '''
+    nmol = len(geoms)
+    if isinstance(charge, (int, numpy.integer)):
+        charge = [charge] * nmol
+    if spin is None or isinstance(spin, (int, numpy.integer)):
+        spin = [spin] * nmol
+
+    if any(kwargs.get(key) for key in ('ecp', 'nucmod', 'nucprop', 'magmom', 'output')):
+        return [M(atom=_batch_geom_to_atom(geom), basis=basis, charge=c,
+                  spin=s, unit=unit, symmetry=symmetry, cart=cart, **kwargs)
+                for geom, c, s in zip(geoms, charge, spin)]
+
+    if isinstance(unit, (str, unicode)):
+        if is_au(unit):
+            unit_fac = 1.
+        else:
+            unit_fac = 1./param.BOHR
+    else:
+        unit_fac = 1./unit
+
+    # (atom charge, formatted basis, _bas, _env) of each atomic symbol
+    templates = {}
+    def get_template(symb):
+        if symb not in templates:
+            if isinstance(basis, dict):
+                spec = basis.get(symb, basis.get(_rm_digit(symb),
+                                                 basis.get('default')))
+            else:
+                spec = basis
+            if spec is None:
+                templates[symb] = None
+            else:
+                _basis = format_basis({symb: spec})[symb]
+                bas0, env0 = make_bas_env(_basis, 0, 0)
+                templates[symb] = (elements.charge(symb), _basis, bas0, env0)
+        return templates[symb]
+
+    symb_cache = {}
+    mols = []
+    for geom, chg, s in zip(geoms, charge, spin):
+        if _is_symbols_coords(geom):
+            atom = _batch_geom_to_atom(geom)
+            symbs, coords = geom
+            symbs = [symb_cache.get(x) or symb_cache.setdefault(x, _atom_symbol(x))
+                     for x in symbs]
+            coords = numpy.asarray(coords, dtype=numpy.double).reshape(-1,3) * unit_fac
+        else:
+            atom = geom
+            _atom = format_atom(geom, unit=unit)
+            symbs = [a[0] for a in _atom]
+            coords = numpy.array([a[1] for a in _atom]).reshape(-1,3)
+        natm = len(symbs)
+
+        tmpls = [get_template(x) for x in symbs]
+        if any(t is None for t in tmpls):  # Basis not found
+            mols.append(M(atom=atom, basis=basis, charge=chg, spin=s, unit=unit,
+                          symmetry=symmetry, cart=cart, **kwargs))
+            continue
+
+        uniq_symbs = list(dict.fromkeys(symbs))
+        ptr_env = PTR_ENV_START + natm * 4
+        env = [numpy.zeros(PTR_ENV_START),
+               numpy.hstack((coords, numpy.zeros((natm,1)))).ravel()]
+        ptr_bas = {}
+        for x in uniq_symbs:
+            ptr_bas[x] = ptr_env
+            env.append(templates[x][3])
+            ptr_env += templates[x][3].size
+
+        _atm = numpy.zeros((natm, ATM_SLOTS), dtype=numpy.int32)
+        _atm[:,CHARGE_OF] = [t[0] for t in tmpls]
+        _atm[:,PTR_COORD] = PTR_ENV_START + numpy.arange(natm) * 4
+        _atm[:,NUC_MOD_OF] = NUC_POINT
+        _atm[:,PTR_ZETA] = _atm[:,PTR_COORD] + 3
+
+        nbas = [t[2].shape[0] for t in tmpls]
+        if natm > 0:
+            _bas = numpy.vstack([t[2] for t in tmpls])
+        else:
+            _bas = numpy.zeros((0,BAS_SLOTS), dtype=numpy.int32)
+        _bas[:,ATOM_OF] = numpy.repeat(numpy.arange(natm), nbas)
+        offsets = numpy.repeat([ptr_bas[x] for x in symbs], nbas)
+        _bas[:,PTR_EXP] += offsets
+        _bas[:,PTR_COEFF] += offsets
+
+        mol = Mole()
+        mol.__dict__.update(kwargs)
+        mol.atom = atom
+        mol.basis = basis
+        mol.unit = unit
+        mol.charge = chg
+        mol.spin = s
+        mol.symmetry = symmetry
+        mol.cart = cart
+        mol._atom = list(zip(symbs, coords.tolist()))
+        mol._basis = dict((x, templates[x][1]) for x in uniq_symbs)
+        mol._atm = _atm
+        mol._bas = _bas
+        mol._env = numpy.hstack(env)
+        if mol.spin is None:
+            mol.spin = mol.nelectron % 2
+        else:
+            mol.nelec
+        mol.magmom = [0.,] * natm
+        if symmetry:
+            mol._build_symmetry()
+        mol._built = True
+        mols.append(mol)
+    return mols
+
+def _is_symbols_coords(geom):
+    '''Whether geom is a tuple (symbols, coords)'''
+    return (isinstance(geom, tuple) and len(geom) == 2 and
+            isinstance(geom[0], (list, tuple, numpy.ndarray)) and
+            not isinstance(geom[1], (str, unicode, int, float)))
+
+def _batch_geom_to_atom(geom):
+    '''Convert the geometry input of build_batch to Mole.atom'''
+    if _is_symbols_coords(geom):
+        return list(zip(geom[0], numpy.asarray(geom[1]).tolist()))
+    return geom
+
 def gaussian_int(n, alpha):
     r'''int_0^inf x^n exp(-alpha x^2) dx'''
     n1 = (n + 1) * .5
@@ -56,6 +56,26 @@ class KnownValues(unittest.TestCase):
 
         self.assertEqual(len(gto.basis.load('def2-svp', 'Rn')), 16)
 
+    def test_basis_cache(self):
+        ref = gto.basis.parse_nwchem.load(
+            gto.basis.join(gto.basis._BASIS_DIR, 'cc-pvtz.dat'), 'C', False)
+        self.assertEqual(gto.basis.load('ccpvtz', 'C'), ref)
+        b = gto.basis.load('ccpvtz', 'C')
+        self.assertEqual(b, ref)
+        # The cached basis should not be affected by the modification of the
+        # returned basis
+        b[0][1][0] = 0.
+        self.assertEqual(gto.basis.load('ccpvtz', 'C'), ref)
+
+        ref = gto.basis.load('dyall-v2z', 'Au')
+        with tempfile.TemporaryDirectory() as d:
+            with lib.temporary_env(gto.basis, BASIS_CACHE_DIR=d,
+                                   _basis_cache={}):
+                self.assertEqual(gto.basis.load('dyall-v2z', 'Au'), ref)
+                gto.basis._basis_cache.clear()
+                self.assertEqual(gto.basis.load('dyall-v2z', 'Au'), ref)
+                self.assertEqual(gto.basis._get_disk_cache().hits, 1)
+
     def test_basis_load_from_file(self):
         ftmp = tempfile.NamedTemporaryFile()
         ftmp.write('''
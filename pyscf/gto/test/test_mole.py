@@ -1052,6 +1052,32 @@ H    P
         v1 = mol1.intor('int1e_nuc')
         self.assertAlmostEqual(abs(v0 - v1).max(), 0, 12)
 
+    def test_build_batch(self):
+        numpy.random.seed(2)
+        basis = {'O': '631g', 'H': 'sto3g'}
+        coords = numpy.array([[0, 0, 0], [0, .757, .587], [0, -.757, .587]])
+        geoms = [(['O', 'H', 'H'], coords + numpy.random.rand(3,3)*.1)
+                 for i in range(3)]
+        geoms.append('O 0 0 0; H 0 .757 .587; H 0 -.757 .587')
+        mols = gto.mole.build_batch(geoms, basis=basis, charge=[0, 0, 0, 1],
+                                    spin=[0, 0, 0, 1])
+        self.assertEqual(len(mols), 4)
+        for geom, c, mol in zip(geoms, [0, 0, 0, 1], mols):
+            if isinstance(geom, tuple):
+                geom = list(zip(*geom))
+            ref = gto.M(atom=geom, basis=basis, charge=c, spin=c, verbose=0)
+            self.assertEqual(mol.nelec, ref.nelec)
+            self.assertEqual(mol.groupname, 'C1')
+            self.assertAlmostEqual(mol.energy_nuc(), ref.energy_nuc(), 12)
+            self.assertAlmostEqual(abs(mol.intor('int1e_kin') -
+                                       ref.intor('int1e_kin')).max(), 0, 12)
+            self.assertAlmostEqual(abs(mol.intor('int2e', aosym='s8') -
+                                       ref.intor('int2e', aosym='s8')).max(), 0, 12)
+
+        mols = gto.mole.build_batch(['H 0 0 0; H 0 0 .74'], basis='ccpvdz',
+                                    symmetry=True)
+        self.assertEqual(mols[0].groupname, 'Dooh')
+
 if __name__ == "__main__":
     print("test mole.py")
     unittest.main()
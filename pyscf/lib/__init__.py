@@ -32,4 +32,8 @@ from pyscf.lib.linalg_helper import *
 from pyscf.lib.scipy_helper import *
 from pyscf.lib import chkfile
 from pyscf.lib import diis
+from pyscf.lib import cache
+from pyscf.lib import mmapfile
+from pyscf.lib.mmapfile import MemmapFile, MemmapTmpFile, MemmapGroup
+from pyscf.lib import pool
 from pyscf.lib.misc import StreamObject
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Content-addressed on-disk cache for numpy arrays
+
+Arrays are stored in .npy files named after a hash of the input data that
+determines the array (see :func:`hash_key`). The total size of the cache
+directory is bounded. When the bound is exceeded, the least recently used
+entries are removed.
+
+Examples:
+
+>>> from pyscf import gto, lib
+>>> mol = gto.M(atom='H 0 0 0; H 0 0 1')
+>>> cache = lib.cache.DiskCache('/tmp/pyscf_cache', max_size=100)
+>>> key = lib.cache.hash_key('int2e', mol._atm, mol._bas, mol._env)
+>>> cache.get(key) is None
+True
+>>> cache.set(key, mol.intor('int1e_ovlp'))
+>>> cache.get(key).shape
+(2, 2)
+'''
+
+import os
+import hashlib
+import tempfile
+import numpy
+
+SUFFIX = '.npy'
+
+def hash_key(*args):
+    '''Generate a hash string for the arguments. Arguments can be numpy
+    arrays, strings or scalars.
+    '''
+    h = hashlib.sha1()
+    for x in args:
+        if isinstance(x, numpy.ndarray):
+            x = numpy.ascontiguousarray(x)
+            h.update(str((x.dtype.str, x.shape)).encode())
+            h.update(x.view(numpy.uint8).ravel())
+        else:
+            h.update(repr(x).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class DiskCache(object):
+    '''Size-bounded on-disk cache with LRU eviction policy.
+
+    Attributes:
+        cachedir : str
+            Directory to hold the cached arrays. It is created if not exists.
+        max_size : float
+            The upper bound (in MB) of the total size of the cache directory.
+        hits, misses : int
+            Statistics of the get requests of this object.
+    '''
+    def __init__(self, cachedir, max_size=1000):
+        self.cachedir = cachedir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cachedir, key + SUFFIX)
+
+    def get(self, key):
+        '''Load the array associated to the key. Return None if not found.'''
+        path = self._path(key)
+        try:
+            val = numpy.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            # Update the timestamp of the file for the LRU policy
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return val
+
+    def set(self, key, val):
+        '''Save the array to the cache'''
+        val = numpy.asarray(val)
+        if val.nbytes > self.max_size * 1e6:
+            return
+        try:
+            os.makedirs(self.cachedir, exist_ok=True)
+            # Write to a temporary file then rename it to avoid the partially
+            # written file being read by other processes
+            fd, tmpname = tempfile.mkstemp(dir=self.cachedir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                numpy.save(f, val)
+            os.replace(tmpname, self._path(key))
+        except OSError:
+            return
+        self.evict()
+
+    __getitem__ = get
+    __setitem__ = set
+
+    def __contains__(self, key):
+        return os.path.isfile(self._path(key))
+
+    def entries(self):
+        '''A list of (timestamp, size, path) of all cached entries'''
+        out = []
+        try:
+            files = os.listdir(self.cachedir)
+        except OSError:
+            return out
+        for f in files:
+            if f.endswith(SUFFIX):
+                path = os.path.join(self.cachedir, f)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def evict(self, max_size=None):
+        '''Remove the least recently used entries until the total size is
+        smaller than max_size (in MB)
+        '''
+        if max_size is None:
+            max_size = self.max_size
+        entries = sorted(self.entries())
+        total = sum(e[1] for e in entries)
+        for mtime, size, path in entries:
+            if total <= max_size * 1e6:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        return self
+
+    def clear(self):
+        return self.evict(0)
@@ -100,3 +100,83 @@ void VXCgen_grid(double *out, double *coords, double *atm_coords,
         free(atom_dist);
 }
 
+
+/*
+ * Stratmann, Scuseria, Frisch. CPL, 257, 213 (1996), eq.11, 14.
+ * The becke scheme function is -1/1 for |mu| >= a. On each grid, the cell
+ * function of atom i is 0 if s(mu_iC) = 0 for the nearest atom C. The cell
+ * functions are only evaluated for the remaining atoms. Zeros are assigned
+ * to the other atoms in the output.
+ */
+void VXCgen_grid_stratmann(double *out, double *coords, double *atm_coords,
+                           double *radii_table, int natm, int ngrids, double a)
+{
+        const size_t Ngrids = ngrids;
+        int i, j;
+        double dx, dy, dz;
+        double *rinv = malloc(sizeof(double) * natm*natm);
+        for (i = 0; i < natm; i++) {
+                rinv[i*natm+i] = 0;
+                for (j = 0; j < i; j++) {
+                        dx = atm_coords[i*3+0] - atm_coords[j*3+0];
+                        dy = atm_coords[i*3+1] - atm_coords[j*3+1];
+                        dz = atm_coords[i*3+2] - atm_coords[j*3+2];
+                        rinv[i*natm+j] = 1 / sqrt(dx*dx + dy*dy + dz*dz);
+                        rinv[j*natm+i] = rinv[i*natm+j];
+                }
+        }
+
+#pragma omp parallel private(i, j, dx, dy, dz)
+{
+        double *grid_dist = malloc(sizeof(double) * natm);
+        size_t n;
+        int k, nearest;
+        double g, ma, ma2, p, dmin;
+#pragma omp for schedule(static)
+        for (n = 0; n < Ngrids; n++) {
+                dmin = 1e200;
+                nearest = 0;
+                for (i = 0; i < natm; i++) {
+                        dx = coords[0*Ngrids+n] - atm_coords[i*3+0];
+                        dy = coords[1*Ngrids+n] - atm_coords[i*3+1];
+                        dz = coords[2*Ngrids+n] - atm_coords[i*3+2];
+                        grid_dist[i] = sqrt(dx*dx + dy*dy + dz*dz);
+                        if (grid_dist[i] < dmin) {
+                                dmin = grid_dist[i];
+                                nearest = i;
+                        }
+                }
+
+                for (i = 0; i < natm; i++) {
+                        p = 1;
+                        // Start from the nearest atom which is most likely
+                        // to zero the cell function
+                        for (k = 0; k < natm; k++) {
+                                j = k + nearest;
+                                if (j >= natm) {
+                                        j -= natm;
+                                }
+                                if (j == i) {
+                                        continue;
+                                }
+                                g = (grid_dist[i] - grid_dist[j]) * rinv[i*natm+j];
+                                if (radii_table != NULL) {
+                                        g += radii_table[i*natm+j] * (1 - g*g);
+                                }
+                                if (g >= a) {
+                                        p = 0;
+                                        break;
+                                } else if (g > -a) {
+                                        ma = g / a;
+                                        ma2 = ma * ma;
+                                        g = (1./16) * (ma*(35 + ma2*(-35 + ma2*(21 - 5*ma2))));
+                                        p *= .5 * (1 - g);
+                                }
+                        }
+                        out[i*Ngrids+n] = p;
+                }
+        }
+        free(grid_dist);
+}
+        free(rinv);
+}
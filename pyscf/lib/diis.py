@@ -30,6 +30,8 @@ from pyscf import __config__
 
 INCORE_SIZE = getattr(__config__, 'lib_diis_incore_size', 10000000)  # 80 MB
 BLOCK_SIZE  = getattr(__config__, 'lib_diis_block_size', 20000000)  # ~ 160/320 MB
+# Size of HDF5 chunks for the compressed storage
+CHUNK_SIZE  = getattr(__config__, 'lib_diis_chunk_size', 262144)  # 2 MB
 
 # PCCP, 4, 11 (2002); DOI:10.1039/B108658H
 # GEDIIS, JCTC, 2, 835 (2006); DOI:10.1021/ct050275a
@@ -44,6 +46,16 @@ class DIIS(object):
             DIIS subspace size. The maximum number of the vectors to be stored.
         min_space
             The minimal size of subspace before DIIS extrapolation.
+        compress : str or None
+            Compressed storage of the DIIS vectors on disk.  Vectors are
+            always saved in the HDF5 file (in chunks) if compress is set.
+
+            | None : no compression (default).
+            | 'lzf' or 'gzip' : lossless compression with byte shuffling.
+            | 'float32' : the error vectors are saved in single precision
+              and all vectors are compressed with 'lzf'.  The DIIS
+              coefficients only need a few significant digits of the error
+              vectors.
 
     Functions:
         update(x, xerr=None) :
@@ -108,6 +120,7 @@ class DIIS(object):
         self.space = 6
         self.min_space = 1
         self.incore = incore
+        self.compress = getattr(__config__, 'lib_diis_DIIS_compress', None)
 
 ##################################################
 # don't modify the following private variables, they are not input options
@@ -120,20 +133,46 @@ class DIIS(object):
         self._xprev = None
         self._err_vec_touched = False
 
+    def _is_incore(self, size):
+        return (size < INCORE_SIZE or self.incore) and not self.compress
+
+    def _create_dataset(self, key, size, dtype):
+        '''Return an HDF5 dataset for the vector of given key'''
+        if self._diisfile is None:
+            self._diisfile = misc.H5TmpFile(self.filename, 'w')
+        kwargs = {}
+        if self.compress:
+            if self.compress == 'float32':
+                if key[0] == 'e':
+                    dtype = numpy.result_type(dtype, numpy.float32)
+                    if dtype == numpy.complex128:
+                        dtype = numpy.complex64
+                    else:
+                        dtype = numpy.float32
+                kwargs['compression'] = 'lzf'
+            else:
+                kwargs['compression'] = self.compress
+            kwargs['shuffle'] = True
+            if size > 0:
+                kwargs['chunks'] = (min(size, CHUNK_SIZE),)
+
+        if key in self._diisfile:
+            dset = self._diisfile[key]
+            if dset.shape == (size,) and dset.dtype == dtype:
+                return dset
+            del self._diisfile[key]
+        return self._diisfile.create_dataset(key, (size,), dtype, **kwargs)
+
     def _store(self, key, value):
-        incore = value.size < INCORE_SIZE or self.incore
+        incore = self._is_incore(value.size)
         if incore:
             self._buffer[key] = value
 
         # save the error vector if filename is given, this file can be used to
         # restore the DIIS state
         if (not incore) or isinstance(self.filename, str):
-            if self._diisfile is None:
-                self._diisfile = misc.H5TmpFile(self.filename, 'w')
-            if key in self._diisfile:
-                self._diisfile[key][:] = value
-            else:
-                self._diisfile[key] = value
+            dset = self._create_dataset(key, value.size, value.dtype)
+            dset[:] = value
 # to avoid "Unable to find a valid file signature" error when reload the hdf5
 # file from a crashed claculation
             self._diisfile.flush()
@@ -173,12 +212,10 @@ class DIIS(object):
             ekey = 'e%d'%self._head
             xkey = 'x%d'%self._head
             self._store(xkey, x)
-            if x.size < INCORE_SIZE or self.incore:
+            if self._is_incore(x.size):
                 self._store(ekey, x - numpy.asarray(self._xprev))
             else:  # not call _store to reduce memory footprint
-                if ekey not in self._diisfile:
-                    self._diisfile.create_dataset(ekey, (x.size,), x.dtype)
-                edat = self._diisfile[ekey]
+                edat = self._create_dataset(ekey, x.size, x.dtype)
                 for p0, p1 in misc.prange(0, x.size, BLOCK_SIZE):
                     edat[p0:p1] = x[p0:p1] - self._xprev[p0:p1]
                 self._diisfile.flush()
@@ -217,30 +254,42 @@ class DIIS(object):
         if nd < self.min_space:
             return x
 
-        dt = numpy.array(self.get_err_vec(self._head-1), copy=False)
+        # Only the overlaps between the new error vector and the old ones are
+        # computed. All error vectors are streamed block by block in one pass.
+        dt = self.get_err_vec(self._head-1)
+        dtype = numpy.result_type(dt.dtype, numpy.double)
         if self._H is None:
-            self._H = numpy.zeros((self.space+1,self.space+1), dt.dtype)
+            self._H = numpy.zeros((self.space+1,self.space+1), dtype)
             self._H[0,1:] = self._H[1:,0] = 1
-        for i in range(nd):
-            tmp = 0
-            dti = self.get_err_vec(i)
-            for p0, p1 in misc.prange(0, dt.size, BLOCK_SIZE):
-                tmp += numpy.dot(dt[p0:p1].conj(), dti[p0:p1])
-            self._H[self._head,i+1] = tmp
-            self._H[i+1,self._head] = tmp.conjugate()
-        dt = None
+        err_vecs = [self.get_err_vec(i) for i in range(nd)]
+        h_row = numpy.zeros(nd, dtype)
+        for p0, p1 in misc.prange(0, dt.size, BLOCK_SIZE):
+            dt_blk = numpy.asarray(dt[p0:p1], dtype=dtype).conj()
+            for i, dti in enumerate(err_vecs):
+                h_row[i] += numpy.dot(dt_blk, numpy.asarray(dti[p0:p1], dtype=dtype))
+        self._H[self._head,1:nd+1] = h_row
+        self._H[1:nd+1,self._head] = h_row.conj()
+        dt = dt_blk = err_vecs = None
 
         if self._xprev is None:
-            xnew = self.extrapolate(nd)
+            xnew = self._extrapolate_as(x.dtype, nd)
         else:
             self._xprev = None # release memory first
-            self._xprev = xnew = self.extrapolate(nd)
+            self._xprev = xnew = self._extrapolate_as(x.dtype, nd)
 
             self._store('xprev', xnew)
             if 'xprev' not in self._buffer:  # not incore
                 self._xprev = self._diisfile['xprev']
         return xnew.reshape(x.shape)
 
+    def _extrapolate_as(self, dtype, nd):
+        xnew = self.extrapolate(nd)
+        # Single precision vectors stay in single precision
+        if (xnew.dtype.kind == dtype.kind and
+                xnew.dtype.itemsize > dtype.itemsize):
+            xnew = xnew.astype(dtype)
+        return xnew
+
     def extrapolate(self, nd=None):
         if nd is None:
             nd = self.get_num_vec()
@@ -292,7 +341,7 @@ class DIIS(object):
             return self
 
         if inplace:
-            if fdiis[x_keys[0]].size < INCORE_SIZE or self.incore:
+            if self._is_incore(fdiis[x_keys[0]].size):
                 for key in diis_keys:
                     self._buffer[key] = numpy.asarray(fdiis[key])
 
@@ -316,14 +365,17 @@ class DIIS(object):
 
         e_mat = []
         for i in range(nd):
-            dti = numpy.asarray(self.get_err_vec(i))
+            dti = self.get_err_vec(i)
+            dtype = numpy.result_type(dti.dtype, numpy.double)
+            dti = numpy.asarray(dti, dtype=dtype)
             vecsize = dti.size
             for j in range(i+1):
                 dtj = self.get_err_vec(j)
                 assert (dtj.size == vecsize)
                 tmp = 0
                 for p0, p1 in misc.prange(0, vecsize, BLOCK_SIZE):
-                    tmp += numpy.dot(dti[p0:p1].conj(), dtj[p0:p1])
+                    tmp += numpy.dot(dti[p0:p1].conj(),
+                                     numpy.asarray(dtj[p0:p1], dtype=dtype))
                 e_mat.append(tmp)
             dti = dtj = None
         e_mat = numpy_helper.unpack_tril(e_mat)
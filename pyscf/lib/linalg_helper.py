@@ -50,6 +50,8 @@ PROJECT_OUT_CONV_EIGS = \
         getattr(__config__, 'lib_linalg_helper_davidson_project_out_eigs', False)
 
 FOLLOW_STATE = getattr(__config__, 'lib_linalg_helper_davidson_follow_state', False)
+# Max number of trial vectors passed to aop in one call
+MAX_BLOCK = getattr(__config__, 'lib_linalg_helper_davidson_max_block', 40)
 
 
 def safe_eigh(h, s, lindep=SAFE_EIGH_LINDEP):
@@ -299,6 +301,14 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
 
     Note: This function has an overhead of memory usage ~4*x0.size*nroots
 
+    The trial vectors of all unconverged roots are passed to aop in one call
+    (at most MAX_BLOCK vectors per call). Converged roots are soft-locked: no
+    trial vectors or residuals (in lessio mode no sigma vectors) are generated
+    for them until their eigenvalues change by more than tol. When the
+    subspace is full, the solver is restarted with the Ritz vectors and
+    their sigma vectors, which are computed from the existing subspace
+    without calling aop.
+
     Args:
         aop : function([x]) => [array_like_x]
             Matrix vector multiplication :math:`y_{ki} = \sum_{j}a_{ij}*x_{jk}`.
@@ -403,9 +413,41 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
     conv = numpy.zeros(nroots, dtype=bool)
     emin = None
     level_shift = 0
+    # sigma vectors of the Ritz vectors x0, for the thick restart
+    ax0 = None
+    naop = nvec = 0
 
     for icyc in range(max_cycle):
-        if fresh_start:
+        xt_thick = axt_thick = None
+        if fresh_start and ax0 is not None:
+            # Thick restart: Ritz vectors and their sigma vectors are kept in
+            # the new subspace. New trial vectors xt are orthogonal to x0.
+            missing = [k for k in range(len(x0)) if ax0[k] is None]
+            if missing:
+                axk = aop([x0[k] for k in missing])
+                naop += 1
+                nvec += len(missing)
+                for i, k in enumerate(missing):
+                    ax0[k] = axk[i]
+            xt_thick, axt_thick = _thick_restart(x0, ax0, dot, lindep)
+            ax0 = None
+
+        if xt_thick is not None:
+            if _incore:
+                xs = []
+                ax = []
+            else:
+                xs = _Xlist()
+                ax = _Xlist()
+            space = 0
+            x0 = None
+            max_dx_last = 1e9
+            if SORT_EIG_BY_SIMILARITY:
+                conv = numpy.zeros(nroots, dtype=bool)
+            if len(xt) > 1:
+                xt = _qr(xt, dot, lindep)[0]
+            xt = xt[:MAX_BLOCK]
+        elif fresh_start:
             if _incore:
                 xs = []
                 ax = []
@@ -438,9 +480,15 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
                 conv = numpy.zeros(nroots, dtype=bool)
         elif len(xt) > 1:
             xt = _qr(xt, dot, lindep)[0]
-            xt = xt[:40]  # 40 trial vectors at most
+            xt = xt[:MAX_BLOCK]
 
         axt = aop(xt)
+        naop += 1
+        nvec += len(xt)
+        if xt_thick is not None:
+            xt = list(xt_thick) + list(xt)
+            axt = list(axt_thick) + list(axt)
+            xt_thick = axt_thick = None
         for k, xi in enumerate(xt):
             xs.append(xt[k])
             ax.append(axt[k])
@@ -488,10 +536,26 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
         else:
             de = e - elast
 
+        # Soft locking: the roots converged in the previous iteration are
+        # not updated unless their eigenvalues are changed.
+        if (SORT_EIG_BY_SIMILARITY or elast is None or elast.size != e.size):
+            locked = numpy.zeros(e.size, dtype=bool)
+        else:
+            locked = conv_last[:e.size] & (abs(de) < tol)
+        conv[:e.size] |= locked
+
         x0 = None
         x0 = _gen_x0(v, xs)
         if lessio:
-            ax0 = aop(x0)
+            ax0 = [None] * len(x0)
+            unlocked = [k for k in range(len(x0)) if not conv[k]]
+            if unlocked:
+                axk = aop([x0[k] for k in unlocked])
+                naop += 1
+                nvec += len(unlocked)
+                for i, k in enumerate(unlocked):
+                    ax0[k] = axk[i]
+                axk = None
         else:
             ax0 = _gen_x0(v, ax)
 
@@ -505,12 +569,12 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
                 if conv[k] and not conv_last[k]:
                     log.debug('root %d converged  |r|= %4.3g  e= %s  max|de|= %4.3g',
                               k, dx_norm[k], ek, de[k])
-        ax0 = None
         max_dx_norm = max(dx_norm)
         ide = numpy.argmax(abs(de))
         if all(conv):
             log.debug('converged %d %d  |r|= %4.3g  e= %s  max|de|= %4.3g',
                       icyc, space, max_dx_norm, e, de[ide])
+            ax0 = None
             break
         elif (follow_state and max_dx_norm > 1 and
               max_dx_norm/max_dx_last > 3 and space > nroots+2):
@@ -518,6 +582,7 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
                       icyc, space, max_dx_norm, e, de[ide])
             log.debug('Large |r| detected, restore to previous x0')
             x0 = _gen_x0(vlast, xs)
+            ax0 = None
             fresh_start = True
             continue
 
@@ -552,14 +617,20 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
             log.debug('Linear dependency in trial subspace. |r| for each state %s',
                       dx_norm)
             conv[dx_norm < toloose] = True
+            ax0 = None
             break
 
         max_dx_last = max_dx_norm
         fresh_start = space+nroots > max_space
+        if not fresh_start:
+            ax0 = None
 
         if callable(callback):
             callback(locals())
 
+    ax0 = None
+    log.debug('davidson1: %d aop calls, %d sigma vectors (%.1f per call)',
+              naop, nvec, nvec / max(naop, 1))
     x0 = [x for x in x0]  # nparray -> list
 
     # Check whether the solver finds enough eigenvectors.
@@ -1498,6 +1569,15 @@ def _qr(xs, dot, lindep=1e-14):
             nv += 1
     return qs[:nv], numpy.linalg.inv(rmat[:nv,:nv])
 
+def _thick_restart(x0, ax0, dot, lindep=1e-14):
+    '''Orthonormalize the Ritz vectors x0 and transform their sigma vectors
+    ax0 accordingly. None is returned if x0 are linearly dependent.'''
+    q, r = _qr(x0, dot, lindep)
+    if len(q) != len(x0):
+        return None, None
+    # x0 = r.T q, thus A q = inv(r).T A x0
+    return q, _gen_x0(numpy.linalg.inv(r), ax0)
+
 def _outprod_to_subspace(v, xs):
     ndim = v.ndim
     if ndim == 1:
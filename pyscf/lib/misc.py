@@ -21,6 +21,7 @@ Some helper functions
 '''
 
 import os, sys
+import time
 import warnings
 import tempfile
 import functools
@@ -84,19 +85,81 @@ c_double_p = ctypes.POINTER(ctypes.c_double)
 c_int_p = ctypes.POINTER(ctypes.c_int)
 c_null_ptr = ctypes.POINTER(ctypes.c_void_p)
 
+if sys.platform == 'darwin':
+    _SHARED_LIB_SUFFIXES = ('.dylib', '.so')
+elif sys.platform.startswith('win'):
+    _SHARED_LIB_SUFFIXES = ('.dll', '.pyd')
+else:
+    _SHARED_LIB_SUFFIXES = ('.so',)
+
+def _find_library(libname, libdir):
+    '''Path of the shared library in libdir. The same search rules of
+    numpy.ctypeslib.load_library are applied, without importing numpy.distutils
+    which is slow.'''
+    if os.path.splitext(libname)[1]:
+        libnames = [libname]
+    else:
+        libnames = [libname + ext for ext in _SHARED_LIB_SUFFIXES]
+        import sysconfig
+        ext_suffix = sysconfig.get_config_var('EXT_SUFFIX')
+        if ext_suffix:
+            libnames.insert(0, libname + ext_suffix)
+    for f in libnames:
+        libpath = os.path.join(libdir, f)
+        if os.path.exists(libpath):
+            return libpath
+    return None
+
+class _LazyLibrary(object):
+    '''A proxy of ctypes.CDLL. The shared library is loaded when any of its
+    functions is accessed.'''
+    def __init__(self, libpath):
+        self._libpath = libpath
+        self._lib = None
+
+    def _load(self):
+        if self._lib is None:
+            self._lib = ctypes.cdll[self._libpath]
+        return self._lib
+
+    def __getattr__(self, key):
+        if key.startswith('__'):
+            raise AttributeError(key)
+        val = getattr(self._load(), key)
+        if not key.startswith('_'):
+            # Cache the function object to avoid calling __getattr__ again
+            self.__dict__[key] = val
+        return val
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self._libpath)
+
+_loaded_libraries = {}
+
 def load_library(libname):
-    try:
-        _loaderpath = os.path.dirname(__file__)
-        return numpy.ctypeslib.load_library(libname, _loaderpath)
-    except OSError:
+    '''Load the shared library libname from pyscf/lib or the lib directory
+    of the extended modules. The library is opened when it is first used.
+    OSError is raised if the library is not found.'''
+    libpath = _find_library(libname, os.path.dirname(__file__))
+    if libpath is None:
         from pyscf import __path__ as ext_modules
         for path in ext_modules:
-            libpath = os.path.join(path, 'lib')
-            if os.path.isdir(libpath):
-                for files in os.listdir(libpath):
+            libdir = os.path.join(path, 'lib')
+            if os.path.isdir(libdir):
+                for files in os.listdir(libdir):
                     if files.startswith(libname):
-                        return numpy.ctypeslib.load_library(libname, libpath)
-        raise
+                        libpath = _find_library(libname, libdir)
+                        break
+            if libpath is not None:
+                break
+    if libpath is None:
+        raise OSError('Library %s not found' % libname)
+    if libpath not in _loaded_libraries:
+        _loaded_libraries[libpath] = _LazyLibrary(libpath)
+    return _loaded_libraries[libpath]
 
 #Fixme, the standard resouce module gives wrong number when objects are released
 # http://fa.bianp.net/blog/2013/different-ways-to-get-memory-consumption-or-lessons-learned-from-memory_profiler/#fn:1
@@ -341,9 +404,14 @@ def prange_split(n_total, n_sections):
     return zip(div_points[:-1], div_points[1:])
 
 
-def map_with_prefetch(func, *iterables):
+def map_with_prefetch(func, *iterables, depth=1):
     '''
     Apply function to an task and prefetch the next task
+
+    Kwargs:
+        depth : int
+            Number of tasks to prefetch. The results of at most depth+1
+            tasks are held in memory at the same time.
     '''
     global_import_lock = False
     if sys.version_info < (3, 6):
@@ -355,17 +423,15 @@ def map_with_prefetch(func, *iterables):
             yield func(*task)
 
     elif ThreadPoolExecutor is not None:
+        depth = max(1, depth)
         with ThreadPoolExecutor(max_workers=1) as executor:
-            future = None
+            futures = collections.deque()
             for task in zip(*iterables):
-                if future is None:
-                    future = executor.submit(func, *task)
-                else:
-                    result = future.result()
-                    future = executor.submit(func, *task)
-                    yield result
-            if future is not None:
-                yield future.result()
+                futures.append(executor.submit(func, *task))
+                if len(futures) > depth:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
     else:
         def func_with_buf(_output_buf, *args):
             _output_buf[0] = func(*args)
@@ -1036,6 +1102,123 @@ class call_in_background(object):
             self.executor.shutdown(wait=True)
 
 
+class _DoneFuture(object):
+    def __init__(self, result):
+        self._result = result
+    def result(self):
+        return self._result
+
+class pipeline_stage(object):
+    '''A stage of a pipeline executed in a background thread. Tasks are
+    executed in the order they were submitted. At most `depth` tasks can be
+    pending in the stage. Submitting more tasks blocks the caller until the
+    oldest task is finished. The caller can therefore rotate `depth+1`
+    buffers for the input (or the output) of the tasks.
+
+    Attributes:
+        depth (int): Max number of pending tasks. depth=1 is the double
+            buffering mode of :class:`call_in_background`.
+        sync (bool): Whether to run in synchronized mode.
+        name (str): Label of the stage in :meth:`report`
+        ntasks (int): Number of tasks executed so far.
+        wall_time (float): Wall time spent in the stage function.
+        wait_time (float): Wall time the caller was blocked by the stage.
+
+    Examples:
+
+    >>> with pipeline_stage(save, depth=2) as async_write:
+    ...     for i in range(n):
+    ...         async_write(i, compute(i, out=bufs[i%3]))
+
+    >>> with pipeline_stage(load, depth=2) as prefetch:
+    ...     for i in range(min(2, n)):
+    ...         prefetch(i)
+    ...     for i in range(n):
+    ...         dat = prefetch.result()  # result of load(i)
+    ...         if i + 2 < n:
+    ...             prefetch(i+2)
+    ...         do_something(dat)
+    '''
+    def __init__(self, fn, depth=1, sync=None, name=None):
+        self.fn = fn
+        self.depth = max(1, int(depth))
+        if sync is None:
+            sync = not ASYNC_IO or ThreadPoolExecutor is None
+        self.sync = sync
+        self.name = name or getattr(fn, '__name__', 'stage')
+        self.ntasks = 0
+        self.wall_time = 0
+        self.wait_time = 0
+        self.executor = None
+        self.futures = collections.deque()
+
+    def _timed_fn(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            self.wall_time += time.perf_counter() - t0
+            self.ntasks += 1
+
+    def _wait(self, nleft):
+        t0 = time.perf_counter()
+        try:
+            while len(self.futures) > nleft:
+                try:
+                    self.futures.popleft().result()
+                except Exception as e:
+                    raise ThreadRuntimeError('Error on thread %s:\n%s' % (self, e))
+        finally:
+            self.wait_time += time.perf_counter() - t0
+
+    def __call__(self, *args, **kwargs):
+        if self.sync:
+            future = _DoneFuture(self._timed_fn(*args, **kwargs))
+            self.futures.append(future)
+            while len(self.futures) > self.depth:
+                self.futures.popleft()
+        else:
+            self._wait(self.depth - 1)
+            future = self.executor.submit(self._timed_fn, *args, **kwargs)
+            self.futures.append(future)
+        return future
+
+    def result(self):
+        '''Wait for the oldest pending task and return its result'''
+        if self.sync:
+            return self.futures.popleft().result()
+        t0 = time.perf_counter()
+        try:
+            return self.futures.popleft().result()
+        except Exception as e:
+            raise ThreadRuntimeError('Error on thread %s:\n%s' % (self, e))
+        finally:
+            self.wait_time += time.perf_counter() - t0
+
+    def wait(self):
+        '''Block until all submitted tasks are finished'''
+        self._wait(0)
+
+    def __enter__(self):
+        if not self.sync:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        try:
+            if type is None:
+                self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+            self.futures.clear()
+
+    def report(self):
+        return ('%s: %d tasks, wall time %.2f s, caller blocked %.2f s' %
+                (self.name, self.ntasks, self.wall_time, self.wait_time))
+
+
 class H5TmpFile(h5py.File):
     '''Create and return an HDF5 temporary file.
 
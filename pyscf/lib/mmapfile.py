@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Memory-mapped storage with an h5py-like group/dataset interface
+
+A file is a directory. Groups are sub-directories and datasets are .npy files
+(with 64-byte aligned data) which are opened with numpy.memmap. Datasets are
+returned as numpy.memmap arrays. Slicing a dataset does not copy the data and
+does not hold any global lock, therefore multiple threads can read the
+datasets in parallel.
+
+It can be used in place of h5py for the large intermediates of ao2mo and DF
+modules. The storage backend of the temporary swap files is controlled by
+the config option `lib_swap_backend` ('hdf5' or 'mmap').
+
+Examples:
+
+>>> from pyscf import lib
+>>> f = lib.MemmapFile('/tmp/eri', 'w')
+>>> f.create_dataset('j3c/0', (10, 55), 'f8')[:] = 1.
+>>> f['j3c/0'][2:4].shape
+(2, 55)
+>>> list(f['j3c'].keys())
+['0']
+'''
+
+import os
+import shutil
+import tempfile
+import numpy
+from numpy.lib import format as npformat
+from pyscf.lib import param
+from pyscf import __config__
+
+SWAP_BACKEND = getattr(__config__, 'lib_swap_backend', 'hdf5')
+
+SUFFIX = '.npy'
+# Empty file placed in the root directory to identify the storage format
+MARKER = '.pyscf_mmap'
+
+def is_mmapfile(path):
+    '''Whether path is a memory-mapped storage created by MemmapFile'''
+    return (isinstance(path, str) and
+            os.path.isfile(os.path.join(path, MARKER)))
+
+
+def _fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class MemmapGroup(object):
+    '''A group of datasets, mirroring the API of h5py.Group'''
+    def __init__(self, path, mode='r+', file=None):
+        self.path = path
+        self.mode = mode
+        self.file = file
+
+    @property
+    def filename(self):
+        return self.file.path
+
+    @property
+    def name(self):
+        rel = os.path.relpath(self.path, self.file.path)
+        if rel == '.':
+            return '/'
+        return '/' + rel.replace(os.sep, '/')
+
+    @property
+    def readonly(self):
+        return self.mode == 'r'
+
+    def _check_writable(self):
+        if self.readonly:
+            raise OSError('%s is opened in read-only mode' % self.filename)
+
+    def _subpath(self, key):
+        key = key.strip('/')
+        if not key:
+            return self.path
+        return os.path.join(self.path, *key.split('/'))
+
+    def __getitem__(self, key):
+        path = self._subpath(key)
+        if os.path.isdir(path):
+            return MemmapGroup(path, self.mode, self.file)
+        elif os.path.isfile(path + SUFFIX):
+            if self.readonly:
+                mode = 'r'
+            else:
+                mode = 'r+'
+            return npformat.open_memmap(path + SUFFIX, mode=mode)
+        else:
+            raise KeyError('Object %s does not exist in %s' % (key, self.filename))
+
+    def __setitem__(self, key, data):
+        self.create_dataset(key, data=data)
+
+    def __delitem__(self, key):
+        self._check_writable()
+        path = self._subpath(key)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.isfile(path + SUFFIX):
+            os.remove(path + SUFFIX)
+        else:
+            raise KeyError('Object %s does not exist in %s' % (key, self.filename))
+
+    def __contains__(self, key):
+        path = self._subpath(key)
+        return os.path.isdir(path) or os.path.isfile(path + SUFFIX)
+
+    def keys(self):
+        out = []
+        for f in sorted(os.listdir(self.path)):
+            if f.endswith(SUFFIX):
+                out.append(f[:-len(SUFFIX)])
+            elif os.path.isdir(os.path.join(self.path, f)):
+                out.append(f)
+        return out
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def create_group(self, name):
+        self._check_writable()
+        path = self._subpath(name)
+        if name in self:
+            raise ValueError('Unable to create group %s (name already exists)' % name)
+        os.makedirs(path)
+        return MemmapGroup(path, self.mode, self.file)
+
+    def require_group(self, name):
+        if name in self:
+            return self[name]
+        return self.create_group(name)
+
+    def create_dataset(self, name, shape=None, dtype=None, data=None, **kwargs):
+        '''Create a dataset. HDF5 specific options (chunks, compression etc.)
+        are ignored. The returned dataset is a numpy.memmap array.
+        '''
+        self._check_writable()
+        if name in self:
+            raise ValueError('Unable to create dataset %s (name already exists)' % name)
+        if data is not None:
+            data = numpy.asarray(data)
+            if shape is None:
+                shape = data.shape
+            if dtype is None:
+                dtype = data.dtype
+        if dtype is None:
+            dtype = numpy.double
+        path = self._subpath(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        dset = npformat.open_memmap(path + SUFFIX, mode='w+',
+                                    dtype=numpy.dtype(dtype), shape=tuple(shape))
+        if data is not None and dset.size > 0:
+            dset[:] = data.reshape(dset.shape)
+        return dset
+
+    def flush(self):
+        '''Write the datasets and the directory entries of the group to disk'''
+        for root, dirs, files in os.walk(self.path):
+            for f in files:
+                _fsync(os.path.join(root, f))
+            _fsync(root)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return '<MemmapGroup "%s" (%d members)>' % (self.name, len(self))
+
+
+class MemmapFile(MemmapGroup):
+    '''Memory-mapped storage in a directory, mirroring the API of h5py.File
+
+    Args:
+        path : str
+            The directory of the storage
+
+    Kwargs:
+        mode : str
+            r : readonly, file must exist
+            r+ : read/write, file must exist
+            w : create file, truncate if exists
+            a : read/write if exists, create otherwise (default)
+    '''
+    def __init__(self, path, mode='a'):
+        path = os.path.abspath(path)
+        exists = is_mmapfile(path)
+        if mode in ('r', 'r+'):
+            if not exists:
+                raise OSError('Unable to open %s (not a memmap storage)' % path)
+        elif mode == 'w':
+            if exists:
+                shutil.rmtree(path)
+            elif os.path.exists(path) and os.listdir(path):
+                raise OSError('Unable to create %s (directory not empty)' % path)
+        elif mode == 'a':
+            if not exists and os.path.exists(path) and os.listdir(path):
+                raise OSError('Unable to create %s (directory not empty)' % path)
+        else:
+            raise ValueError('Invalid mode %s' % mode)
+
+        if not is_mmapfile(path):
+            os.makedirs(path, exist_ok=True)
+            open(os.path.join(path, MARKER), 'w').close()
+        if mode == 'r':
+            MemmapGroup.__init__(self, path, 'r', self)
+        else:
+            MemmapGroup.__init__(self, path, 'r+', self)
+        self.closed = False
+
+    def __repr__(self):
+        return '<MemmapFile "%s" (mode %s)>' % (self.path, self.mode)
+
+
+class MemmapTmpFile(MemmapFile):
+    '''Create a temporary memory-mapped storage. The storage is removed when
+    it is closed or the object is released (unless path is specified).
+
+    Examples:
+
+    >>> from pyscf import lib
+    >>> ftmp = lib.MemmapTmpFile()
+    '''
+    def __init__(self, path=None, mode='a', dir=None):
+        self._remove_on_close = path is None
+        if path is None:
+            if dir is None:
+                dir = param.TMPDIR
+            path = tempfile.mkdtemp(dir=dir)
+        MemmapFile.__init__(self, path, mode)
+
+    def close(self):
+        if self._remove_on_close and not self.closed:
+            shutil.rmtree(self.path, ignore_errors=True)
+        self.closed = True
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def swapfile(dir=None, backend=None):
+    '''A temporary file for large intermediates. The storage backend is
+    'hdf5' (lib.H5TmpFile) or 'mmap' (MemmapTmpFile).
+    '''
+    if backend is None:
+        backend = SWAP_BACKEND
+    if backend == 'mmap':
+        return MemmapTmpFile(dir=dir)
+    elif backend == 'hdf5':
+        from pyscf.lib.misc import H5TmpFile
+        if dir is None:
+            return H5TmpFile()
+        # The file is unlinked when tmpfile is released. The opened HDF5
+        # file remains accessible until it is closed.
+        tmpfile = tempfile.NamedTemporaryFile(dir=dir)
+        return H5TmpFile(tmpfile.name)
+    else:
+        raise KeyError('Unknown storage backend %s' % backend)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Process pool for embarrassingly parallel calculations
+
+Independent calculations (finite difference displacements, PES scans,
+multiple states, ...) are distributed to a pool of worker processes. Tasks
+are dispatched one at a time, so a worker picks up the next task as soon as
+it finishes the previous one.
+
+The arguments and the return values are serialized with a pickler which
+    * transfers Mole (and Cell) objects through Mole.dumps and Mole.loads,
+    * reopens the output files in append mode in the worker (the standard
+      streams are replaced by the stdout of the worker),
+    * places numpy arrays larger than shm_threshold in shared memory. The
+      worker processes see a read-only snapshot of these arrays. An array
+      is copied to the shared memory only once for the lifetime of the pool.
+
+    * drops the integral screening objects (scf._vhf.VHFOpt) of direct SCF
+      and density fitting. They hold C pointers and are rebuilt by the worker
+      when needed,
+    * transfers the SCF objects created by density_fit() through the SCF
+      class they are derived from.
+
+The function to execute must be importable by the worker processes (a
+module level function, not a lambda or a closure). Other objects of classes
+created at runtime (e.g. by .newton(), .x2c() or the solvent models) cannot
+be transferred. The chkfile attribute of SCF objects is not changed during
+serialization. The calculations running in parallel should assign their own
+chkfile or set chkfile to None.
+
+Examples:
+
+>>> from pyscf import gto, scf, lib
+>>> def energy(mf, mol):
+...     mf = mf.reset(mol)
+...     mf.chkfile = None
+...     return mf.kernel()
+>>> mols = [gto.M(atom=f'H 0 0 0; H 0 0 {r}') for r in (0.7, 0.8, 0.9)]
+>>> with lib.pool.ProcessPool(nproc=3) as pool:
+...     e = pool.map(energy, [scf.RHF(mols[0])] * 3, mols)
+'''
+
+import io
+import os
+import sys
+import pickle
+import tempfile
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy
+from pyscf.lib import misc
+from pyscf import __config__
+
+# Number of worker processes. Default is lib.num_threads()
+NPROC = getattr(__config__, 'lib_pool_nproc', None)
+# fork is not safe after OpenMP threads were started in the parent process
+START_METHOD = getattr(__config__, 'lib_pool_start_method', 'spawn')
+# Arrays larger than this (in bytes) are transferred through shared memory
+SHM_THRESHOLD = getattr(__config__, 'lib_pool_shm_threshold', 1048576)
+
+# Shared memory blocks and output files opened in the worker process
+_attached = {}
+_outputs = {}
+
+def _attach_shared(name, shape, dtype, order):
+    if name not in _attached:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13
+            shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    a = numpy.ndarray(shape, dtype, buffer=_attached[name].buf, order=order)
+    a.flags.writeable = False
+    return a
+
+def _order(a):
+    if a.flags.f_contiguous and not a.flags.c_contiguous:
+        return 'F'
+    return 'C'
+
+def _load_mole(cls, molstr, stdout):
+    mol = cls.loads(molstr)
+    mol.stdout = stdout
+    return mol
+
+def _get_stdout():
+    return sys.stdout
+
+def _open_output(filename):
+    if filename not in _outputs:
+        _outputs[filename] = open(filename, 'a')
+    return _outputs[filename]
+
+def _new_tmpfile(dirname):
+    return tempfile.NamedTemporaryFile(dir=dirname)
+
+def _new_mmap_tmpfile(dirname):
+    from pyscf.lib.mmapfile import MemmapTmpFile
+    return MemmapTmpFile(dir=dirname)
+
+def _dropped():
+    return None
+
+def _load_density_fit(mf_class, state):
+    from pyscf.df.df_jk import density_fit
+    mf = mf_class.__new__(mf_class)
+    mf.__dict__.update(state)
+    return density_fit(mf, with_df=state['with_df'], only_dfj=state['only_dfj'])
+
+
+class _Pickler(pickle.Pickler):
+    '''Pickler for the arguments and return values of the tasks'''
+    def __init__(self, file, pool=None):
+        pickle.Pickler.__init__(self, file, pickle.HIGHEST_PROTOCOL)
+        from pyscf.gto.mole import Mole
+        from pyscf.scf._vhf import VHFOpt
+        from pyscf.lib.mmapfile import MemmapTmpFile
+        self._mole_class = Mole
+        self._vhfopt_class = VHFOpt
+        self._mmap_tmpfile_class = MemmapTmpFile
+        self.pool = pool
+
+    def reducer_override(self, obj):
+        pool = self.pool
+        if isinstance(obj, numpy.ndarray):
+            if (pool is not None and obj.nbytes >= pool.shm_threshold and
+                    not obj.dtype.hasobject):
+                return _attach_shared, pool._share(obj)
+        elif isinstance(obj, self._mole_class):
+            return _load_mole, (obj.__class__, obj.dumps(), obj.stdout)
+        elif isinstance(obj, io.TextIOBase):
+            filename = getattr(obj, 'name', None)
+            if (obj in (sys.stdout, sys.stderr) or obj.closed or
+                    not isinstance(filename, str) or not os.path.exists(filename)):
+                return _get_stdout, ()
+            return _open_output, (os.path.abspath(filename),)
+        elif isinstance(obj, tempfile._TemporaryFileWrapper):
+            return _new_tmpfile, (os.path.dirname(obj.name),)
+        elif isinstance(obj, self._mmap_tmpfile_class):
+            # Not to remove the storage of the parent process in the worker
+            return _new_mmap_tmpfile, (os.path.dirname(obj.path),)
+        elif isinstance(obj, self._vhfopt_class):
+            return _dropped, ()
+        elif '<locals>' in getattr(type(obj), '__qualname__', ''):
+            return self._reduce_local_class(obj)
+        return NotImplemented
+
+    def _reduce_local_class(self, obj):
+        from pyscf.df.df_jk import _DFHF
+        if isinstance(obj, _DFHF):
+            cls = type(obj)
+            if cls.__bases__[0] is _DFHF and len(cls.__bases__) == 2:
+                return _load_density_fit, (cls.__bases__[1], obj.__dict__)
+        raise pickle.PicklingError(
+            f'Object of {type(obj)} (class created at runtime) cannot be '
+            'transferred to the worker processes')
+
+def dumps(obj, pool=None):
+    '''Serialize obj. Large arrays are placed in the shared memory of pool.'''
+    buf = io.BytesIO()
+    _Pickler(buf, pool).dump(obj)
+    return buf.getvalue()
+
+loads = pickle.loads
+
+def _init_worker(nthreads):
+    misc.num_threads(nthreads)
+
+def _run_task(payload):
+    fn, args, kwargs = loads(payload)
+    return dumps(fn(*args, **kwargs))
+
+
+class ProcessPool(object):
+    '''Pool of worker processes for independent calculations
+
+    Attributes:
+        nproc : int
+            Number of worker processes. If nproc is 1, tasks are executed in
+            the current process without serialization.
+        nthreads : int
+            OpenMP threads of each worker. Default is lib.num_threads()//nproc
+        start_method : str
+            'spawn', 'forkserver' or 'fork'
+        shm_threshold : int
+            Arrays larger than shm_threshold bytes are sent to the workers
+            through shared memory.
+    '''
+    def __init__(self, nproc=NPROC, nthreads=None, start_method=START_METHOD,
+                 shm_threshold=SHM_THRESHOLD):
+        sys_threads = misc.num_threads()
+        if nproc is None:
+            nproc = sys_threads
+        if nthreads is None:
+            nthreads = max(1, sys_threads // nproc)
+        self.nproc = nproc
+        self.nthreads = nthreads
+        self.start_method = start_method
+        self.shm_threshold = shm_threshold
+        self._executor = None
+        # id(array) -> (array, SharedMemory). The array is referenced to
+        # keep its id unique during the lifetime of the pool
+        self._shared = {}
+
+    def _share(self, a):
+        key = id(a)
+        if key not in self._shared:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, a.nbytes))
+            buf = numpy.ndarray(a.shape, a.dtype, buffer=shm.buf, order=_order(a))
+            buf[:] = a
+            self._shared[key] = (a, shm)
+        shm = self._shared[key][1]
+        return shm.name, a.shape, a.dtype.str, _order(a)
+
+    def _get_executor(self):
+        if self._executor is None:
+            ctx = multiprocessing.get_context(self.start_method)
+            self._executor = ProcessPoolExecutor(
+                self.nproc, mp_context=ctx, initializer=_init_worker,
+                initargs=(self.nthreads,))
+        return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        '''Schedule fn(*args, **kwargs) in a worker process. Returns a
+        concurrent.futures.Future object.'''
+        fut = Future()
+        if self.nproc <= 1:
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+            return fut
+
+        def set_result(task):
+            e = task.exception()
+            if e is None:
+                try:
+                    fut.set_result(loads(task.result()))
+                except BaseException as e:
+                    fut.set_exception(e)
+            else:
+                fut.set_exception(e)
+        payload = dumps((fn, args, kwargs), self)
+        self._get_executor().submit(_run_task, payload).add_done_callback(set_result)
+        return fut
+
+    def map(self, fn, *iterables):
+        '''Evaluate fn for the arguments in iterables. Returns the list of
+        results in the order of the arguments.'''
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return [fut.result() for fut in futures]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for a, shm in self._shared.values():
+            shm.close()
+            shm.unlink()
+        self._shared = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
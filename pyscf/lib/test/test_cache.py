@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+import unittest
+import tempfile
+import numpy
+from pyscf import lib, gto, scf
+from pyscf.scf import _vhf
+
+class KnownValues(unittest.TestCase):
+    def test_hash_key(self):
+        a = numpy.arange(6.)
+        self.assertEqual(lib.cache.hash_key('a', a), lib.cache.hash_key('a', a.copy()))
+        self.assertNotEqual(lib.cache.hash_key('a', a), lib.cache.hash_key('b', a))
+        self.assertNotEqual(lib.cache.hash_key(a), lib.cache.hash_key(a.reshape(2,3)))
+
+    def test_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as d:
+            cache = lib.cache.DiskCache(d, max_size=.02)
+            a = numpy.ones(1000)  # 8 kB
+            cache.set('a', a)
+            cache.set('b', a * 2)
+            os.utime(os.path.join(d, 'a.npy'), (time.time()-10, time.time()-10))
+            os.utime(os.path.join(d, 'b.npy'), (time.time()-5, time.time()-5))
+            self.assertAlmostEqual(abs(cache.get('a') - a).max(), 0, 14)
+            cache.set('c', a * 3)
+            self.assertTrue('a' in cache)
+            self.assertFalse('b' in cache)
+            self.assertTrue('c' in cache)
+            self.assertTrue(cache.get('b') is None)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(cache.misses, 1)
+            cache.clear()
+            self.assertEqual(cache.entries(), [])
+
+    def test_screening_cache(self):
+        mol = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                    basis='6-31g', verbose=0)
+        with tempfile.TemporaryDirectory() as d:
+            with lib.temporary_env(_vhf, SCREENING_CACHE_DIR=d):
+                opt0 = scf.RHF(mol).init_direct_scf()
+                opt1 = scf.RHF(mol).init_direct_scf()
+                self.assertEqual(_vhf.get_screening_cache().hits, 1)
+                self.assertEqual(len(os.listdir(d)), 1)
+        self.assertAlmostEqual(abs(opt0.q_cond - opt1.q_cond).max(), 0, 14)
+
+if __name__ == "__main__":
+    print("Full Tests for lib.cache")
+    unittest.main()
@@ -75,6 +75,32 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(abs(a.dot(x) - b).max(), 0, 6)
         self.assertAlmostEqual(abs(x - numpy.linalg.solve(a,b)).max(), 0, 6)
 
+    def test_compress(self):
+        a, b, adiag, arest, x0 = make_ab(16)
+        xref = numpy.linalg.solve(a, b)
+        for compress in ('lzf', 'gzip', 'float32'):
+            ftmp = tempfile.NamedTemporaryFile()
+            ad = lib.diis.DIIS(filename=ftmp.name)
+            ad.compress = compress
+            x = x0
+            for i in range(20):
+                x = (b - arest.dot(x)) / adiag
+                x = ad.update(x)
+            self.assertFalse(ad._buffer)
+            self.assertEqual(ad._diisfile['x0'].compression, compress.replace('float32', 'lzf'))
+            self.assertAlmostEqual(abs(x - xref).max(), 0, 6)
+            if compress == 'float32':
+                self.assertEqual(ad._diisfile['e0'].dtype, numpy.float32)
+                self.assertEqual(ad._diisfile['x0'].dtype, numpy.double)
+
+            ad = lib.diis.restore(ftmp.name)
+            x = ad.extrapolate()
+            for i in range(4):
+                e = b - a.dot(x)
+                x = (b - arest.dot(x)) / adiag
+                x = ad.update(x, xerr=e)
+            self.assertAlmostEqual(abs(x - xref).max(), 0, 6)
+
     def test_extrapolate(self):
         a, b, adiag, arest, x = make_ab(16)
         ad = lib.diis.DIIS()
@@ -73,6 +73,45 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(abs(e0[:3] - eref[:3]).max(), 0, 8)
         self.assertAlmostEqual(abs(numpy.abs(x0[:3]) - abs(u[:,:3].T)).max(), 0, 5)
 
+    def test_davidson1_locking(self):
+        numpy.random.seed(12)
+        n = 200
+        a = numpy.random.rand(n,n) * .1
+        a = a + a.T + numpy.diag(numpy.arange(n) * .5)
+        eref, u = scipy.linalg.eigh(a)
+
+        nroots = 10
+        x0 = numpy.eye(n)[:nroots]
+        for lessio, max_memory in ((False, 2000), (True, 1e-4)):
+            nvecs = []
+            def aop(xs):
+                nvecs.append(len(xs))
+                return [a.dot(x) for x in xs]
+            conv, e0, x1 = linalg_helper.davidson1(
+                aop, x0, a.diagonal(), tol=1e-10, max_cycle=100, max_space=4,
+                nroots=nroots, lessio=lessio, max_memory=max_memory)
+            self.assertTrue(all(conv))
+            self.assertAlmostEqual(abs(e0 - eref[:nroots]).max(), 0, 8)
+            # converged roots are excluded from the sigma vector evaluations
+            self.assertTrue(min(nvecs[1:]) < nroots)
+            # Ritz vectors are reused when the subspace is restarted
+            self.assertTrue(sum(nvecs) < len(nvecs) * nroots)
+
+    def test_thick_restart_non_orthonormal(self):
+        numpy.random.seed(2)
+        n = 50
+        a = numpy.random.rand(n,n)
+        a = a + a.T
+        # Non-orthonormal, far from identity overlap
+        x0 = numpy.random.rand(4,n) + numpy.eye(4,n) * 3
+        ax0 = list(x0.dot(a.T))
+        q, aq = linalg_helper._thick_restart(list(x0), ax0, numpy.dot)
+        self.assertAlmostEqual(abs(q.dot(q.T) - numpy.eye(4)).max(), 0, 12)
+        self.assertAlmostEqual(abs(aq - q.dot(a.T)).max(), 0, 10)
+
+        q, aq = linalg_helper._thick_restart([x0[0], x0[0]*2], ax0[:2], numpy.dot)
+        self.assertTrue(q is None)
+
     def test_davidson_diag_matrix(self):
         numpy.random.seed(12)
         n = 100
@@ -13,8 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import sys
+import subprocess
 import unittest
 import numpy
+import pyscf
 from pyscf import lib
 
 class KnownValues(unittest.TestCase):
@@ -30,6 +34,29 @@ class KnownValues(unittest.TestCase):
 
         self.assertRaises(lib.ThreadRuntimeError, bg_raise)
 
+    def test_pipeline_stage(self):
+        out = []
+        with lib.pipeline_stage(out.append, depth=3) as f:
+            for i in range(10):
+                f(i)
+        self.assertEqual(out, list(range(10)))
+        self.assertEqual(f.ntasks, 10)
+
+        with lib.pipeline_stage(lambda i: i**2, depth=2) as prefetch:
+            prefetch(0)
+            prefetch(1)
+            self.assertEqual(prefetch.result(), 0)
+            prefetch(2)
+            self.assertEqual(prefetch.result(), 1)
+            self.assertEqual(prefetch.result(), 4)
+
+        def raise1(i):
+            raise ValueError
+        def bg_raise():
+            with lib.pipeline_stage(raise1) as f:
+                f(0)
+        self.assertRaises(lib.ThreadRuntimeError, bg_raise)
+
     def test_index_tril_to_pair(self):
         i_j = (numpy.random.random((2,30)) * 100).astype(int)
         i0 = numpy.max(i_j, axis=0)
@@ -87,6 +114,39 @@ class KnownValues(unittest.TestCase):
     def test_prange_split(self):
         self.assertEqual(list(lib.prange_split(10, 3)), [(0, 4), (4, 7), (7, 10)])
 
+    def test_load_library(self):
+        libnp = lib.load_library('libnp_helper')
+        self.assertTrue(libnp is lib.load_library('libnp_helper'))
+        self.assertTrue(libnp._handle is not None)
+        self.assertRaises(OSError, lib.load_library, 'libnot_exist')
+
+    def test_import_time(self):
+        # import pyscf should not load any submodules. numpy.distutils (which
+        # is slow) should not be imported when loading the shared libraries.
+        # The import time is measured relative to the import of numpy in the
+        # same process, so that the bounds do not depend on the machine load.
+        code = '''
+import sys, time
+t0 = time.perf_counter()
+import numpy
+t1 = time.perf_counter()
+import pyscf
+t2 = time.perf_counter()
+mods = set(sys.modules)
+from pyscf import gto, scf
+t3 = time.perf_counter()
+assert 'pyscf.lib' not in mods
+assert 'numpy.distutils' not in sys.modules
+print(t1 - t0, t2 - t1, t3 - t2)
+'''
+        # The pyscf package being tested, regardless of the working directory
+        root = os.path.dirname(os.path.dirname(os.path.abspath(pyscf.__file__)))
+        pythonpath = [root] + os.environ.get('PYTHONPATH', '').split(os.pathsep)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in pythonpath if p))
+        out = subprocess.check_output([sys.executable, '-c', code], env=env, cwd=root)
+        t_numpy, t_pyscf, t_scf = [float(x) for x in out.split()]
+        self.assertLess(t_pyscf, t_numpy)
+        self.assertLess(t_scf, t_numpy * 20)
 
 if __name__ == "__main__":
     unittest.main()
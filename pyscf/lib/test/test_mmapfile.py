@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+import tempfile
+import numpy
+from pyscf import lib, gto, ao2mo, df
+
+def setUpModule():
+    global mol
+    mol = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                basis='6-31g', verbose=0)
+
+def tearDownModule():
+    global mol
+    del mol
+
+class KnownValues(unittest.TestCase):
+    def test_group_api(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'f')
+            f = lib.MemmapFile(path, 'w')
+            f['a/0'] = numpy.arange(6.).reshape(2,3)
+            f.create_group('b').create_dataset('x', (3,), 'i4')[:] = 5
+            self.assertEqual(f.keys(), ['a', 'b'])
+            self.assertTrue('a/0' in f)
+            self.assertEqual(len(f['a']), 1)
+            self.assertEqual(f['b/x'].dtype, numpy.int32)
+            self.assertRaises(ValueError, f.create_dataset, 'a/0', (2,))
+            del f['b']
+            self.assertEqual(f.keys(), ['a'])
+            f.close()
+
+            self.assertTrue(lib.mmapfile.is_mmapfile(path))
+            with lib.MemmapFile(path, 'r') as f:
+                self.assertAlmostEqual(abs(f['a/0'][1] - [3,4,5]).max(), 0, 14)
+                self.assertRaises(OSError, f.create_group, 'c')
+
+        ftmp = lib.MemmapTmpFile()
+        path = ftmp.path
+        ftmp.create_dataset('a', (0, 3))
+        ftmp.close()
+        self.assertFalse(os.path.exists(path))
+
+    def test_ao2mo_outcore(self):
+        nao = mol.nao
+        mo = numpy.random.random((nao, 4))
+        ref = ao2mo.kernel(mol, mo)
+        with lib.temporary_env(lib.mmapfile, SWAP_BACKEND='mmap'):
+            feri = lib.MemmapTmpFile()
+            ao2mo.outcore.full(mol, mo, feri.path, max_memory=1, ioblk_size=.01)
+            with ao2mo.load(feri.path) as eri:
+                self.assertTrue(isinstance(eri, numpy.memmap))
+                self.assertAlmostEqual(abs(eri - ref).max(), 0, 9)
+            feri.close()
+
+    def test_df_cderi(self):
+        ref = df.DF(mol).build()._cderi
+        with lib.temporary_env(lib.mmapfile, SWAP_BACKEND='mmap'):
+            with lib.temporary_env(df.DF, _compatible_format=True):
+                mydf = df.DF(mol)
+                mydf.max_memory = 0
+                mydf.build()
+                self.assertTrue(isinstance(mydf._cderi, lib.MemmapTmpFile))
+                self.assertAlmostEqual(abs(numpy.vstack(list(mydf.loop())) - ref).max(), 0, 9)
+
+            mydf = df.DF(mol)
+            mydf.max_memory = 0
+            mydf.build()
+            self.assertEqual(mydf.get_naoaux(), ref.shape[0])
+            self.assertAlmostEqual(abs(numpy.vstack(list(mydf.loop())) - ref).max(), 0, 9)
+
+if __name__ == "__main__":
+    print("Full Tests for lib.mmapfile")
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+import unittest
+import numpy
+from pyscf import lib, gto, scf
+
+def h2_energy(mf, r):
+    mol = gto.M(atom=[['H', (0, 0, 0)], ['H', (0, 0, r)]], basis=mf.mol.basis,
+                verbose=0)
+    mf = mf.reset(mol)
+    mf.chkfile = None
+    return mf.kernel(), mf
+
+def array_info(a, b):
+    return os.getpid(), a.flags.writeable, a.sum(), b.dot(b)
+
+def raise_error(x):
+    raise KeyError(x)
+
+class KnownValues(unittest.TestCase):
+    def test_process_pool(self):
+        mol = gto.M(atom='H 0 0 0; H 0 0 .74', basis='6-31g', verbose=0)
+        mf = scf.RHF(mol)
+        rs = [.6, .7, .8, .9]
+        with lib.pool.ProcessPool(nproc=2) as pool:
+            results = pool.map(h2_energy, [mf] * len(rs), rs)
+        for r, (e, mf1) in zip(rs, results):
+            ref = h2_energy(scf.RHF(mol), r)[0]
+            self.assertAlmostEqual(e, ref, 9)
+            self.assertTrue(isinstance(mf1.mol, gto.Mole))
+            self.assertAlmostEqual(mf1.mol.atom_coords()[1,2], r/lib.param.BOHR, 9)
+            self.assertTrue(mf1.converged)
+
+        # Serial execution
+        pool = lib.pool.ProcessPool(nproc=1)
+        e, mf1 = pool.map(h2_energy, [mf], [.7])[0]
+        self.assertAlmostEqual(e, results[1][0], 9)
+
+    def test_shared_array(self):
+        a = numpy.random.random((200, 1000))
+        b = numpy.arange(10.)
+        with lib.pool.ProcessPool(nproc=2, shm_threshold=1000) as pool:
+            results = pool.map(array_info, [a] * 4, [b] * 4)
+            # Large arrays are copied to the shared memory once
+            self.assertEqual(len(pool._shared), 1)
+            self.assertRaises(KeyError, pool.submit(raise_error, 1).result)
+        for pid, writeable, asum, bdot in results:
+            self.assertNotEqual(pid, os.getpid())
+            self.assertFalse(writeable)
+            self.assertAlmostEqual(asum, a.sum(), 9)
+            self.assertAlmostEqual(bdot, 285, 9)
+
+    def test_dumps(self):
+        mol = gto.M(atom='He', basis='ccpvdz', verbose=0)
+        mf = scf.RHF(mol)
+        mf1 = lib.pool.loads(lib.pool.dumps(mf))
+        self.assertTrue(mf1.mol is not mol)
+        self.assertTrue(mf1.stdout is mf.stdout)
+        self.assertEqual(mf1.mol.nao, mol.nao)
+        self.assertAlmostEqual(mf1.kernel(), mf.kernel(), 9)
+
+    def test_dumps_direct_scf(self):
+        mol = gto.M(atom='H 0 0 0; H 0 0 .74', basis='6-31g', verbose=0)
+        mf = scf.RHF(mol)
+        mf.max_memory = 0
+        e = mf.kernel()
+        self.assertTrue(mf.opt is not None)
+        mf1 = lib.pool.loads(lib.pool.dumps(mf))
+        self.assertTrue(mf1.opt is None)
+        self.assertTrue(mf.opt is not None)
+        self.assertAlmostEqual(mf1.kernel(), e, 9)
+
+        mf = scf.RHF(mol).density_fit().run()
+        mf1 = lib.pool.loads(lib.pool.dumps(mf))
+        self.assertTrue(isinstance(mf1, scf.hf.RHF))
+        self.assertTrue(mf1.with_df is not mf.with_df)
+        self.assertEqual(mf1.with_df.auxbasis, mf.with_df.auxbasis)
+        self.assertAlmostEqual(mf1.kernel(), mf.e_tot, 9)
+
+        mf = scf.RHF(mol).newton()
+        self.assertRaises(pickle.PicklingError, lib.pool.dumps, mf)
+
+if __name__ == "__main__":
+    print("Full Tests for lib.pool")
+    unittest.main()
@@ -20,8 +20,16 @@ import numpy as np
 
 from pyscf import data
 from pyscf import lib
+from pyscf import scf
 from pyscf.lib import logger
+from pyscf.scf import guess_extrapolation
 from pyscf.grad.rhf import GradientsMixin
+from pyscf import __config__
+
+# Extrapolation of the SCF initial guess from the previous steps
+# ('aspc' or 'grassmann'), see module scf.guess_extrapolation
+GUESS_EXTRAPOLATION = getattr(__config__, 'md_integrator_guess_extrapolation', None)
+GUESS_EXTRAPOLATION_ORDER = getattr(__config__, 'md_integrator_guess_extrapolation_order', 3)
 
 
 class Frame:
@@ -115,6 +123,11 @@ def kernel(integrator, verbose=logger.NOTE):
 
         t1 = log.timer('BOMD iteration %d' % iteration, *t1)
 
+    scf_cycles = [c for c in integrator.scf_cycles if c is not None]
+    if scf_cycles:
+        log.note('SCF cycles: total %d, %.1f per step (guess extrapolation %s)',
+                 sum(scf_cycles), np.mean(scf_cycles),
+                 integrator.guess_extrapolation)
     t0 = log.timer('BOMD', *t0)
     return integrator
 
@@ -181,6 +194,18 @@ class _Integrator(lib.StreamObject):
             generaged by the builtin function :func:`locals`, so that the
             callback function can access all local variables in the current
             environment.
+
+        guess_extrapolation : str or None
+            Extrapolation of the SCF initial guess from the previous steps.
+            'aspc' (always stable predictor-corrector) or 'grassmann'
+            (occupied orbitals extrapolation on the Grassmann manifold).
+            If None, SCF starts from the density matrix of the last step.
+
+        guess_extrapolation_order : int
+            Order of the guess extrapolation.
+
+        scf_cycles : list
+            Number of SCF cycles of each step.
     '''
 
     def __init__(self, method, **kwargs):
@@ -209,6 +234,9 @@ class _Integrator(lib.StreamObject):
         self.energy_output = None
         self.trajectory_output = None
         self.callback = None
+        self.guess_extrapolation = GUESS_EXTRAPOLATION
+        self.guess_extrapolation_order = GUESS_EXTRAPOLATION_ORDER
+        self.scf_cycles = []
 
         # Cache the masses into a list, they will be in atomic units
         self._masses = None
@@ -310,6 +338,9 @@ class _Integrator(lib.StreamObject):
         log.info('******** BOMD flags ********')
         log.info('dt = %f', self.dt)
         log.info('Iterations = %d', self.steps)
+        if self.guess_extrapolation is not None:
+            log.info('guess_extrapolation = %s (order %d)',
+                     self.guess_extrapolation, self.guess_extrapolation_order)
         log.info('                   Initial Velocity                  ')
         log.info('             vx              vy              vz')
         for i, (e, v) in enumerate(zip(self.mol.elements, self.veloc)):
@@ -347,6 +378,34 @@ class _Integrator(lib.StreamObject):
     def __iter__(self):
         self._step = 0
         self._log = logger.new_logger(self, self.verbose)
+        self._setup_guess_extrapolation()
+        return self
+
+    def _scf_scanner(self):
+        '''The SCF scanner which generates the SCF orbitals for the method'''
+        base = self.scanner.base
+        if isinstance(base, scf.hf.SCF):
+            return base
+        mf = getattr(base, '_scf', None)
+        if isinstance(mf, scf.hf.SCF) and isinstance(mf, lib.SinglePointScanner):
+            return mf
+        return None
+
+    def _setup_guess_extrapolation(self):
+        '''Attach the guess extrapolation to the SCF scanner'''
+        if self.guess_extrapolation is None:
+            return self
+        mf = self._scf_scanner()
+        if mf is None or not hasattr(mf, 'guess_extrapolation'):
+            logger.warn(self, 'Guess extrapolation is not available for %s',
+                        self.scanner.base.__class__)
+            return self
+        extrap = mf.guess_extrapolation
+        if (not isinstance(extrap, guess_extrapolation._Extrapolation) or
+                extrap.__class__.__name__.upper() != self.guess_extrapolation.upper() or
+                extrap.order != self.guess_extrapolation_order):
+            mf.guess_extrapolation = guess_extrapolation.new_extrapolation(
+                self.guess_extrapolation, self.guess_extrapolation_order)
         return self
 
     def __next__(self):
@@ -478,6 +537,10 @@ class VelocityVerlet(_Integrator):
         if not self.scanner.converged:
             raise RuntimeError('Gradients did not converge!')
 
+        mf = self._scf_scanner()
+        if mf is not None:
+            self.scf_cycles.append(mf.cycles)
+
         a = -1 * grad / self._masses.reshape(-1, 1)
         return e_tot, a
 
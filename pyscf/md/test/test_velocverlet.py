@@ -107,6 +107,24 @@ class KnownValues(unittest.TestCase):
             self.assertAlmostEqual(driver.ekin + driver.epot, beginning_energy,
                                    4)
 
+    def test_hf_water_guess_extrapolation(self):
+        init_veloc = np.array([[0.000336, 0.000044, 0.000434],
+                               [-0.000364, -0.000179, 0.001179],
+                               [-0.001133, -0.000182, 0.000047]])
+
+        ref = md.NVE(hf_scanner, mol=h2o, veloc=init_veloc, dt=5, steps=10)
+        ref.kernel()
+        self.assertEqual(len(ref.scf_cycles), 10)
+
+        for method in ('aspc', 'grassmann'):
+            driver = md.NVE(hf_scanner, mol=h2o, veloc=init_veloc, dt=5,
+                            steps=10, guess_extrapolation=method)
+            driver.kernel()
+            self.assertAlmostEqual(driver.epot, ref.epot, 8)
+            self.assertAlmostEqual(driver.ekin, ref.ekin, 8)
+            # SCF cycles saved by the extrapolated initial guess
+            self.assertLess(sum(driver.scf_cycles[3:]), sum(ref.scf_cycles[3:]))
+
     def test_ss_s0_ethylene_zero_init_veloc(self):
         driver = md.NVE(casscf_scanner, dt=5, steps=10)
 
@@ -33,13 +33,14 @@ class RCCSD(rccsd.RCCSD):
             return self.e_corr, self.t1, self.t2
         return rccsd.RCCSD.ccsd(self, t1, t2, eris)
 
-    def ao2mo(self, mo_coeff=None):
+    def ao2mo(self, mo_coeff=None, dtype=numpy.double):
         from pyscf.pbc import tools
         ao2mofn = mp.mp2._gen_ao2mofn(self._scf)
         # _scf.exxdiv affects eris.fock. HF exchange correction should be
         # excluded from the Fock matrix.
         with lib.temporary_env(self._scf, exxdiv=None):
-            eris = rccsd._make_eris_incore(self, mo_coeff, ao2mofn=ao2mofn)
+            eris = rccsd._make_eris_incore(self, mo_coeff, ao2mofn=ao2mofn,
+                                           dtype=dtype)
 
         # eris.mo_energy so far is just the diagonal part of the Fock matrix
         # without the exxdiv treatment. Here to add the exchange correction to
@@ -68,10 +68,11 @@ def get_j_kpts(mydf, dm_kpts, hermi=1, kpts=np.zeros((1,3)), kpts_band=None):
                 rhoR[i,p0:p1] += make_rho(i, ao_ks, mask, 'LDA').real
             ao = ao_ks = None
 
-        for i in range(nset):
-            rhoG = tools.fft(rhoR[i], mesh)
-            vG = coulG * rhoG
-            vR[i] = tools.ifft(vG, mesh).real
+        # rhoR is real. Only half of the spectrum is needed in FFT.
+        rhoG = tools.rfft(rhoR, mesh)
+        rhoG *= tools.half_spectrum(coulG, mesh, hermitian_part=True)
+        vR = tools.irfft(rhoG, mesh)
+        rhoR = rhoG = None
 
     else:  # vR may be complex if the underlying density is complex
         vR = rhoR = np.zeros((nset,ngrids), dtype=np.complex128)
@@ -132,10 +133,11 @@ def get_j_e1_kpts(mydf, dm_kpts, kpts=np.zeros((1,3)), kpts_band=None):
                 rhoR[i,p0:p1] += make_rho(i, ao_ks, mask, 'LDA').real
             ao = ao_ks = None
 
-        for i in range(nset):
-            rhoG = tools.fft(rhoR[i], mesh)
-            vG = coulG * rhoG
-            vR[i] = tools.ifft(vG, mesh).real
+        # rhoR is real. Only half of the spectrum is needed in FFT.
+        rhoG = tools.rfft(rhoR, mesh)
+        rhoG *= tools.half_spectrum(coulG, mesh, hermitian_part=True)
+        vR = tools.irfft(rhoG, mesh)
+        rhoR = rhoG = None
 
     else:  # vR may be complex if the underlying density is complex
         vR = rhoR = np.zeros((nset,ngrids), dtype=np.complex128)
@@ -36,6 +36,7 @@ import h5py
 from pyscf import gto
 from pyscf import lib
 from pyscf.lib import logger, zdotCN
+from pyscf.scf import _vhf
 from pyscf.df.outcore import _guess_shell_ranges
 from pyscf.gto import ANG_OF
 from pyscf.pbc import gto as pbcgto
@@ -219,16 +220,25 @@ class _RSGDFBuilder(_Int3cBuilder):
         intor = 'int2e_sph'
         cintopt = lib.c_null_ptr()
         nbas = supmol.nbas
-        q_cond = np.empty((nbas, nbas))
-        with supmol.with_integral_screen(supmol.precision**2):
-            ao_loc = gto.moleintor.make_loc(supmol._bas, intor)
-            libpbc.CVHFset_int2e_q_cond(
-                getattr(libpbc, intor), cintopt,
-                q_cond.ctypes.data_as(ctypes.c_void_p),
-                ao_loc.ctypes.data_as(ctypes.c_void_p),
-                supmol._atm.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.natm),
-                supmol._bas.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.nbas),
-                supmol._env.ctypes.data_as(ctypes.c_void_p))
+        q_cond = key = None
+        screening_cache = _vhf.get_screening_cache()
+        if screening_cache is not None:
+            key = lib.cache.hash_key('CVHFset_int2e_q_cond', intor, supmol.precision,
+                                     supmol._atm, supmol._bas, supmol._env)
+            q_cond = screening_cache.get(key)
+        if q_cond is None or q_cond.shape != (nbas, nbas):
+            q_cond = np.empty((nbas, nbas))
+            with supmol.with_integral_screen(supmol.precision**2):
+                ao_loc = gto.moleintor.make_loc(supmol._bas, intor)
+                libpbc.CVHFset_int2e_q_cond(
+                    getattr(libpbc, intor), cintopt,
+                    q_cond.ctypes.data_as(ctypes.c_void_p),
+                    ao_loc.ctypes.data_as(ctypes.c_void_p),
+                    supmol._atm.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.natm),
+                    supmol._bas.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.nbas),
+                    supmol._env.ctypes.data_as(ctypes.c_void_p))
+            if key is not None:
+                screening_cache.set(key, q_cond)
 
         # Remove d-d block in supmol q_cond
         if self.exclude_dd_block:
@@ -245,20 +255,29 @@ class _RSGDFBuilder(_Int3cBuilder):
         intor = 'int3c2e_sph'
         cintopt = lib.c_null_ptr()
         nbas = supmol.nbas
-        q_cond_aux = np.empty((auxcell_s.nbas, nbas))
-        with supmol.with_integral_screen(supmol.precision**2):
-            atm, bas, env = gto.conc_env(supmol._atm, supmol._bas, supmol._env,
-                                         auxcell_s._atm, auxcell_s._bas, auxcell_s._env)
-            ao_loc = gto.moleintor.make_loc(bas, intor)
-            shls_slice = (0, supmol.nbas, supmol.nbas, len(bas))
-            libpbc.PBC_nr3c_q_cond(
-                getattr(libpbc, intor), cintopt,
-                q_cond_aux.ctypes.data_as(ctypes.c_void_p),
-                (ctypes.c_int * 4)(*shls_slice),
-                ao_loc.ctypes.data_as(ctypes.c_void_p),
-                atm.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.natm),
-                bas.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.nbas),
-                env.ctypes.data_as(ctypes.c_void_p))
+        atm, bas, env = gto.conc_env(supmol._atm, supmol._bas, supmol._env,
+                                     auxcell_s._atm, auxcell_s._bas, auxcell_s._env)
+        q_cond_aux = key = None
+        screening_cache = _vhf.get_screening_cache()
+        if screening_cache is not None:
+            key = lib.cache.hash_key('PBC_nr3c_q_cond', intor, supmol.precision,
+                                     nbas, atm, bas, env)
+            q_cond_aux = screening_cache.get(key)
+        if q_cond_aux is None or q_cond_aux.shape != (auxcell_s.nbas, nbas):
+            q_cond_aux = np.empty((auxcell_s.nbas, nbas))
+            with supmol.with_integral_screen(supmol.precision**2):
+                ao_loc = gto.moleintor.make_loc(bas, intor)
+                shls_slice = (0, supmol.nbas, supmol.nbas, len(bas))
+                libpbc.PBC_nr3c_q_cond(
+                    getattr(libpbc, intor), cintopt,
+                    q_cond_aux.ctypes.data_as(ctypes.c_void_p),
+                    (ctypes.c_int * 4)(*shls_slice),
+                    ao_loc.ctypes.data_as(ctypes.c_void_p),
+                    atm.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.natm),
+                    bas.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(supmol.nbas),
+                    env.ctypes.data_as(ctypes.c_void_p))
+            if key is not None:
+                screening_cache.set(key, q_cond_aux)
 
         if self.exclude_d_aux:
             # Assign a very small value to q_cond_aux to avoid dividing 0 error
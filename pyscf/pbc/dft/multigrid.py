@@ -634,6 +634,14 @@ def _eval_rhoG(mydf, dm_kpts, hermi=1, kpts=numpy.zeros((1,3)), deriv=0,
     return rhoG
 
 
+def _ifft_rhoG(rhoG, mesh):
+    '''The real part of the inverse FFT of rhoG, computed with the
+    real-to-complex inverse FFT on half of the spectrum.
+    '''
+    ngrids = numpy.prod(mesh)
+    rhoG = tools.half_spectrum(rhoG.reshape(-1,ngrids), mesh, hermitian_part=True)
+    return tools.irfft(rhoG, mesh)
+
 def _eval_rho_bra(cell, dms, shls_slice, hermi, xctype, kpts, grids,
                   ignore_imag, log):
     a = cell.lattice_vectors()
@@ -822,11 +830,17 @@ def _get_j_pass2(mydf, vG, hermi=1, kpts=numpy.zeros((1,3)), verbose=None):
         gz = numpy.fft.fftfreq(mesh[2], 1./mesh[2]).astype(numpy.int32)
         #:sub_vG = vG[:,gx[:,None,None],gy[:,None],gz].reshape(nset,ngrids)
         sub_vG = _take_4d(vG, (None, gx, gy, gz)).reshape(nset,ngrids)
-
-        v_rs = tools.ifft(sub_vG, mesh).reshape(nset,ngrids)
-        vR = numpy.asarray(v_rs.real, order='C')
-        vI = numpy.asarray(v_rs.imag, order='C')
-        ignore_vG_imag = hermi == 1 or abs(vI.sum()) < IMAG_TOL
+        if hermi == 1:
+            # The potential is real. The half spectrum is sufficient for the
+            # real-to-complex inverse FFT.
+            sub_vG = tools.half_spectrum(sub_vG, mesh, hermitian_part=True)
+            v_rs = vR = tools.irfft(sub_vG, mesh).reshape(nset,ngrids)
+            ignore_vG_imag = True
+        else:
+            v_rs = tools.ifft(sub_vG, mesh).reshape(nset,ngrids)
+            vR = numpy.asarray(v_rs.real, order='C')
+            vI = numpy.asarray(v_rs.imag, order='C')
+            ignore_vG_imag = abs(vI.sum()) < IMAG_TOL
         if ignore_vG_imag:
             v_rs = vR
         elif vj_kpts.dtype == numpy.double:
@@ -917,10 +931,16 @@ def _get_gga_pass2(mydf, vG, hermi=1, kpts=numpy.zeros((1,3)), verbose=None):
         gz = numpy.fft.fftfreq(mesh[2], 1./mesh[2]).astype(numpy.int32)
         #:sub_vG = vG[:,:,gx[:,None,None],gy[:,None],gz].reshape(-1,ngrids)
         sub_vG = _take_5d(vG, (None, None, gx, gy, gz)).reshape(-1,ngrids)
-        v_rs = tools.ifft(sub_vG, mesh).reshape(nset,4,ngrids)
-        vR = numpy.asarray(v_rs.real, order='C')
-        vI = numpy.asarray(v_rs.imag, order='C')
-        ignore_vG_imag = hermi == 1 or abs(vI.sum()) < IMAG_TOL
+        if hermi == 1:
+            # Real potential, see _get_j_pass2
+            sub_vG = tools.half_spectrum(sub_vG, mesh, hermitian_part=True)
+            v_rs = vR = tools.irfft(sub_vG, mesh).reshape(nset,4,ngrids)
+            ignore_vG_imag = True
+        else:
+            v_rs = tools.ifft(sub_vG, mesh).reshape(nset,4,ngrids)
+            vR = numpy.asarray(v_rs.real, order='C')
+            vI = numpy.asarray(v_rs.imag, order='C')
+            ignore_vG_imag = abs(vI.sum()) < IMAG_TOL
         if ignore_vG_imag:
             v_rs = vR
         elif veff.dtype == numpy.double:
@@ -1054,7 +1074,7 @@ def nr_rks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
     weight = cell.vol / ngrids
     # *(1./weight) because rhoR is scaled by weight in _eval_rhoG.  When
     # computing rhoR with IFFT, the weight factor is not needed.
-    rhoR = tools.ifft(rhoG.reshape(-1,ngrids), mesh).real * (1./weight)
+    rhoR = _ifft_rhoG(rhoG, mesh) * (1./weight)
     rhoR = rhoR.reshape(nset,-1,ngrids)
     nelec = rhoR[:,0].sum(axis=1) * weight
 
@@ -1164,7 +1184,7 @@ def nr_uks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
     weight = cell.vol / ngrids
     # *(1./weight) because rhoR is scaled by weight in _eval_rhoG.  When
     # computing rhoR with IFFT, the weight factor is not needed.
-    rhoR = tools.ifft(rhoG.reshape(-1,ngrids), mesh).real * (1./weight)
+    rhoR = _ifft_rhoG(rhoG, mesh) * (1./weight)
     rhoR = rhoR.reshape(nset,2,-1,ngrids)
     nelec = numpy.einsum('nsg->n', rhoR[:,:,0]) * weight
 
@@ -1241,7 +1261,7 @@ def nr_rks_fxc(mydf, xc_code, dm0, dms, hermi=0, with_j=False,
     weight = cell.vol / ngrids
     if rho0 is None:
         rhoG = _eval_rhoG(mydf, dm0, hermi, kpts, deriv)
-        rho0 = tools.ifft(rhoG.reshape(-1,ngrids), mesh).real * (1./weight)
+        rho0 = _ifft_rhoG(rhoG, mesh) * (1./weight)
         if xctype == 'LDA':
             rho0 = rho0.reshape(ngrids)
 
@@ -1249,9 +1269,10 @@ def nr_rks_fxc(mydf, xc_code, dm0, dms, hermi=0, with_j=False,
         fxc = ni.eval_xc_eff(xc_code, rho0, deriv=2, xctype=xctype)[2]
 
     rhoG = _eval_rhoG(mydf, dms, hermi, kpts, deriv)
-    rho1 = tools.ifft(rhoG.reshape(-1,ngrids), mesh)
     if hermi == 1:
-        rho1 = rho1.real
+        rho1 = _ifft_rhoG(rhoG, mesh)
+    else:
+        rho1 = tools.ifft(rhoG.reshape(-1,ngrids), mesh)
     rho1 *= (1./weight)
     rho1 = rho1.reshape(nset,-1,ngrids)
     wv = numpy.einsum('nxg,xyg->nyg', rho1, fxc)
@@ -1304,7 +1325,7 @@ def nr_rks_fxc_st(mydf, xc_code, dm0, dms_alpha, singlet=True,
     if rho0 is None:
         rhoG = _eval_rhoG(mydf, dm0, 1, kpts, deriv)
         # *.5 to get alpha density
-        rho0 = tools.ifft(rhoG.reshape(-1,ngrids), mesh).real * (.5/weight)
+        rho0 = _ifft_rhoG(rhoG, mesh) * (.5/weight)
         if xctype == 'LDA':
             rho0 = rho0.reshape(ngrids)
         rho0 = numpy.stack((rho0, rho0))
@@ -1323,9 +1344,10 @@ def nr_rks_fxc_st(mydf, xc_code, dm0, dms_alpha, singlet=True,
     else:
         fxc = fxc[0,:,0] - fxc[0,:,1]
     rhoG = _eval_rhoG(mydf, dms, hermi, kpts, deriv)
-    rho1 = tools.ifft(rhoG.reshape(-1,ngrids), mesh)
     if hermi == 1:
-        rho1 = rho1.real
+        rho1 = _ifft_rhoG(rhoG, mesh)
+    else:
+        rho1 = tools.ifft(rhoG.reshape(-1,ngrids), mesh)
     rho1 *= (1./weight)
     rho1 = rho1.reshape(nset,-1,ngrids)
     wv = numpy.einsum('nxg,xyg->nyg', rho1, fxc)
@@ -1372,7 +1394,7 @@ def nr_uks_fxc(mydf, xc_code, dm0, dms, hermi=0, with_j=False,
     weight = cell.vol / ngrids
     if rho0 is None:
         rhoG = _eval_rhoG(mydf, dm0, hermi, kpts, deriv)
-        rho0 = tools.ifft(rhoG.reshape(-1,ngrids), mesh).real * (1./weight)
+        rho0 = _ifft_rhoG(rhoG, mesh) * (1./weight)
         if xctype == 'LDA':
             rho0 = rho0.reshape(2,ngrids)
         else:
@@ -1382,9 +1404,10 @@ def nr_uks_fxc(mydf, xc_code, dm0, dms, hermi=0, with_j=False,
         fxc = ni.eval_xc_eff(xc_code, rho0, deriv=2, xctype=xctype)[2]
 
     rhoG = _eval_rhoG(mydf, dms, hermi, kpts, deriv)
-    rho1 = tools.ifft(rhoG.reshape(-1,ngrids), mesh)
     if hermi == 1:
-        rho1 = rho1.real
+        rho1 = _ifft_rhoG(rhoG, mesh)
+    else:
+        rho1 = tools.ifft(rhoG.reshape(-1,ngrids), mesh)
     rho1 *= (1./weight)
     # rho1 = (rho1a, rho1b); rho1.shape = (2, nstates, nvar, ngrids)
     rho1 = rho1.reshape(2,nstates,-1,ngrids)
@@ -1433,7 +1456,7 @@ def cache_xc_kernel(mydf, xc_code, dm, spin=0, kpts=None):
     hermi = 1
     weight = cell.vol / ngrids
     rhoG = _eval_rhoG(mydf, dm, hermi, kpts, deriv)
-    rho = tools.ifft(rhoG.reshape(-1,ngrids), mesh).real * (1./weight)
+    rho = _ifft_rhoG(rhoG, mesh) * (1./weight)
     if xctype == 'LDA':
         if spin == 0:
             rho = rho.ravel()
@@ -1513,7 +1536,7 @@ def get_rho(mydf, dm, kpts=numpy.zeros((1,3))):
     weight = cell.vol / ngrids
     # *(1./weight) because rhoR is scaled by weight in _eval_rhoG.  When
     # computing rhoR with IFFT, the weight factor is not needed.
-    rhoR = tools.ifft(rhoG.reshape(ngrids), mesh).real * (1./weight)
+    rhoR = _ifft_rhoG(rhoG, mesh).reshape(ngrids) * (1./weight)
     return rhoR
 
 
@@ -15,14 +15,17 @@
 
 import warnings
 import copy
+import time
 import numpy as np
 import scipy.linalg
+import scipy.fft
 from pyscf import lib
 from pyscf.lib import logger
 from pyscf.gto import ATM_SLOTS, BAS_SLOTS, ATOM_OF, PTR_COORD
 from pyscf.pbc.lib.kpts_helper import get_kconserv, get_kconserv3  # noqa
 from pyscf import __config__
 
+# FFT engine. It can be changed at runtime by set_fft_engine
 FFT_ENGINE = getattr(__config__, 'pbc_tools_pbc_fft_engine', 'BLAS')
 
 def _fftn_blas(f, mesh):
@@ -57,55 +60,201 @@ def _ifftn_blas(g, mesh):
         f = lib.dot(f.reshape(mesh[2],-1).T, expRGz, 1./mesh[2], c=out[i].reshape(-1,mesh[2]))
     return out.reshape(-1, *mesh)
 
-if FFT_ENGINE == 'FFTW':
-    # pyfftw is slower than np.fft in most cases
-    try:
-        import pyfftw
-        pyfftw.interfaces.cache.enable()
-        nproc = lib.num_threads()
-        def _fftn_wrapper(a):
-            return pyfftw.interfaces.numpy_fft.fftn(a, axes=(1,2,3), threads=nproc)
-        def _ifftn_wrapper(a):
-            return pyfftw.interfaces.numpy_fft.ifftn(a, axes=(1,2,3), threads=nproc)
-    except ImportError:
-        def _fftn_wrapper(a):
-            return np.fft.fftn(a, axes=(1,2,3))
-        def _ifftn_wrapper(a):
-            return np.fft.ifftn(a, axes=(1,2,3))
-
-elif FFT_ENGINE == 'NUMPY':
-    def _fftn_wrapper(a):
+_EXCLUDE = [17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79,
+            83, 89, 97,101,103,107,109,113,127,131,137,139,149,151,157,163,
+            167,173,179,181,191,193,197,199,211,223,227,229,233,239,241,251,
+            257,263,269,271,277,281,283,293]
+_EXCLUDE = set(_EXCLUDE + [n*2 for n in _EXCLUDE] + [n*3 for n in _EXCLUDE])
+
+def _fftn_numpy(a):
+    return np.fft.fftn(a, axes=(1,2,3))
+def _ifftn_numpy(a):
+    return np.fft.ifftn(a, axes=(1,2,3))
+def _rfftn_numpy(a):
+    return np.fft.rfftn(a, axes=(1,2,3))
+def _irfftn_numpy(a, mesh):
+    return np.fft.irfftn(a, s=mesh, axes=(1,2,3))
+
+def _fftn_numpy_blas(a):
+    mesh = a.shape[1:]
+    if mesh[0] in _EXCLUDE and mesh[1] in _EXCLUDE and mesh[2] in _EXCLUDE:
+        return _fftn_blas(a, mesh)
+    else:
         return np.fft.fftn(a, axes=(1,2,3))
-    def _ifftn_wrapper(a):
+def _ifftn_numpy_blas(a):
+    mesh = a.shape[1:]
+    if mesh[0] in _EXCLUDE and mesh[1] in _EXCLUDE and mesh[2] in _EXCLUDE:
+        return _ifftn_blas(a, mesh)
+    else:
         return np.fft.ifftn(a, axes=(1,2,3))
 
-elif FFT_ENGINE == 'NUMPY+BLAS':
-    _EXCLUDE = [17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79,
-                83, 89, 97,101,103,107,109,113,127,131,137,139,149,151,157,163,
-                167,173,179,181,191,193,197,199,211,223,227,229,233,239,241,251,
-                257,263,269,271,277,281,283,293]
-    _EXCLUDE = set(_EXCLUDE + [n*2 for n in _EXCLUDE] + [n*3 for n in _EXCLUDE])
-    def _fftn_wrapper(a):
-        mesh = a.shape[1:]
-        if mesh[0] in _EXCLUDE and mesh[1] in _EXCLUDE and mesh[2] in _EXCLUDE:
-            return _fftn_blas(a, mesh)
-        else:
-            return np.fft.fftn(a, axes=(1,2,3))
-    def _ifftn_wrapper(a):
-        mesh = a.shape[1:]
-        if mesh[0] in _EXCLUDE and mesh[1] in _EXCLUDE and mesh[2] in _EXCLUDE:
-            return _ifftn_blas(a, mesh)
+def _fftn_blas_wrapper(a):
+    return _fftn_blas(a, a.shape[1:])
+def _ifftn_blas_wrapper(a):
+    return _ifftn_blas(a, a.shape[1:])
+
+def _fftn_scipy(a):
+    return scipy.fft.fftn(a, axes=(1,2,3), workers=lib.num_threads())
+def _ifftn_scipy(a):
+    return scipy.fft.ifftn(a, axes=(1,2,3), workers=lib.num_threads())
+def _rfftn_scipy(a):
+    return scipy.fft.rfftn(a, axes=(1,2,3), workers=lib.num_threads())
+def _irfftn_scipy(a, mesh):
+    return scipy.fft.irfftn(a, s=mesh, axes=(1,2,3), workers=lib.num_threads())
+
+class _FFTWPlans(object):
+    '''FFTW plans cached by the shape and type of the transformation. Each
+    plan holds its own aligned input and output buffers.'''
+    def __init__(self, max_plans=16):
+        self.max_plans = max_plans
+        self.plans = {}
+
+    def get(self, kind, shape, dtype):
+        key = (kind, shape, dtype)
+        plan = self.plans.get(key)
+        if plan is None:
+            import pyfftw
+            if len(self.plans) >= self.max_plans:
+                self.plans.pop(next(iter(self.plans)))
+            nthreads = lib.num_threads()
+            if kind == 'irfftn':
+                batch, mesh = shape[0], shape[1:]
+                buf = pyfftw.empty_aligned(
+                    (batch, mesh[0], mesh[1], mesh[2]//2+1), dtype=dtype)
+            else:
+                buf = pyfftw.empty_aligned(shape, dtype=dtype)
+            builder = getattr(pyfftw.builders, kind)
+            if kind == 'irfftn':
+                plan = builder(buf, s=shape[1:], axes=(1,2,3), threads=nthreads,
+                               avoid_copy=True)
+            else:
+                plan = builder(buf, axes=(1,2,3), threads=nthreads,
+                               avoid_copy=True)
+            self.plans[key] = plan
+        return plan
+
+    def execute(self, kind, a, mesh=None):
+        if kind == 'irfftn':
+            shape = (a.shape[0],) + tuple(mesh)
         else:
-            return np.fft.ifftn(a, axes=(1,2,3))
+            shape = a.shape
+        plan = self.get(kind, shape, a.dtype)
+        plan.input_array[:] = a
+        # The output buffer is overwritten by the next call of the plan
+        return plan().copy()
+
+_fftw_plans = _FFTWPlans()
+
+def _fftn_fftw(a):
+    return _fftw_plans.execute('fftn', np.asarray(a, dtype=np.complex128))
+def _ifftn_fftw(a):
+    return _fftw_plans.execute('ifftn', np.asarray(a, dtype=np.complex128))
+def _rfftn_fftw(a):
+    return _fftw_plans.execute('rfftn', np.asarray(a, dtype=np.double))
+def _irfftn_fftw(a, mesh):
+    return _fftw_plans.execute('irfftn', np.asarray(a, dtype=np.complex128), mesh)
+
+# FFT engines: name -> (fftn, ifftn, rfftn, irfftn, available). The functions
+# transform the last three axes of an array of shape (batch, nx, ny, nz).
+# irfftn takes the mesh as the second argument.
+FFT_ENGINES = {}
+
+def register_fft_engine(name, fftn, ifftn, rfftn=None, irfftn=None,
+                        available=True):
+    '''Register an FFT engine which can be selected by :func:`set_fft_engine`.
 
-#?elif:  # 'FFTW+BLAS'
-else:  # 'BLAS'
-    def _fftn_wrapper(a):
-        mesh = a.shape[1:]
-        return _fftn_blas(a, mesh)
-    def _ifftn_wrapper(a):
-        mesh = a.shape[1:]
-        return _ifftn_blas(a, mesh)
+    Args:
+        fftn, ifftn : functions to transform the (1,2,3) axes of a 4D array
+        rfftn, irfftn : real-to-complex and complex-to-real transforms.
+            irfftn(a, mesh) is called with the mesh of the real array.
+            numpy.fft.rfftn/irfftn are used if not given.
+        available : bool or a function which returns bool
+            Whether the engine can be used (e.g. the optional dependency is
+            installed)
+    '''
+    FFT_ENGINES[name.upper()] = (fftn, ifftn, rfftn or _rfftn_numpy,
+                                 irfftn or _irfftn_numpy, available)
+
+def _fftw_available():
+    try:
+        import pyfftw  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+register_fft_engine('BLAS', _fftn_blas_wrapper, _ifftn_blas_wrapper)
+register_fft_engine('NUMPY', _fftn_numpy, _ifftn_numpy)
+register_fft_engine('NUMPY+BLAS', _fftn_numpy_blas, _ifftn_numpy_blas)
+register_fft_engine('SCIPY', _fftn_scipy, _ifftn_scipy, _rfftn_scipy, _irfftn_scipy)
+register_fft_engine('FFTW', _fftn_fftw, _ifftn_fftw, _rfftn_fftw, _irfftn_fftw,
+                    _fftw_available)
+
+def _engine_available(name):
+    available = FFT_ENGINES[name][4]
+    if callable(available):
+        available = available()
+    return available
+
+def available_fft_engines():
+    '''Names of the registered FFT engines which can be used'''
+    return [name for name in FFT_ENGINES if _engine_available(name)]
+
+def set_fft_engine(name):
+    '''Select the FFT engine at runtime. name can be one of the registered
+    engines (see :func:`available_fft_engines`) or 'AUTO'. With 'AUTO', the
+    fastest engine is determined for each kind of transformation, mesh and
+    batch size when the transformation is called for the first time.
+    '''
+    global FFT_ENGINE
+    name = name.upper()
+    if name != 'AUTO' and name not in FFT_ENGINES:
+        raise KeyError(f'Unknown FFT engine {name}. '
+                       f'Available engines: {list(FFT_ENGINES)} and AUTO')
+    FFT_ENGINE = name
+    return name
+
+# Timing of the FFT engines in AUTO mode: (kind, shape, dtype) -> engine name
+_AUTOTUNE_TABLE = {}
+_FFT_KINDS = ('fftn', 'ifftn', 'rfftn', 'irfftn')
+
+def _autotune(kind, a, mesh=None):
+    '''Find the fastest FFT engine for the transformation'''
+    key = (kind, a.shape, a.dtype.char)
+    name = _AUTOTUNE_TABLE.get(key)
+    if name is not None:
+        return name
+    k = _FFT_KINDS.index(kind)
+    args = (a,) if mesh is None else (a, mesh)
+    timings = []
+    for name in available_fft_engines():
+        fn = FFT_ENGINES[name][k]
+        try:
+            fn(*args)  # warm up, e.g. to create the FFTW plans
+            t0 = time.perf_counter()
+            fn(*args)
+            timings.append((time.perf_counter() - t0, name))
+        except Exception as e:
+            warnings.warn(f'FFT engine {name} failed: {e}')
+    name = min(timings)[1]
+    _AUTOTUNE_TABLE[key] = name
+    return name
+
+def _get_fft_fn(kind, a, mesh=None):
+    name = FFT_ENGINE.upper()
+    if name == 'AUTO':
+        name = _autotune(kind, a, mesh)
+    elif name not in FFT_ENGINES or not _engine_available(name):
+        name = 'NUMPY'
+    return FFT_ENGINES[name][_FFT_KINDS.index(kind)]
+
+def _fftn_wrapper(a):
+    return _get_fft_fn('fftn', a)(a)
+def _ifftn_wrapper(a):
+    return _get_fft_fn('ifftn', a)(a)
+def _rfftn_wrapper(a):
+    return _get_fft_fn('rfftn', a)(a)
+def _irfftn_wrapper(a, mesh):
+    return _get_fft_fn('irfftn', a, mesh)(a, mesh)
 
 
 def fft(f, mesh):
@@ -173,6 +322,80 @@ def ifft(g, mesh):
         return f3d.reshape(-1, ngrids)
 
 
+def rfft(f, mesh):
+    '''Perform the 3D FFT of real functions from real (R) to reciprocal (G)
+    space. Only the non-negative frequencies of the last dimension are
+    computed (see numpy.fft.rfftn).
+
+    Args:
+        f : (nx*ny*nz,) or (N, nx*ny*nz) ndarray
+            The real functions to be FFT'd.
+        mesh : (3,) ndarray of ints (= nx,ny,nz)
+
+    Returns:
+        (nx*ny*(nz//2+1),) or (N, nx*ny*(nz//2+1)) complex ndarray
+    '''
+    f = np.asarray(f)
+    f3d = f.reshape(-1, *mesh)
+    g3d = _rfftn_wrapper(f3d)
+    if f.ndim == 1:
+        return g3d.ravel()
+    else:
+        return g3d.reshape(g3d.shape[0], -1)
+
+def irfft(g, mesh):
+    '''Inverse of :func:`rfft`. It returns the real functions in real space
+    from the non-negative frequencies of the last dimension.
+
+    Args:
+        g : (nx*ny*(nz//2+1),) or (N, nx*ny*(nz//2+1)) ndarray
+        mesh : (3,) ndarray of ints (= nx,ny,nz)
+
+    Returns:
+        (nx*ny*nz,) or (N, nx*ny*nz) real ndarray
+    '''
+    g = np.asarray(g)
+    g3d = g.reshape(-1, mesh[0], mesh[1], mesh[2]//2+1)
+    f3d = _irfftn_wrapper(g3d, tuple(mesh))
+    if g.ndim == 1:
+        return f3d.ravel()
+    else:
+        return f3d.reshape(f3d.shape[0], -1)
+
+def half_spectrum(g, mesh, hermitian_part=False):
+    '''The components of g (in the index order of Gv) on the G-vectors which
+    are used by :func:`rfft` and :func:`irfft`. It can be used to generate
+    the half-grid coulG or the input of :func:`irfft` from the full spectrum
+    of a real function.
+
+    Args:
+        g : (nx*ny*nz,) or (N, nx*ny*nz) ndarray
+        mesh : (3,) ndarray of ints (= nx,ny,nz)
+
+    Kwargs:
+        hermitian_part : bool
+            Whether to symmetrize g to (g(G) + g(-G)^*)/2 before taking the
+            half spectrum. For even meshes, the G-vectors on the boundary of
+            the FFT box may not be closed under inversion (e.g. coulG of a
+            non-orthogonal cell). With this option, irfft(half_spectrum(g))
+            is identical to ifft(g).real.
+
+    Returns:
+        (nx*ny*(nz//2+1),) or (N, nx*ny*(nz//2+1)) ndarray
+    '''
+    g = np.asarray(g)
+    g3d = g.reshape(-1, *mesh)
+    if hermitian_part:
+        # g(-G) in the index order of Gv
+        g_inv = np.roll(g3d[:,::-1,::-1,::-1], 1, axis=(1,2,3))
+        g3d = (g3d + g_inv.conj()) * .5
+    g3d = g3d[:,:,:,:mesh[2]//2+1]
+    if g.ndim == 1:
+        return g3d.ravel()
+    else:
+        return g3d.reshape(g3d.shape[0], -1)
+
+
 def fftk(f, mesh, expmikr):
     r'''Perform the 3D FFT of a real-space function which is (periodic*e^{ikr}).
 
@@ -17,6 +17,7 @@ import numpy
 from pyscf import gto
 from pyscf.pbc import gto as pbcgto
 from pyscf.pbc import tools
+from pyscf.pbc.tools import pbc as pbc_tools
 from pyscf.pbc.scf import khf
 from pyscf import lib
 
@@ -206,6 +207,48 @@ C  15.16687337 15.16687337 15.16687337
         v = tools.ifft(a, [8,n,8]).ravel()
         self.assertAlmostEqual(abs(ref-v).max(), 0, 10)
 
+    def test_fft_engines(self):
+        n = 15
+        a = numpy.random.random([3,n,n,n])
+        ref = numpy.fft.fftn(a, axes=(1,2,3)).reshape(3,-1)
+        ref_r = numpy.fft.rfftn(a, axes=(1,2,3)).reshape(3,-1)
+        a = a.reshape(3,-1)
+        engine = pbc_tools.FFT_ENGINE
+        try:
+            for name in tools.available_fft_engines() + ['AUTO']:
+                tools.set_fft_engine(name)
+                v = tools.fft(a, [n,n,n])
+                self.assertAlmostEqual(abs(ref-v).max(), 0, 9)
+                v = tools.ifft(v, [n,n,n])
+                self.assertAlmostEqual(abs(a-v).max(), 0, 9)
+                v = tools.rfft(a, [n,n,n])
+                self.assertAlmostEqual(abs(ref_r-v).max(), 0, 9)
+                v = tools.irfft(v, [n,n,n])
+                self.assertAlmostEqual(abs(a-v).max(), 0, 9)
+        finally:
+            tools.set_fft_engine(engine)
+        self.assertTrue(('fftn', (3,n,n,n), 'd') in pbc_tools._AUTOTUNE_TABLE)
+        self.assertRaises(KeyError, tools.set_fft_engine, 'not-exist')
+
+    def test_half_spectrum(self):
+        cell = pbcgto.Cell()
+        cell.a = numpy.eye(3) * 3.
+        cell.mesh = [7, 8, 6]
+        cell.atom = 'He 0 0 0'
+        cell.build()
+        mesh = cell.mesh
+        rhoR = numpy.random.random((2,numpy.prod(mesh)))
+        coulG = tools.get_coulG(cell)
+        ref = tools.ifft(tools.fft(rhoR, mesh) * coulG, mesh).real
+        vG = tools.rfft(rhoR, mesh) * tools.half_spectrum(coulG, mesh)
+        self.assertAlmostEqual(abs(tools.irfft(vG, mesh) - ref).max(), 0, 9)
+        v = tools.half_spectrum(tools.fft(rhoR[0], mesh), mesh)
+        self.assertAlmostEqual(abs(tools.rfft(rhoR[0], mesh) - v).max(), 0, 9)
+
+        g = rhoR + numpy.random.random(rhoR.shape) * 1j
+        v = tools.irfft(tools.half_spectrum(g, mesh, hermitian_part=True), mesh)
+        self.assertAlmostEqual(abs(tools.ifft(g, mesh).real - v).max(), 0, 12)
+
     def test_mesh_to_cutoff(self):
         a = numpy.array([
             [0.  , 3.37, 3.37],
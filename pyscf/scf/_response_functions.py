@@ -25,6 +25,115 @@ import numpy
 from pyscf import lib
 from pyscf.lib import logger
 from pyscf.scf import hf, rohf, uhf, ghf, dhf
+from pyscf import __config__
+
+# Max number of density matrices in one J/K build of the response function
+RESPONSE_JK_BLKSIZE = getattr(__config__, 'scf_response_jk_blksize', 32)
+# Density matrices whose magnitudes are smaller than this ratio of the largest
+# density matrix in a group are contracted in another group
+RESPONSE_JK_GROUP_RATIO = getattr(__config__, 'scf_response_jk_group_ratio', 1e-2)
+
+def _group_dms_by_magnitude(dm_max, ratio=RESPONSE_JK_GROUP_RATIO,
+                            blksize=RESPONSE_JK_BLKSIZE):
+    '''Partition density matrices into groups in descending order of their
+    magnitudes. The magnitudes in each group are within the given ratio.
+    Density matrices of zero are not included in any group.
+    '''
+    idx = numpy.argsort(-dm_max, kind='stable')
+    groups = []
+    for i in idx[dm_max[idx] > 0]:
+        if (groups and len(groups[-1]) < blksize and
+            dm_max[i] >= dm_max[groups[-1][0]] * ratio):
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    return groups
+
+def _gen_grouped_jk(mf, max_memory=None):
+    '''Generate a function get_jk(mol, dms, hermi, with_j, with_k, omega) for
+    the density matrices of the response function.
+
+    For direct SCF, the integral screening is based on the largest density
+    matrix of the stack. The trial density matrices are grouped by their
+    magnitudes and each group is screened separately, so that the small
+    density matrices of the late iterations of the Davidson or CPHF solvers
+    are contracted with fewer integrals. Large stacks are split into batches
+    to limit the size of the thread-private J/K buffers.
+
+    If the SCF object has the attribute response_sgx (see sgx.sgx_response),
+    the exchange matrices are computed by SGX.
+    '''
+    def _jk(mol, dm, hermi=0, with_j=True, with_k=True, omega=None):
+        if with_j and with_k and omega is None:
+            return mf.get_jk(mol, dm, hermi=hermi)
+        elif with_j:
+            return mf.get_j(mol, dm, hermi=hermi), None
+        else:
+            return None, mf.get_k(mol, dm, hermi, omega)
+
+    if (getattr(mf, 'with_df', None) is not None or
+        getattr(mf, '_eri', None) is not None or mf.mol.incore_anyway):
+        get_jk = _jk
+    else:
+        get_jk = _gen_jk_by_magnitude(mf, _jk, max_memory)
+
+    # Exchange matrices by SGX, see sgx.sgx_response
+    with_sgx = getattr(mf, 'response_sgx', None)
+    if with_sgx is None:
+        return get_jk
+
+    if with_sgx.grids is None:
+        with_sgx.build()
+    get_j = get_jk
+    def get_jk(mol, dm, hermi=0, with_j=True, with_k=True, omega=None):
+        vj = vk = None
+        if with_j:
+            vj = get_j(mol, dm, hermi, True, False)[0]
+        if with_k:
+            vk = with_sgx.get_jk(dm, hermi, None, False, True,
+                                 mf.direct_scf_tol, omega)[1]
+        return vj, vk
+    return get_jk
+
+def _gen_jk_by_magnitude(mf, get_jk, max_memory=None):
+    if max_memory is None:
+        mem_now = lib.current_memory()[0]
+        max_memory = max(2000, mf.max_memory*.8-mem_now)
+    nao = mf.mol.nao
+    # J and K buffers for each thread
+    blksize = int(max_memory*1e6/8 / (nao**2 * 2 * (lib.num_threads()+1)))
+    blksize = max(1, min(blksize, RESPONSE_JK_BLKSIZE))
+
+    def get_jk_grouped(mol, dm, hermi=0, with_j=True, with_k=True, omega=None):
+        dm = numpy.asarray(dm)
+        if dm.ndim == 2:
+            return get_jk(mol, dm, hermi, with_j, with_k, omega)
+        dm_shape = dm.shape
+        dms = dm.reshape(-1,nao,nao)
+        groups = _group_dms_by_magnitude(abs(dms).max(axis=(1,2)),
+                                         blksize=blksize)
+        if len(groups) == 1 and len(groups[0]) == len(dms):
+            return get_jk(mol, dm, hermi, with_j, with_k, omega)
+
+        logger.debug1(mf, 'Response J/K for %d DMs in %d groups %s',
+                      len(dms), len(groups), [len(g) for g in groups])
+        vj = vk = None
+        if with_j:
+            vj = numpy.zeros(dms.shape, dtype=dms.dtype)
+        if with_k:
+            vk = numpy.zeros(dms.shape, dtype=dms.dtype)
+        for idx in groups:
+            vjg, vkg = get_jk(mol, dms[idx], hermi, with_j, with_k, omega)
+            if with_j:
+                vj[idx] = vjg
+            if with_k:
+                vk[idx] = vkg
+        if with_j:
+            vj = vj.reshape(dm_shape)
+        if with_k:
+            vk = vk.reshape(dm_shape)
+        return vj, vk
+    return get_jk_grouped
 
 def _gen_rhf_response(mf, mo_coeff=None, mo_occ=None,
                       singlet=None, hermi=0, max_memory=None):
@@ -71,6 +180,7 @@ def _gen_rhf_response(mf, mo_coeff=None, mo_occ=None,
         if max_memory is None:
             mem_now = lib.current_memory()[0]
             max_memory = max(2000, mf.max_memory*.8-mem_now)
+        get_jk = _gen_grouped_jk(mf, max_memory)
 
         if singlet is None:
             # Without specify singlet, used in ground state orbital hessian
@@ -83,15 +193,15 @@ def _gen_rhf_response(mf, mo_coeff=None, mo_occ=None,
                                        rho0, vxc, fxc, max_memory=max_memory)
                 if hybrid:
                     if hermi != 2:
-                        vj, vk = mf.get_jk(mol, dm1, hermi=hermi)
+                        vj, vk = get_jk(mol, dm1, hermi)
                         vk *= hyb
                         if abs(omega) > 1e-10:  # For range separated Coulomb
-                            vk += mf.get_k(mol, dm1, hermi, omega) * (alpha-hyb)
+                            vk += get_jk(mol, dm1, hermi, False, True, omega)[1] * (alpha-hyb)
                         v1 += vj - .5 * vk
                     else:
-                        v1 -= .5 * hyb * mf.get_k(mol, dm1, hermi=hermi)
+                        v1 -= .5 * hyb * get_jk(mol, dm1, hermi, with_j=False)[1]
                 elif hermi != 2:
-                    v1 += mf.get_j(mol, dm1, hermi=hermi)
+                    v1 += get_jk(mol, dm1, hermi, with_k=False)[0]
                 return v1
 
         elif singlet:
@@ -105,15 +215,15 @@ def _gen_rhf_response(mf, mo_coeff=None, mo_occ=None,
                     v1 *= .5
                 if hybrid:
                     if hermi != 2:
-                        vj, vk = mf.get_jk(mol, dm1, hermi=hermi)
+                        vj, vk = get_jk(mol, dm1, hermi)
                         vk *= hyb
                         if abs(omega) > 1e-10:  # For range separated Coulomb
-                            vk += mf.get_k(mol, dm1, hermi, omega) * (alpha-hyb)
+                            vk += get_jk(mol, dm1, hermi, False, True, omega)[1] * (alpha-hyb)
                         v1 += vj - .5 * vk
                     else:
-                        v1 -= .5 * hyb * mf.get_k(mol, dm1, hermi=hermi)
+                        v1 -= .5 * hyb * get_jk(mol, dm1, hermi, with_j=False)[1]
                 elif hermi != 2:
-                    v1 += mf.get_j(mol, dm1, hermi=hermi)
+                    v1 += get_jk(mol, dm1, hermi, with_k=False)[0]
                 return v1
         else:  # triplet
             def vind(dm1):
@@ -125,21 +235,22 @@ def _gen_rhf_response(mf, mo_coeff=None, mo_occ=None,
                                           rho0, vxc, fxc, max_memory=max_memory)
                     v1 *= .5
                 if hybrid:
-                    vk = mf.get_k(mol, dm1, hermi=hermi)
+                    vk = get_jk(mol, dm1, hermi, with_j=False)[1]
                     vk *= hyb
                     if abs(omega) > 1e-10:  # For range separated Coulomb
-                        vk += mf.get_k(mol, dm1, hermi, omega) * (alpha-hyb)
+                        vk += get_jk(mol, dm1, hermi, False, True, omega)[1] * (alpha-hyb)
                     v1 += -.5 * vk
                 return v1
 
     else:  # HF
+        get_jk = _gen_grouped_jk(mf, max_memory)
         if (singlet is None or singlet) and hermi != 2:
             def vind(dm1):
-                vj, vk = mf.get_jk(mol, dm1, hermi=hermi)
+                vj, vk = get_jk(mol, dm1, hermi)
                 return vj - .5 * vk
         else:
             def vind(dm1):
-                return -.5 * mf.get_k(mol, dm1, hermi=hermi)
+                return -.5 * get_jk(mol, dm1, hermi, with_j=False)[1]
 
     return vind
 
@@ -176,6 +287,7 @@ def _gen_uhf_response(mf, mo_coeff=None, mo_occ=None,
         if max_memory is None:
             mem_now = lib.current_memory()[0]
             max_memory = max(2000, mf.max_memory*.8-mem_now)
+        get_jk = _gen_grouped_jk(mf, max_memory)
 
         def vind(dm1):
             if hermi == 2:
@@ -185,32 +297,34 @@ def _gen_uhf_response(mf, mo_coeff=None, mo_occ=None,
                                    rho0, vxc, fxc, max_memory=max_memory)
             if not hybrid:
                 if with_j:
-                    vj = mf.get_j(mol, dm1, hermi=hermi)
+                    vj = get_jk(mol, dm1, hermi, with_k=False)[0]
                     v1 += vj[0] + vj[1]
             else:
                 if with_j:
-                    vj, vk = mf.get_jk(mol, dm1, hermi=hermi)
+                    vj, vk = get_jk(mol, dm1, hermi)
                     vk *= hyb
                     if omega > 1e-10:  # For range separated Coulomb
-                        vk += mf.get_k(mol, dm1, hermi, omega) * (alpha-hyb)
+                        vk += get_jk(mol, dm1, hermi, False, True, omega)[1] * (alpha-hyb)
                     v1 += vj[0] + vj[1] - vk
                 else:
-                    vk = mf.get_k(mol, dm1, hermi=hermi)
+                    vk = get_jk(mol, dm1, hermi, with_j=False)[1]
                     vk *= hyb
                     if omega > 1e-10:  # For range separated Coulomb
-                        vk += mf.get_k(mol, dm1, hermi, omega) * (alpha-hyb)
+                        vk += get_jk(mol, dm1, hermi, False, True, omega)[1] * (alpha-hyb)
                     v1 -= vk
             return v1
 
     elif with_j:
+        get_jk = _gen_grouped_jk(mf, max_memory)
         def vind(dm1):
-            vj, vk = mf.get_jk(mol, dm1, hermi=hermi)
+            vj, vk = get_jk(mol, dm1, hermi)
             v1 = vj[0] + vj[1] - vk
             return v1
 
     else:
+        get_jk = _gen_grouped_jk(mf, max_memory)
         def vind(dm1):
-            return -mf.get_k(mol, dm1, hermi=hermi)
+            return -get_jk(mol, dm1, hermi, with_j=False)[1]
 
     return vind
 
@@ -20,11 +20,37 @@ import numpy
 from pyscf import lib
 from pyscf import gto
 from pyscf.gto.moleintor import make_cintopt, make_loc, ascint3
+from pyscf.lib import cache
+from pyscf import __config__
+
+# Directory for the persistent cache of the integral screening tables (q_cond).
+# The cache is disabled if the directory is not specified.
+SCREENING_CACHE_DIR = getattr(__config__, 'scf_vhf_screening_cache_dir', None)
+# Upper bound (in MB) of the size of the screening cache
+SCREENING_CACHE_SIZE = getattr(__config__, 'scf_vhf_screening_cache_size', 2000)
+
+# The q_cond tables generated by these functions have the shape (nbas,nbas)
+_CACHEABLE_QCOND = ('CVHFsetnr_direct_scf',)
 
 libcvhf = lib.load_library('libcvhf')
 def _fpointer(name):
     return ctypes.c_void_p(_ctypes.dlsym(libcvhf._handle, name))
 
+_screening_cache = None
+def get_screening_cache():
+    '''The lib.cache.DiskCache object for the integral screening tables.
+    None is returned if SCREENING_CACHE_DIR is not set.
+    '''
+    global _screening_cache
+    if not SCREENING_CACHE_DIR:
+        return None
+    if (_screening_cache is None or
+        _screening_cache.cachedir != SCREENING_CACHE_DIR):
+        _screening_cache = cache.DiskCache(SCREENING_CACHE_DIR,
+                                           SCREENING_CACHE_SIZE)
+    _screening_cache.max_size = SCREENING_CACHE_SIZE
+    return _screening_cache
+
 class VHFOpt(object):
     def __init__(self, mol, intor=None,
                  prescreen='CVHFnoscreen', qcondname=None, dmcondname=None):
@@ -65,6 +91,18 @@ class VHFOpt(object):
             cintopt = self._cintopt
         else:
             cintopt = lib.c_null_ptr()
+        screening_cache = key = None
+        if qcondname in _CACHEABLE_QCOND:
+            screening_cache = get_screening_cache()
+        if screening_cache is not None:
+            key = cache.hash_key(intor, qcondname, mol._atm, mol._bas, mol._env)
+            q_cond = screening_cache.get(key)
+            if q_cond is not None and q_cond.size == mol.nbas**2:
+                libcvhf.CVHFset_q_cond(self._this,
+                                       q_cond.ctypes.data_as(ctypes.c_void_p),
+                                       ctypes.c_int(q_cond.size))
+                return
+
         ao_loc = make_loc(mol._bas, intor)
         if isinstance(qcondname, ctypes._CFuncPtr):
             fsetqcond = qcondname
@@ -78,6 +116,9 @@ class VHFOpt(object):
                   mol._bas.ctypes.data_as(ctypes.c_void_p), nbas,
                   mol._env.ctypes.data_as(ctypes.c_void_p))
 
+        if key is not None:
+            screening_cache.set(key, self.get_q_cond())
+
     @property
     def direct_scf_tol(self):
         return self._this.contents.direct_scf_cutoff
@@ -148,6 +189,36 @@ class VHFOpt(object):
         return numpy.ctypeslib.as_array(data, shape=shape)
     dm_cond = property(get_dm_cond)
 
+    def count_significant_quartets(self):
+        '''Estimate the number of unique shell quartets (ij|kl) which pass the
+        Schwarz inequality screening q_cond[i,j]*q_cond[k,l]*max(dm_cond) >
+        direct_scf_tol. This is an upper bound of the number of quartets
+        evaluated by the direct SCF prescreen function.
+
+        Returns:
+            nkept, ntotal
+        '''
+        if not self._this.contents.q_cond or not self._this.contents.dm_cond:
+            return 0, 0
+        nbas = self._this.contents.nbas
+        q_tril = lib.pack_tril(self.get_q_cond((nbas, nbas)))
+        npair = q_tril.size
+        # The factor 4 is associated to the Coulomb prescreen condition. The
+        # prescreen function requires q[ij]*q[kl] > direct_scf_tol as well.
+        dmax = min(self.get_dm_cond((nbas, nbas)).max() * 4, 1.)
+        if dmax == 0:
+            return 0, npair * (npair+1) // 2
+        q_sorted = numpy.sort(q_tril)
+        thresh = self.direct_scf_tol / dmax
+        with numpy.errstate(divide='ignore'):
+            q_thresh = thresh / q_sorted
+        # For each ij, count the kl (kl <= ij in sorted order) with
+        # q[kl] > direct_scf_tol / (dmax * q[ij])
+        idx = numpy.searchsorted(q_sorted, q_thresh, side='right')
+        nkl = numpy.arange(1, npair+1) - idx
+        nkept = nkl[nkl > 0].sum()
+        return int(nkept), npair * (npair+1) // 2
+
 
 class SGXOpt(VHFOpt):
     def __init__(self, mol, intor=None,
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Batched SCF driver for many independent small molecules
+
+The RHF/RKS problems of all molecules are stepped through the SCF iterations
+together. Molecules of the same number of AOs are grouped. For each group,
+the generalized eigenvalue problems are solved with stacked eigh and the DIIS
+extrapolation is carried out for all molecules in one set of array
+operations. The two-electron integrals and the Fock matrices of different
+molecules are evaluated concurrently in a thread pool. Each worker thread
+runs the C libraries with one OpenMP thread.
+
+Examples:
+
+>>> from pyscf import gto, scf
+>>> from pyscf.scf import batch
+>>> mols = gto.mole.build_batch(geoms, basis='6-31g')
+>>> e_tot = batch.BatchSCF([scf.RHF(mol) for mol in mols]).kernel()
+'''
+
+import numpy
+from pyscf import lib
+from pyscf.lib import logger
+from pyscf.scf import hf
+from pyscf.scf import rohf
+from pyscf import __config__
+
+MAX_WORKERS = getattr(__config__, 'scf_batch_max_workers', None)
+# Orthogonalize the AO basis with this threshold of the overlap eigenvalues
+LINEAR_DEP_THRESHOLD = getattr(__config__, 'scf_batch_lindep', 1e-8)
+
+
+def _map(batch, fn, args):
+    '''Evaluate fn for each item of args in the thread pool'''
+    executor = batch._executor
+    if executor is None:
+        return [fn(*x) for x in args]
+    return list(executor.map(lambda x: fn(*x), args))
+
+def _precompute_eri(mf):
+    mol = mf.mol
+    if (mf._eri is None and getattr(mf, 'with_df', None) is None and
+            (mf._is_mem_enough() or mol.incore_anyway)):
+        mf._eri = mol.intor('int2e', aosym='s8')
+    return mf._eri
+
+def _orth_basis(s1e):
+    '''Symmetric orthogonalization for a stack of overlap matrices'''
+    e, u = numpy.linalg.eigh(s1e)
+    if e.min() < LINEAR_DEP_THRESHOLD:
+        return None
+    return numpy.einsum('mpi,mi,mqi->mpq', u, e**-.5, u)
+
+def _diis_extrapolate(focks, errs):
+    '''Batched DIIS. focks and errs have the shape (nmol, nvec, nao, nao).'''
+    nmol, nvec = errs.shape[:2]
+    h = numpy.zeros((nmol, nvec+1, nvec+1))
+    h[:,0,1:] = h[:,1:,0] = 1
+    h[:,1:,1:] = numpy.einsum('mipq,mjpq->mij', errs, errs)
+    g = numpy.zeros((nmol, nvec+1))
+    g[:,0] = 1
+    w, v = numpy.linalg.eigh(h)
+    mask = abs(w) > 1e-14
+    w_inv = numpy.zeros_like(w)
+    w_inv[mask] = 1. / w[mask]
+    c = numpy.einsum('mij,mj,mkj,mk->mi', v, w_inv, v, g)
+    return numpy.einsum('mi,mipq->mpq', c[:,1:], focks)
+
+def kernel(batch, dm0=None):
+    '''Run the SCF iterations for all SCF objects in batch.mfs
+
+    Kwargs:
+        dm0 : list of ndarray
+            Initial guess density matrix of each molecule
+
+    Returns:
+        A list of the SCF energies
+    '''
+    cput0 = (logger.process_clock(), logger.perf_counter())
+    log = logger.new_logger(batch)
+    mfs = batch.mfs
+    nmol = len(mfs)
+    conv_tol = batch.conv_tol
+    conv_tol_grad = batch.conv_tol_grad
+    if conv_tol_grad is None:
+        conv_tol_grad = numpy.sqrt(conv_tol)
+        log.info('Set gradient conv threshold to %g', conv_tol_grad)
+
+    _map(batch, _precompute_eri, [(mf,) for mf in mfs])
+    cput1 = log.timer('2e integrals', *cput0)
+
+    if dm0 is None:
+        dm0 = [mf.get_init_guess(mf.mol, mf.init_guess) for mf in mfs]
+    dms = list(dm0)
+    h1e = [mf.get_hcore(mf.mol) for mf in mfs]
+    s1e = [mf.get_ovlp(mf.mol) for mf in mfs]
+    vhf = _map(batch, lambda mf, dm: mf.get_veff(mf.mol, dm),
+               list(zip(mfs, dms)))
+    e_tot = [mf.energy_tot(dm, h, v) for mf, dm, h, v in zip(mfs, dms, h1e, vhf)]
+
+    # Group the molecules by the number of AOs. For each group, members are
+    # the molecules not yet converged, orth are their orthogonal bases, and
+    # fock_hist, err_hist are their DIIS vectors.
+    groups = {}
+    for i, s in enumerate(s1e):
+        groups.setdefault(s.shape[0], []).append(i)
+    members = [numpy.array(idx) for idx in groups.values()]
+    orth = [_orth_basis(numpy.asarray([s1e[i] for i in idx])) for idx in members]
+    for idx, x in zip(members, orth):
+        if x is None:
+            log.warn('Linear dependency found in the basis of molecules %s. '
+                     'mf.eig is used for these molecules', idx)
+    log.debug('%d molecules in %d groups', nmol, len(members))
+    fock_hist = [[] for idx in members]
+    err_hist = [[] for idx in members]
+
+    mo_energy = [None] * nmol
+    mo_coeff = [None] * nmol
+    mo_occ = [None] * nmol
+    converged = numpy.zeros(nmol, dtype=bool)
+    cycles = numpy.zeros(nmol, dtype=int)
+
+    for cycle in range(batch.max_cycle):
+        active = numpy.where(~converged)[0]
+        if active.size == 0:
+            break
+        cycles[active] = cycle + 1
+
+        for ig in range(len(members)):
+            mask = ~converged[members[ig]]
+            if not mask.all():
+                members[ig] = members[ig][mask]
+                if orth[ig] is not None:
+                    orth[ig] = orth[ig][mask]
+                fock_hist[ig] = [x[mask] for x in fock_hist[ig]]
+                err_hist[ig] = [x[mask] for x in err_hist[ig]]
+            idx = members[ig]
+            if idx.size == 0:
+                continue
+
+            f = numpy.asarray([h1e[i] + vhf[i] for i in idx])
+            x = orth[ig]
+            if x is None:
+                for k, i in enumerate(idx):
+                    mo_energy[i], mo_coeff[i] = mfs[i].eig(f[k], s1e[i])
+                continue
+
+            if batch.diis:
+                s = numpy.asarray([s1e[i] for i in idx])
+                d = numpy.asarray([dms[i] for i in idx])
+                fds = numpy.matmul(numpy.matmul(f, d), s)
+                fock_hist[ig] = (fock_hist[ig] + [f])[-batch.diis_space:]
+                err_hist[ig] = (err_hist[ig] + [fds - fds.transpose(0,2,1)])[-batch.diis_space:]
+                if cycle >= batch.diis_start_cycle:
+                    f = _diis_extrapolate(numpy.stack(fock_hist[ig], axis=1),
+                                          numpy.stack(err_hist[ig], axis=1))
+
+            e, c = numpy.linalg.eigh(numpy.matmul(x.transpose(0,2,1), numpy.matmul(f, x)))
+            c = numpy.matmul(x, c)
+            for k, i in enumerate(idx):
+                mo_energy[i], mo_coeff[i] = e[k], c[k]
+
+        dm_last = dms
+        dms = list(dms)
+        for i in active:
+            mo_occ[i] = mfs[i].get_occ(mo_energy[i], mo_coeff[i])
+            dms[i] = mfs[i].make_rdm1(mo_coeff[i], mo_occ[i])
+
+        vhf_active = _map(batch, lambda i: mfs[i].get_veff(
+            mfs[i].mol, dms[i], dm_last[i], vhf[i]), [(i,) for i in active])
+        for i, v in zip(active, vhf_active):
+            mf = mfs[i]
+            vhf[i] = v
+            last_e = e_tot[i]
+            e_tot[i] = mf.energy_tot(dms[i], h1e[i], v)
+            fock = mf.get_fock(h1e[i], s1e[i], v, dms[i])
+            norm_gorb = numpy.linalg.norm(mf.get_grad(mo_coeff[i], mo_occ[i], fock))
+            if not hf.TIGHT_GRAD_CONV_TOL:
+                norm_gorb = norm_gorb / numpy.sqrt(norm_gorb.size)
+            if abs(e_tot[i] - last_e) < conv_tol and norm_gorb < conv_tol_grad:
+                converged[i] = True
+        log.info('cycle= %d  active molecules %d  converged %d',
+                 cycle+1, active.size, numpy.count_nonzero(converged))
+        cput1 = log.timer('cycle= %d' % (cycle+1), *cput1)
+
+    for i, mf in enumerate(mfs):
+        mf.converged = bool(converged[i])
+        mf.cycles = int(cycles[i])
+        mf.e_tot = e_tot[i]
+        mf.mo_energy = mo_energy[i]
+        mf.mo_coeff = mo_coeff[i]
+        mf.mo_occ = mo_occ[i]
+        mf._finalize()
+    log.note('%d of %d molecules converged in %d cycles',
+             numpy.count_nonzero(converged), nmol, cycles.max(initial=0))
+    log.timer('batch SCF', *cput0)
+    return e_tot
+
+
+class BatchSCF(lib.StreamObject):
+    '''Batched SCF driver for a list of RHF/RKS objects of small molecules
+
+    Attributes:
+        mfs : list
+            RHF or RKS objects. The SCF results (e_tot, mo_coeff, ...) are
+            stored in these objects.
+        conv_tol, conv_tol_grad, max_cycle, diis, diis_space, diis_start_cycle :
+            The same to the attributes of :class:`hf.SCF`. The default values
+            are taken from the first SCF object.
+        max_workers : int
+            Number of threads to evaluate the integrals and Fock matrices of
+            different molecules concurrently. Default is lib.num_threads().
+
+    Saved results:
+        e_tot : list
+            SCF energy of each molecule
+        converged : ndarray of bool
+    '''
+    def __init__(self, mfs):
+        mfs = list(mfs)
+        for mf in mfs:
+            if not isinstance(mf, hf.RHF) or isinstance(mf, rohf.ROHF):
+                raise NotImplementedError('Batched SCF for %s' % mf.__class__)
+        mf0 = mfs[0]
+        self.mfs = mfs
+        self.verbose = mf0.verbose
+        self.stdout = mf0.stdout
+        self.conv_tol = mf0.conv_tol
+        self.conv_tol_grad = mf0.conv_tol_grad
+        self.max_cycle = mf0.max_cycle
+        self.diis = bool(mf0.diis)
+        self.diis_space = mf0.diis_space
+        self.diis_start_cycle = mf0.diis_start_cycle
+        self.max_workers = MAX_WORKERS
+
+        self.e_tot = None
+        self.converged = None
+        self._executor = None
+        self._keys = set(self.__dict__.keys())
+
+    def dump_flags(self, verbose=None):
+        log = logger.new_logger(self, verbose)
+        log.info('\n')
+        log.info('******** %s ********', self.__class__)
+        log.info('Number of molecules = %d', len(self.mfs))
+        log.info('conv_tol = %g', self.conv_tol)
+        log.info('conv_tol_grad = %s', self.conv_tol_grad)
+        log.info('max_cycle = %d', self.max_cycle)
+        log.info('DIIS = %s, diis_space = %d, diis_start_cycle = %d',
+                 self.diis, self.diis_space, self.diis_start_cycle)
+        log.info('max_workers = %s', self.max_workers)
+        return self
+
+    def kernel(self, dm0=None):
+        self.dump_flags()
+        max_workers = self.max_workers
+        if max_workers is None:
+            max_workers = lib.num_threads()
+        if max_workers > 1 and len(self.mfs) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            # OpenMP threads are set per thread. Each worker evaluates the
+            # integrals of one molecule with one OpenMP thread.
+            with ThreadPoolExecutor(max_workers, initializer=lib.num_threads,
+                                    initargs=(1,)) as executor:
+                self._executor = executor
+                try:
+                    self.e_tot = kernel(self, dm0)
+                finally:
+                    self._executor = None
+        else:
+            self.e_tot = kernel(self, dm0)
+        self.converged = numpy.array([mf.converged for mf in self.mfs])
+        return self.e_tot
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Extrapolation of the initial guess for a sequence of SCF calculations along a
+trajectory (PES scan, geometry optimization, molecular dynamics)
+
+ASPC:
+    The predictor of the always stable predictor-corrector method. The
+    density matrices of the last k+2 steps are extrapolated.
+    Ref: J. Kolafa, J. Comput. Chem. 25, 335 (2004)
+
+Grassmann:
+    The occupied orbitals (in the Lowdin orthogonalized AO basis) of the last
+    steps are mapped to the tangent space of the Grassmann manifold at the
+    last step. They are extrapolated in the tangent space and mapped back to
+    the manifold.
+    Ref: E. Polack, G. Dusson, B. Stamm, F. Lipparini, J. Chem. Theory
+    Comput. 17, 6965 (2021)
+
+Examples:
+
+>>> from pyscf.scf import guess_extrapolation
+>>> extrap = guess_extrapolation.Grassmann(order=3)
+>>> for geom in trajectory:
+...     mol = mol.set_geom_(geom)
+...     mf.reset(mol)
+...     mf.kernel(dm0=extrap.extrapolate(mf, mol))
+...     extrap.update(mf)
+'''
+
+import numpy
+import scipy.linalg
+from scipy.special import comb
+from pyscf.lib import logger
+from pyscf import __config__
+
+ORDER = getattr(__config__, 'scf_guess_extrapolation_order', 3)
+
+
+def aspc_coeffs(k):
+    '''Coefficients of the ASPC predictor of order k for the density matrices
+    of the last k+2 steps (from the latest to the earliest)'''
+    j = numpy.arange(1, k+3)
+    return (-1)**(j+1) * j * comb(2*k+4, k+2-j) / comb(2*k+2, k+1)
+
+def polynomial_coeffs(n):
+    '''Coefficients to extrapolate a polynomial of degree n-1 from n equally
+    spaced points (from the latest to the earliest)'''
+    j = numpy.arange(1, n+1)
+    return (-1)**(j+1) * comb(n, j)
+
+
+class _Extrapolation(object):
+    '''Base class of the guess extrapolation methods'''
+    def __init__(self, order=ORDER):
+        self.order = order
+        self.history = []
+        self._signature = None
+
+    @property
+    def nhistory(self):
+        '''Max number of steps kept in history'''
+        return self.order + 2
+
+    def reset(self):
+        self.history = []
+        self._signature = None
+        return self
+
+    def _check_system(self, mol):
+        '''Clear the history if the system is changed'''
+        signature = (mol.natm, mol.ao_loc.tobytes(),
+                     mol.atom_charges().tobytes())
+        if signature != self._signature:
+            self.history = []
+            self._signature = signature
+
+    def update(self, mf):
+        '''Record the results of the SCF object of the current step'''
+        self._check_system(mf.mol)
+        self.history.append(self._record(mf))
+        if len(self.history) > self.nhistory:
+            self.history.pop(0)
+        return self
+
+    def extrapolate(self, mf, mol=None):
+        '''Initial guess density matrix for mol. None is returned if the
+        history is empty or the system is changed'''
+        if mol is None: mol = mf.mol
+        self._check_system(mol)
+        if not self.history:
+            return None
+        return self._extrapolate(mf, mol)
+
+    def _record(self, mf):
+        raise NotImplementedError
+
+    def _extrapolate(self, mf, mol):
+        raise NotImplementedError
+
+
+class ASPC(_Extrapolation):
+    '''Density matrix extrapolation with the ASPC predictor'''
+    def _record(self, mf):
+        return numpy.asarray(mf.make_rdm1())
+
+    def _extrapolate(self, mf, mol):
+        dms = self.history[::-1]
+        k = min(self.order, len(dms) - 2)
+        if k < 0:
+            return dms[0]
+        coeffs = aspc_coeffs(k)
+        logger.debug(mf, 'ASPC extrapolation with %d steps', k+2)
+        dm = 0
+        for c, dm_j in zip(coeffs, dms):
+            dm = dm + c * dm_j
+        return dm
+
+
+def _occupied_orbitals(mf):
+    '''Occupied orbitals and their occupation of each spin channel'''
+    mo_coeff = mf.mo_coeff
+    mo_occ = numpy.asarray(mf.mo_occ)
+    if mo_occ.ndim == 1:
+        mo_coeff = [mo_coeff]
+        mo_occ = [mo_occ]
+    orbs = []
+    for c, occ in zip(mo_coeff, mo_occ):
+        occidx = occ > 0
+        nocc = occ[occidx]
+        if nocc.size > 0 and abs(nocc - nocc[0]).max() > 1e-12:
+            raise NotImplementedError('Grassmann extrapolation for '
+                                      'non-uniform occupations')
+        orbs.append((c[:,occidx], nocc[0] if nocc.size > 0 else 0))
+    return orbs
+
+def _sqrt_ovlp(s):
+    e, u = scipy.linalg.eigh(s)
+    s_half = (u * e**.5).dot(u.conj().T)
+    s_inv_half = (u * e**-.5).dot(u.conj().T)
+    return s_half, s_inv_half
+
+def grassmann_log(y0, y):
+    '''Map the orthonormal orbitals y to the tangent space at y0'''
+    m = y0.conj().T.dot(y)
+    l = (y - y0.dot(m)).dot(numpy.linalg.inv(m))
+    u, s, vh = scipy.linalg.svd(l, full_matrices=False)
+    return (u * numpy.arctan(s)).dot(vh)
+
+def grassmann_exp(y0, gamma):
+    '''Map the tangent vector gamma at y0 to the manifold'''
+    u, s, vh = scipy.linalg.svd(gamma, full_matrices=False)
+    y = (y0.dot(vh.conj().T) * numpy.cos(s)).dot(vh) + (u * numpy.sin(s)).dot(vh)
+    # Remove the numerical noise of orthonormality
+    return scipy.linalg.qr(y, mode='economic')[0]
+
+class Grassmann(_Extrapolation):
+    '''Occupied orbitals extrapolation on the Grassmann manifold'''
+    @property
+    def nhistory(self):
+        return self.order + 1
+
+    def _record(self, mf):
+        s_half = _sqrt_ovlp(mf.get_ovlp())[0]
+        return [(s_half.dot(c), occ) for c, occ in _occupied_orbitals(mf)]
+
+    def _extrapolate(self, mf, mol):
+        steps = self.history[::-1]
+        coeffs = polynomial_coeffs(len(steps))
+        logger.debug(mf, 'Grassmann extrapolation with %d steps', len(steps))
+        s_inv_half = _sqrt_ovlp(mf.get_ovlp(mol))[1]
+        dms = []
+        for spin, (y0, occ) in enumerate(steps[0]):
+            gamma = 0
+            for c, step in zip(coeffs[1:], steps[1:]):
+                gamma = gamma + c * grassmann_log(y0, step[spin][0])
+            if y0.shape[1] > 0 and not isinstance(gamma, int):
+                y = grassmann_exp(y0, gamma)
+            else:
+                y = y0
+            mo = s_inv_half.dot(y)
+            dms.append((mo * occ).dot(mo.conj().T))
+        if len(dms) == 1:
+            return dms[0]
+        return numpy.asarray(dms)
+
+
+def new_extrapolation(method, order=ORDER):
+    '''Create the guess extrapolation object for method 'aspc' or 'grassmann'.
+    None is returned if method is None.'''
+    if method is None or isinstance(method, _Extrapolation):
+        return method
+    method = method.upper()
+    if method == 'ASPC':
+        return ASPC(order)
+    elif method == 'GRASSMANN':
+        return Grassmann(order)
+    else:
+        raise KeyError('Unknown guess extrapolation method %s' % method)
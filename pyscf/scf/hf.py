@@ -42,6 +42,7 @@ PRE_ORTH_METHOD = getattr(__config__, 'scf_analyze_pre_orth_method', 'ANO')
 MO_BASE = getattr(__config__, 'MO_BASE', 1)
 TIGHT_GRAD_CONV_TOL = getattr(__config__, 'scf_hf_kernel_tight_grad_conv_tol', True)
 MUTE_CHKFILE = getattr(__config__, 'scf_hf_SCF_mute_chkfile', False)
+SCANNER_GUESS_EXTRAPOLATION = getattr(__config__, 'scf_hf_SCF_scanner_guess_extrapolation', None)
 
 # For code compatibility in python-2 and python-3
 if sys.version_info >= (3,):
@@ -144,6 +145,7 @@ Keyword argument "init_dm" is replaced by "dm0"''')
         fock = mf.get_fock(h1e, s1e, vhf, dm)  # = h1e + vhf, no DIIS
         mo_energy, mo_coeff = mf.eig(fock, s1e)
         mo_occ = mf.get_occ(mo_energy, mo_coeff)
+        mf.cycles = 0
         return scf_conv, e_tot, mo_energy, mo_coeff, mo_occ
 
     if isinstance(mf.diis, lib.diis.DIIS):
@@ -171,6 +173,10 @@ Keyword argument "init_dm" is replaced by "dm0"''')
     mf.pre_kernel(locals())
 
     cput1 = logger.timer(mf, 'initialize scf', *cput0)
+    # Number of incremental (difference density) Fock builds since the last
+    # full build. The initial vhf is built from the full density matrix.
+    n_incremental = 0
+    norm_ddm = None
     for cycle in range(mf.max_cycle):
         dm_last = dm
         last_hf_e = e_tot
@@ -181,7 +187,15 @@ Keyword argument "init_dm" is replaced by "dm0"''')
         dm = mf.make_rdm1(mo_coeff, mo_occ)
         # attach mo_coeff and mo_occ to dm to improve DFT get_veff efficiency
         dm = lib.tag_array(dm, mo_coeff=mo_coeff, mo_occ=mo_occ)
-        vhf = mf.get_veff(mol, dm, dm_last, vhf)
+        norm_ddm_last, norm_ddm = norm_ddm, numpy.linalg.norm(dm-dm_last)
+        if _need_full_fock_rebuild(mf, n_incremental, norm_ddm, norm_ddm_last):
+            logger.debug(mf, 'cycle= %d rebuild Fock matrix from the full '
+                         'density matrix', cycle+1)
+            vhf = mf.get_veff(mol, dm)
+            n_incremental = 0
+        else:
+            vhf = mf.get_veff(mol, dm, dm_last, vhf)
+            n_incremental += 1
         e_tot = mf.energy_tot(dm, h1e, vhf)
 
         # Here Fock matrix is h1e + vhf, without DIIS.  Calling get_fock
@@ -191,7 +205,6 @@ Keyword argument "init_dm" is replaced by "dm0"''')
         norm_gorb = numpy.linalg.norm(mf.get_grad(mo_coeff, mo_occ, fock))
         if not TIGHT_GRAD_CONV_TOL:
             norm_gorb = norm_gorb / numpy.sqrt(norm_gorb.size)
-        norm_ddm = numpy.linalg.norm(dm-dm_last)
         logger.info(mf, 'cycle= %d E= %.15g  delta_E= %4.3g  |g|= %4.3g  |ddm|= %4.3g',
                     cycle+1, e_tot, e_tot-last_hf_e, norm_gorb, norm_ddm)
 
@@ -211,6 +224,8 @@ Keyword argument "init_dm" is replaced by "dm0"''')
         if scf_conv:
             break
 
+    mf.cycles = cycle + 1
+
     if scf_conv and conv_check:
         # An extra diagonalization, to remove level shift
         #fock = mf.get_fock(h1e, s1e, vhf, dm)  # = h1e + vhf
@@ -244,6 +259,30 @@ Keyword argument "init_dm" is replaced by "dm0"''')
     return scf_conv, e_tot, mo_energy, mo_coeff, mo_occ
 
 
+def _need_full_fock_rebuild(mf, n_incremental, norm_ddm, norm_ddm_last=None):
+    '''Whether the next Fock build should use the full density matrix rather
+    than the density difference dm-dm_last.
+
+    In direct SCF, get_veff contracts the integrals with the density
+    difference only. The numerical errors (due to integral screening)
+    accumulate in vhf over the iterations. A full build is carried out every
+    :attr:`direct_scf_rebuild_nsteps` incremental builds, or when the norm of
+    the density difference increases by more than a factor of
+    :attr:`direct_scf_rebuild_ddm_ratio` compared to the previous cycle.
+    '''
+    if not mf.direct_scf or getattr(mf, '_eri', None) is not None:
+        # Incremental build is not used by get_veff in these cases
+        return False
+    nsteps = getattr(mf, 'direct_scf_rebuild_nsteps', 0)
+    if nsteps > 0 and n_incremental >= nsteps:
+        return True
+    ratio = getattr(mf, 'direct_scf_rebuild_ddm_ratio', 0)
+    if (ratio > 0 and norm_ddm_last is not None and
+        norm_ddm > norm_ddm_last * ratio):
+        return True
+    return False
+
+
 def energy_elec(mf, dm=None, h1e=None, vhf=None):
     r'''Electronic part of Hartree-Fock energy, for given core hamiltonian and
     HF potential
@@ -1279,6 +1318,21 @@ def unpack_uniq_var(dx, mo_occ):
     return x1 - x1.conj().T
 
 
+def _scanner_set_geom(mol, geom):
+    '''Update the geometry for scanner. If only the coordinates of the atoms
+    are changed, the basis and the environment (normalized basis contraction
+    coefficients, ECP etc) of mol are reused without calling mol.build.
+    '''
+    if (isinstance(geom, (str, list, tuple)) and not mol.symmetry and
+        isinstance(mol.unit, str)):
+        atoms = mol.format_atom(geom, unit=mol.unit)
+        if [a[0] for a in atoms] == [a[0] for a in mol._atom]:
+            coords = numpy.array([a[1] for a in atoms])
+            if not gto.mole.is_au(mol.unit):
+                coords *= nist.BOHR
+            return mol.set_geom_(coords, inplace=False)
+    return mol.set_geom_(geom, inplace=False)
+
 def as_scanner(mf):
     '''Generating a scanner/solver for HF PES.
 
@@ -1293,6 +1347,11 @@ def as_scanner(mf):
     Note scanner has side effects.  It may change many underlying objects
     (_scf, with_df, with_x2c, ...) during calculation.
 
+    If the attribute guess_extrapolation of the scanner is set to 'aspc' or
+    'grassmann' (or an object of scf.guess_extrapolation), the initial guess
+    is extrapolated from the results of the previous geometries. The wall
+    time of each call is stored in the attribute scanner_timings.
+
     Examples:
 
     >>> from pyscf import gto, scf
@@ -1311,20 +1370,33 @@ def as_scanner(mf):
         def __init__(self, mf_obj):
             self.__dict__.update(mf_obj.__dict__)
             self._last_mol_fp = mf.mol.ao_loc
+            # Extrapolation of the initial guess from the previous geometries
+            # ('aspc' or 'grassmann'), see module scf.guess_extrapolation
+            self.add_keys(guess_extrapolation=SCANNER_GUESS_EXTRAPOLATION,
+                          scanner_timings=None)
 
         def __call__(self, mol_or_geom, **kwargs):
+            from pyscf.scf import guess_extrapolation
+            t0 = logger.perf_counter()
             if isinstance(mol_or_geom, gto.Mole):
                 mol = mol_or_geom
             else:
-                mol = self.mol.set_geom_(mol_or_geom, inplace=False)
+                mol = _scanner_set_geom(self.mol, mol_or_geom)
 
             # Cleanup intermediates associated to the pervious mol object
             self.reset(mol)
+            t1 = logger.perf_counter()
 
+            self.guess_extrapolation = extrap = guess_extrapolation.new_extrapolation(
+                self.guess_extrapolation)
             if 'dm0' in kwargs:
                 dm0 = kwargs.pop('dm0')
             elif self.mo_coeff is None:
                 dm0 = None
+            elif extrap is not None and extrap.history:
+                dm0 = extrap.extrapolate(self, mol)
+                if dm0 is None and numpy.array_equal(self._last_mol_fp, mol.ao_loc):
+                    dm0 = self.make_rdm1()
             elif self.chkfile and h5py.is_hdf5(self.chkfile):
                 dm0 = self.from_chk(self.chkfile)
             else:
@@ -1339,8 +1411,16 @@ def as_scanner(mf):
                 if numpy.array_equal(self._last_mol_fp, mol.ao_loc):
                     dm0 = self.make_rdm1()
             self.mo_coeff = None  # To avoid last mo_coeff being used by SOSCF
+            t2 = logger.perf_counter()
             e_tot = self.kernel(dm0=dm0, **kwargs)
             self._last_mol_fp = mol.ao_loc
+            if extrap is not None:
+                extrap.update(self)
+            t3 = logger.perf_counter()
+            self.scanner_timings = {'setup': t1 - t0, 'guess': t2 - t1,
+                                    'scf': t3 - t2}
+            logger.info(self, 'Scanner wall time: setup %.3f s  guess %.3f s  '
+                        'SCF %.3f s', t1 - t0, t2 - t1, t3 - t2)
             return e_tot
 
     return SCF_Scanner(mf)
@@ -1394,6 +1474,15 @@ class SCF(lib.StreamObject):
             Direct SCF is used by default.
         direct_scf_tol : float
             Direct SCF cutoff threshold.  Default is 1e-13.
+        direct_scf_rebuild_nsteps : int
+            In direct SCF, the Fock matrix is updated incrementally with the
+            density difference between two iterations. The Fock matrix is
+            rebuilt from the full density matrix after this number of
+            incremental updates. Default is 0, which means never to rebuild.
+        direct_scf_rebuild_ddm_ratio : float
+            Rebuild the Fock matrix from the full density matrix when the norm
+            of the density difference grows by more than this factor compared
+            to the previous iteration. Default is 0 (disabled).
         callback : function(envs_dict) => None
             callback function takes one dict as the argument which is
             generated by the builtin function :func:`locals`, so that the
@@ -1445,6 +1534,8 @@ class SCF(lib.StreamObject):
     level_shift = getattr(__config__, 'scf_hf_SCF_level_shift', 0)
     direct_scf = getattr(__config__, 'scf_hf_SCF_direct_scf', True)
     direct_scf_tol = getattr(__config__, 'scf_hf_SCF_direct_scf_tol', 1e-13)
+    direct_scf_rebuild_nsteps = getattr(__config__, 'scf_hf_SCF_direct_scf_rebuild_nsteps', 0)
+    direct_scf_rebuild_ddm_ratio = getattr(__config__, 'scf_hf_SCF_direct_scf_rebuild_ddm_ratio', 0)
     conv_check = getattr(__config__, 'scf_hf_SCF_conv_check', True)
 
     def __init__(self, mol):
@@ -1473,6 +1564,7 @@ class SCF(lib.StreamObject):
         self.mo_occ = None
         self.e_tot = 0
         self.converged = False
+        self.cycles = 0
         self.callback = None
         self.scf_summary = {}
 
@@ -1482,7 +1574,8 @@ class SCF(lib.StreamObject):
         keys = set(('conv_tol', 'conv_tol_grad', 'max_cycle', 'init_guess',
                     'DIIS', 'diis', 'diis_space', 'diis_start_cycle',
                     'diis_file', 'diis_space_rollback', 'damp', 'level_shift',
-                    'direct_scf', 'direct_scf_tol', 'conv_check'))
+                    'direct_scf', 'direct_scf_tol', 'direct_scf_rebuild_nsteps',
+                    'direct_scf_rebuild_ddm_ratio', 'conv_check'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     def build(self, mol=None):
@@ -1518,6 +1611,12 @@ class SCF(lib.StreamObject):
         log.info('direct_scf = %s', self.direct_scf)
         if self.direct_scf:
             log.info('direct_scf_tol = %g', self.direct_scf_tol)
+            if self.direct_scf_rebuild_nsteps > 0:
+                log.info('direct_scf_rebuild_nsteps = %d',
+                         self.direct_scf_rebuild_nsteps)
+            if self.direct_scf_rebuild_ddm_ratio > 0:
+                log.info('direct_scf_rebuild_ddm_ratio = %g',
+                         self.direct_scf_rebuild_ddm_ratio)
         if self.chkfile:
             log.info('chkfile to save SCF result = %s', self.chkfile)
         log.info('max_memory %d MB (current use %d MB)',
@@ -1748,6 +1847,11 @@ class SCF(lib.StreamObject):
             with lib.temporary_env(self.opt, prescreen=prescreen):
                 vj, vk = get_jk(mol, dm, hermi, self.opt, with_j, with_k, omega)
 
+        if self.opt is not None and self.verbose >= logger.DEBUG:
+            nkept, ntot = self.opt.count_significant_quartets()
+            if ntot > 0:
+                logger.debug(self, 'direct SCF screened %d of %d shell quartets (%.1f%%)',
+                             ntot-nkept, ntot, (ntot-nkept)*100./ntot)
         logger.timer(self, 'vj and vk', *cpu0)
         return vj, vk
 
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import lib, gto, scf, dft
+from pyscf.scf import batch
+
+def setUpModule():
+    global mols
+    numpy.random.seed(1)
+    h2o = numpy.array([[0, 0, 0], [0, .757, .587], [0, -.757, .587]])
+    nh3 = numpy.array([[0, 0, 0], [0, 0, 1.01], [.95, 0, -.34], [-.48, .82, -.34]])
+    geoms = [(['O', 'H', 'H'], h2o + numpy.random.rand(3,3)*.1) for i in range(4)]
+    geoms += [(['N', 'H', 'H', 'H'], nh3 + numpy.random.rand(4,3)*.1) for i in range(3)]
+    mols = gto.mole.build_batch(geoms, basis='631g', verbose=0)
+
+def tearDownModule():
+    global mols
+    del mols
+
+class KnownValues(unittest.TestCase):
+    def test_rhf(self):
+        ref = [scf.RHF(mol).run(conv_tol=1e-10).e_tot for mol in mols]
+        mfs = [scf.RHF(mol) for mol in mols]
+        for mf in mfs:
+            mf.conv_tol = 1e-10
+        for max_workers in (1, 2):
+            mybatch = batch.BatchSCF(mfs)
+            mybatch.max_workers = max_workers
+            e_tot = mybatch.kernel()
+            self.assertTrue(mybatch.converged.all())
+            self.assertAlmostEqual(abs(numpy.array(e_tot) - ref).max(), 0, 9)
+            self.assertAlmostEqual(mfs[0].e_tot, ref[0], 9)
+            dm = mfs[-1].make_rdm1()
+            self.assertAlmostEqual(mfs[-1].energy_tot(dm), ref[-1], 9)
+
+    def test_rks(self):
+        ref = [dft.RKS(mol, xc='b3lyp').run().e_tot for mol in mols[2:5]]
+        mfs = [dft.RKS(mol, xc='b3lyp') for mol in mols[2:5]]
+        e_tot = batch.BatchSCF(mfs).kernel()
+        self.assertAlmostEqual(abs(numpy.array(e_tot) - ref).max(), 0, 8)
+
+    def test_diis_extrapolate(self):
+        numpy.random.seed(3)
+        focks = numpy.random.rand(2, 4, 5, 5)
+        errs = numpy.random.rand(2, 4, 5, 5)
+        f = batch._diis_extrapolate(focks, errs)
+        for k in range(2):
+            diis = lib.diis.DIIS()
+            diis.space = 4
+            for x, e in zip(focks[k], errs[k]):
+                fk = diis.update(x, e)
+            self.assertAlmostEqual(abs(f[k] - fk).max(), 0, 9)
+
+    def test_unsupported(self):
+        self.assertRaises(NotImplementedError, batch.BatchSCF, [scf.UHF(mols[0])])
+        self.assertRaises(NotImplementedError, batch.BatchSCF, [scf.ROHF(mols[0])])
+
+if __name__ == "__main__":
+    print("Full Tests for batched SCF")
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# Copyright 2014-2023 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import unittest
+import numpy
+from pyscf import lib, gto, scf, dft
+from pyscf.scf import _response_functions
+
+def setUpModule():
+    global mol
+    mol = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                basis='6-31g', verbose=0)
+
+def tearDownModule():
+    global mol
+    del mol
+
+def _random_dms(n, nao):
+    numpy.random.seed(2)
+    dms = numpy.random.random((n,nao,nao)) - .5
+    scale = numpy.array([1., 1e-1, 1e-4, 1e-4, 0., 1e-7])
+    return dms * scale[:n,None,None]
+
+class KnownValues(unittest.TestCase):
+    def test_group_dms_by_magnitude(self):
+        dm_max = numpy.array([1e-4, 1., 0., .5, 1e-3, 1e-5])
+        groups = _response_functions._group_dms_by_magnitude(dm_max, 1e-2, 32)
+        self.assertEqual(groups, [[1, 3], [4, 0, 5]])
+        groups = _response_functions._group_dms_by_magnitude(dm_max, 1e-2, 1)
+        self.assertEqual(groups, [[1], [3], [4], [0], [5]])
+
+    def test_rhf_response(self):
+        mf = scf.RHF(mol).run()
+        dms = _random_dms(6, mol.nao)
+        for hermi in (0, 1):
+            if hermi == 1:
+                dms = dms + dms.transpose(0,2,1)
+            ref = mf.gen_response(hermi=hermi)(dms)
+            mf1 = copy.copy(mf)
+            mf1._eri = None
+            mf1.max_memory = 0
+            group_sizes = []
+            def get_jk(mol, dm, hermi=1, *args, **kwargs):
+                group_sizes.append(len(dm))
+                return scf.hf.SCF.get_jk(mf1, mol, dm, hermi, *args, **kwargs)
+            mf1.get_jk = get_jk
+            with lib.temporary_env(_response_functions, RESPONSE_JK_BLKSIZE=1):
+                vind = mf1.gen_response(hermi=hermi)
+            v1 = vind(dms)
+            self.assertEqual(group_sizes, [1, 1, 1, 1, 1])
+            self.assertAlmostEqual(abs(v1 - ref).max(), 0, 9)
+            self.assertAlmostEqual(abs(v1[4]).max(), 0, 12)
+
+    def test_uks_response(self):
+        mf = dft.UKS(mol, xc='b3lyp').run()
+        dms = _random_dms(6, mol.nao).reshape(2,3,mol.nao,mol.nao)
+        ref = mf.gen_response(hermi=0)(dms)
+        mf._eri = None
+        mf.max_memory = 0
+        v1 = mf.gen_response(hermi=0)(dms)
+        self.assertAlmostEqual(abs(v1 - ref).max(), 0, 9)
+
+if __name__ == "__main__":
+    print("Full Tests for scf response functions")
+    unittest.main()
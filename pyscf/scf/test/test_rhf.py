@@ -704,6 +704,28 @@ H     0    0.757    0.587'''
         e = mfs(mol1)
         self.assertAlmostEqual(e, -1.1163913004438035, 9)
 
+    def test_scanner_guess_extrapolation(self):
+        from pyscf.scf import guess_extrapolation
+        self.assertAlmostEqual(abs(guess_extrapolation.aspc_coeffs(1) -
+                                   [2.5, -2, .5]).max(), 0, 12)
+
+        mol1 = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                     basis='6-31g', verbose=0)
+        geoms = ['O 0 0 0; H 0 %g .587; H 0 -%g .587' % (x, x)
+                 for x in .757 + numpy.arange(5) * .02]
+        ref = [mol1.set_geom_(g, inplace=False).RHF().kernel() for g in geoms]
+        for method in ('aspc', 'grassmann'):
+            mfs = mol1.RHF().as_scanner()
+            mfs.guess_extrapolation = method
+            e = [mfs(g) for g in geoms]
+            self.assertAlmostEqual(abs(numpy.array(e) - ref).max(), 0, 9)
+            extrap = mfs.guess_extrapolation
+            self.assertEqual(len(extrap.history), min(extrap.nhistory, 5))
+            self.assertEqual(sorted(mfs.scanner_timings.keys()),
+                             ['guess', 'scf', 'setup'])
+            # only the coordinates are updated in the new mol
+            self.assertTrue(mfs.mol._bas is mol1._bas)
+
     def test_natm_eq_0(self):
         mol = gto.M()
         mol.nelectron = 2
@@ -905,6 +927,32 @@ H     0    0.757    0.587'''
         q = opt.q_cond
         self.assertTrue(mol.intor_by_shell('int2e', shls).ravel()[0] < q[i,j] * q[k,l])
 
+    def test_direct_scf_rebuild(self):
+        mf1 = scf.RHF(mol)
+        mf1.max_memory = 0
+        mf1.direct_scf_rebuild_nsteps = 2
+        mf1.direct_scf_rebuild_ddm_ratio = 1.
+        rebuilds = []
+        get_veff = mf1.get_veff
+        def get_veff_(mol, dm, dm_last=0, vhf_last=0, hermi=1):
+            rebuilds.append(isinstance(dm_last, int))
+            return get_veff(mol, dm, dm_last, vhf_last, hermi)
+        mf1.get_veff = get_veff_
+        e1 = mf1.kernel()
+        self.assertAlmostEqual(e1, mf.e_tot, 9)
+        self.assertTrue(rebuilds.count(True) > 2)
+        self.assertTrue(rebuilds.count(False) > 0)
+
+        self.assertFalse(scf.hf._need_full_fock_rebuild(mf1, 1, 1e-3, 1e-2))
+        self.assertTrue(scf.hf._need_full_fock_rebuild(mf1, 2, 1e-3, 1e-2))
+        self.assertTrue(scf.hf._need_full_fock_rebuild(mf1, 1, 1e-2, 1e-3))
+
+        nkept, ntot = mf1.opt.count_significant_quartets()
+        nbas = mol.nbas
+        npair = nbas * (nbas+1) // 2
+        self.assertEqual(ntot, npair*(npair+1)//2)
+        self.assertTrue(0 < nkept <= ntot)
+
     @unittest.skip('Numerical accuracy issue in libcint 5.2')
     def test_schwarz_condition_numerical_error(self):
         mol = gto.M(atom='''
@@ -1 +1 @@
-from .sgx import sgx_fit, SGX
+from .sgx import sgx_fit, sgx_response, SGX
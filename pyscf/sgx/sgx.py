@@ -156,16 +156,30 @@ def sgx_fit(mf, auxbasis=None, with_df=None, pjs=False):
                 self.opt = self.init_direct_scf(mol)
 
             if self._in_scf and not self.direct_scf:
-                if numpy.linalg.norm(dm - self._last_dm) < with_df.grids_switch_thrd \
-                        and with_df.grids_level_f != with_df.grids_level_i:
-                    # only reset if grids_level_f and grids_level_i differ
-                    logger.debug(self, 'Switching SGX grids')
-                    with_df.build(level=with_df.grids_level_f)
+                level = with_df.grids.level
+                level_f = with_df.grids_level_f
+                # The errors of the grids should be smaller than the errors
+                # due to the density matrix change in the current cycle. The
+                # grids are refined by one level each time |ddm| drops by
+                # grids_switch_ratio, reaching grids_level_f when |ddm| <
+                # grids_switch_thrd.
+                ddm_norm = numpy.linalg.norm(dm - self._last_dm)
+                new_level = level
+                while (new_level < level_f and
+                       ddm_norm < with_df.grids_switch_thrd *
+                       with_df.grids_switch_ratio**(level_f-new_level-1)):
+                    new_level += 1
+                logger.debug1(self, 'SGX grids level %d  |ddm| = %.3g',
+                              level, ddm_norm)
+                if new_level != level:
+                    logger.debug(self, 'Switching SGX grids to level %d', new_level)
+                    with_df.build(level=new_level)
                     self._nsteps_direct = 0
-                    self._in_scf = False
                     self._last_dm = 0
                     self._last_vj = 0
                     self._last_vk = 0
+                if new_level >= level_f:
+                    self._in_scf = False
 
             if self.direct_scf_sgx:
                 vj, vk = with_df.get_jk(dm-self._last_dm, hermi, self.opt,
@@ -221,6 +235,51 @@ class _SGXHF(object):
 scf.hf.SCF.COSX = sgx_fit
 mcscf.casci.CASCI.COSX = sgx_fit
 
+# Grids for the exchange matrices of response functions
+RESPONSE_GRIDS_LEVEL = getattr(__config__, 'sgx_response_grids_level', 0)
+RESPONSE_GRIDS_THRD = getattr(__config__, 'sgx_response_grids_thrd', 1e-10)
+
+def sgx_response(mf, grids_level=RESPONSE_GRIDS_LEVEL,
+                 grids_thrd=RESPONSE_GRIDS_THRD, pjs=False):
+    '''For the given SCF object, compute the exchange matrices of the response
+    functions (TDDFT, CPHF, stability analysis, hessian) with SGX. The J/K
+    matrices of the ground state are not affected.
+
+    Args:
+        mf : an SCF object
+
+    Kwargs:
+        grids_level : int
+            Level of the SGX grids for response functions. Response functions
+            are generally less sensitive to the errors of grids than the
+            ground state energy. Coarse grids can be used.
+        grids_thrd : float
+            Threshold to screen the grids and the contracted AO values.
+        pjs: bool
+            Whether to perform P-junction screening.
+
+    Returns:
+        A copy of the SCF object with attribute response_sgx
+
+    Examples:
+
+    >>> mol = gto.M(atom='H 0 0 0; F 0 0 1', basis='ccpvdz', verbose=0)
+    >>> mf = sgx_response(dft.RKS(mol, xc='b3lyp').run())
+    >>> mf.TDA().kernel()
+    '''
+    assert (isinstance(mf, scf.hf.SCF))
+    with_sgx = SGX(mf.mol, pjs=pjs)
+    with_sgx.max_memory = mf.max_memory
+    with_sgx.stdout = mf.stdout
+    with_sgx.verbose = mf.verbose
+    with_sgx.grids_level_i = with_sgx.grids_level_f = grids_level
+    with_sgx.grids_thrd = grids_thrd
+
+    mf = copy.copy(mf)
+    mf.response_sgx = with_sgx
+    mf._keys = mf._keys.union(['response_sgx'])
+    return mf
+
 
 def _make_opt(mol, pjs=False):
     '''Optimizer to genrate 3-center 2-electron integrals'''
@@ -250,6 +309,9 @@ class SGX(lib.StreamObject):
         self.grids_level_i = 0  # initial grids level
         self.grids_level_f = 1  # final grids level
         self.grids_switch_thrd = 0.03
+        # Between grids_level_i and grids_level_f, the grids level is
+        # increased by one each time |ddm| is reduced by this ratio
+        self.grids_switch_ratio = 10
         # compute J matrix using DF and K matrix using SGX. It's identical to
         # the RIJCOSX method in ORCA
         self.dfj = False
@@ -267,6 +329,7 @@ class SGX(lib.StreamObject):
         self.auxmol = None
         self._vjopt = None
         self._opt = None
+        self._opt_pjs = None
         self._last_dm = 0
         self._rsh_df = {}  # Range separated Coulomb DF objects
         self._keys = set(self.__dict__.keys())
@@ -288,6 +351,7 @@ class SGX(lib.StreamObject):
         log.info('grids_level_f = %s', self.grids_level_f)
         log.info('grids_thrd = %s', self.grids_thrd)
         log.info('grids_switch_thrd = %s', self.grids_switch_thrd)
+        log.info('grids_switch_ratio = %s', self.grids_switch_ratio)
         log.info('dfj = %s', self.dfj)
         log.info('auxbasis = %s', self.auxbasis)
         return self
@@ -302,7 +366,11 @@ class SGX(lib.StreamObject):
         if level is None:
             level = self.grids_level_f
         self.grids = sgx_jk.get_gridss(self.mol, level, self.grids_thrd)
-        self._opt = _make_opt(self.mol, pjs=self.pjs)
+        # The integral screening does not depend on the grids. It is kept
+        # when the grids are switched during SCF iterations.
+        if self._opt is None or self._opt_pjs != self.pjs:
+            self._opt = _make_opt(self.mol, pjs=self.pjs)
+            self._opt_pjs = self.pjs
 
         # In the RSH-integral temporary treatment, recursively rebuild SGX
         # objects in _rsh_df.
@@ -344,7 +412,7 @@ class SGX(lib.StreamObject):
                 logger.info(self, 'Create RSH-SGX object %s for omega=%s', rsh_df, omega)
 
             with rsh_df.mol.with_range_coulomb(omega):
-                return rsh_df.get_jk(dm, hermi, with_j, with_k,
+                return rsh_df.get_jk(dm, hermi, vhfopt, with_j, with_k,
                                      direct_scf_tol)
 
         if with_j and self.dfj:
@@ -18,6 +18,8 @@
 import unittest
 from pyscf import gto
 from pyscf import scf
+from pyscf import dft
+from pyscf import tdscf
 from pyscf.sgx import sgx
 
 
@@ -30,6 +32,40 @@ class KnownValues(unittest.TestCase):
         self.assertTrue(mf.mol is mol1)
         self.assertTrue(mf.with_df.mol is mol1)
 
+    def test_adaptive_grids(self):
+        mol = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                    basis='ccpvdz', verbose=0)
+        mf = sgx.sgx_fit(scf.RHF(mol))
+        mf.with_df.grids_level_i = 0
+        mf.with_df.grids_level_f = 2
+        levels = []
+        mf.callback = lambda envs: levels.append(mf.with_df.grids.level)
+        e1 = mf.kernel()
+        self.assertEqual(levels[0], 0)
+        self.assertEqual(levels[-1], 2)
+        self.assertTrue(1 in levels)
+
+        mf = sgx.sgx_fit(scf.RHF(mol))
+        mf.with_df.grids_level_i = mf.with_df.grids_level_f = 2
+        e2 = mf.kernel()
+        self.assertAlmostEqual(e1, e2, 8)
+
+    def test_sgx_response(self):
+        mol = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                    basis='6-31g', verbose=0)
+        mf = dft.RKS(mol, xc='b3lyp').run()
+        e0 = mf.TDA().kernel(nstates=3)[0]
+        mf1 = sgx.sgx_response(mf)
+        self.assertFalse(hasattr(mf, 'response_sgx'))
+        e1 = mf1.TDA().kernel(nstates=3)[0]
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 4)
+        self.assertTrue(mf1.response_sgx.grids is not None)
+
+        mf = dft.UKS(mol, xc='camb3lyp').run()
+        e0 = mf.TDA().kernel(nstates=2)[0]
+        e1 = sgx.sgx_response(mf, grids_level=1).TDA().kernel(nstates=2)[0]
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 5)
+
 
 if __name__ == "__main__":
     print("Full Tests for SGX")
@@ -550,6 +550,7 @@ def kernel(mf, mo_coeff=None, mo_occ=None, dm=None,
                  imacro, e_tot, e_tot-last_hf_e, norm_gorb,
                  kfcount+1, jkcount)
         cput1 = log.timer('cycle= %d'%(imacro+1), *cput1)
+        mf.cycles = imacro + 1
 
         if callable(mf.check_convergence):
             scf_conv = mf.check_convergence(locals())